@@ -1,18 +1,24 @@
 import json
-from groq import AsyncGroq
-from app.core.config import settings
-from typing import List, Dict, Any
+import numpy as np
+from typing import List, Dict, Any, Tuple
+from app.ai.gateway import gateway
+from app.ai.metrics import ai_metrics
+from app.ai.encoding import encode_incidents
+from app.utils.distance import haversine_matrix
 
-# Initialize Groq client following the same pattern as client.py
-client = AsyncGroq(api_key=settings.GROQ_API_KEY2)
+# Fallback clustering groups incidents within this distance of a seed incident
+SIMPLE_CLUSTER_RADIUS_KM = 1.0
 
-async def analyze_incident_clusters(incidents_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+async def analyze_incident_clusters(incidents_data: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int]:
     """
-    Use Groq AI to analyze incident patterns and create intelligent clusters
+    Use Groq AI to analyze incident patterns and create intelligent clusters.
+    Returns the clusters and how many incidents they were built from (the
+    prompt keeps only as many as its token budget allows).
     """
     if not incidents_data:
-        return []
+        return [], 0
     
+    table, included = encode_incidents(incidents_data)
     prompt = f"""
     Analyze the following emergency incidents and create intelligent clusters based on:
     1. Geographic proximity (lat/long)
@@ -20,8 +26,8 @@ async def analyze_incident_clusters(incidents_data: List[Dict[str, Any]]) -> Lis
     3. Time patterns
     4. Severity scores
     
-    Incidents data:
-    {json.dumps(incidents_data[:20], default=str)}  # Limit to avoid token limits
+    Incidents, one per row:
+{table}
     
     Return a JSON array of clusters with this exact format:
     [
@@ -42,34 +48,38 @@ async def analyze_incident_clusters(incidents_data: List[Dict[str, Any]]) -> Lis
     """
     
     try:
-        completion = await client.chat.completions.create(
-            messages=[{"role": "user", "content": prompt}],
-            model="llama-3.3-70b-versatile",
-            temperature=0.3,
-        )
-        
-        response_text = completion.choices[0].message.content
-        # Clean response to extract JSON
-        if "```json" in response_text:
-            response_text = response_text.split("```json")[1].split("```")[0]
-        elif "```" in response_text:
-            response_text = response_text.split("```")[1].split("```")[0]
+        with ai_metrics.track("clustering"):
+            completion = await gateway.chat_completion(
+                operation="clustering",
+                messages=[{"role": "user", "content": prompt}],
+                model="llama-3.3-70b-versatile",
+                temperature=0.3,
+            )
             
-        clusters = json.loads(response_text.strip())
-        return clusters
+            response_text = completion.choices[0].message.content
+            # Clean response to extract JSON
+            if "```json" in response_text:
+                response_text = response_text.split("```json")[1].split("```")[0]
+            elif "```" in response_text:
+                response_text = response_text.split("```")[1].split("```")[0]
+                
+            clusters = json.loads(response_text.strip())
+        return clusters, included
         
     except Exception as e:
         print(f"Error in cluster analysis: {e}")
         # Fallback simple clustering by location
-        return create_simple_location_clusters(incidents_data)
+        return create_simple_location_clusters(incidents_data), len(incidents_data)
 
-async def generate_risk_predictions(historical_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+async def generate_risk_predictions(historical_data: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int]:
     """
-    Generate future risk predictions using Groq AI
+    Generate future risk predictions using Groq AI. Returns the predictions
+    and how many incidents they were based on.
     """
     if not historical_data:
-        return []
+        return [], 0
     
+    table, included = encode_incidents(historical_data)
     prompt = f"""
     Based on this historical emergency incident data, predict high-risk zones for the next 24-48 hours.
     Consider:
@@ -78,8 +88,8 @@ async def generate_risk_predictions(historical_data: List[Dict[str, Any]]) -> Li
     3. Category-specific patterns
     4. Seasonal factors
     
-    Historical data sample:
-    {json.dumps(historical_data[:15], default=str)}
+    Historical incidents, one per row:
+{table}
     
     Return a JSON array of prediction zones with this exact format:
     [
@@ -99,25 +109,27 @@ async def generate_risk_predictions(historical_data: List[Dict[str, Any]]) -> Li
     """
     
     try:
-        completion = await client.chat.completions.create(
-            messages=[{"role": "user", "content": prompt}],
-            model="llama-3.3-70b-versatile",
-            temperature=0.4,
-        )
-        
-        response_text = completion.choices[0].message.content
-        # Clean response to extract JSON
-        if "```json" in response_text:
-            response_text = response_text.split("```json")[1].split("```")[0]
-        elif "```" in response_text:
-            response_text = response_text.split("```")[1].split("```")[0]
+        with ai_metrics.track("prediction"):
+            completion = await gateway.chat_completion(
+                operation="prediction",
+                messages=[{"role": "user", "content": prompt}],
+                model="llama-3.3-70b-versatile",
+                temperature=0.4,
+            )
             
-        predictions = json.loads(response_text.strip())
-        return predictions
+            response_text = completion.choices[0].message.content
+            # Clean response to extract JSON
+            if "```json" in response_text:
+                response_text = response_text.split("```json")[1].split("```")[0]
+            elif "```" in response_text:
+                response_text = response_text.split("```")[1].split("```")[0]
+                
+            predictions = json.loads(response_text.strip())
+        return predictions, included
         
     except Exception as e:
         print(f"Error in risk prediction: {e}")
-        return create_fallback_predictions(historical_data)
+        return create_fallback_predictions(historical_data), len(historical_data)
 
 def create_simple_location_clusters(incidents_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """Fallback clustering when AI fails"""
@@ -126,31 +138,30 @@ def create_simple_location_clusters(incidents_data: List[Dict[str, Any]]) -> Lis
     
     # Simple geographic clustering by grouping nearby incidents
     clusters = []
-    processed = set()
-    
-    for i, incident in enumerate(incidents_data):
-        if i in processed or not incident.get('call', {}).get('location_lat'):
+    located = [
+        incident for incident in incidents_data
+        if incident.get('call', {}).get('location_lat') and incident['call'].get('location_long') is not None
+    ]
+    if not located:
+        return []
+
+    # All pairwise distances at once instead of a nested Python loop
+    distances = haversine_matrix(
+        [incident['call']['location_lat'] for incident in located],
+        [incident['call']['location_long'] for incident in located],
+        dtype=np.float32,
+    )
+    near = distances <= SIMPLE_CLUSTER_RADIUS_KM
+    unassigned = np.ones(len(located), dtype=bool)
+
+    for i, incident in enumerate(located):
+        if not unassigned[i]:
             continue
-            
-        cluster_incidents = [incident]
+        members = np.flatnonzero(near[i] & unassigned)
+        unassigned[members] = False
+        cluster_incidents = [located[j] for j in members]
         base_lat = incident['call']['location_lat']
         base_lng = incident['call']['location_long']
-        processed.add(i)
-        
-        # Find nearby incidents (within ~1km)
-        for j, other_incident in enumerate(incidents_data):
-            if j in processed or j == i:
-                continue
-            if not other_incident.get('call', {}).get('location_lat'):
-                continue
-                
-            other_lat = other_incident['call']['location_lat']
-            other_lng = other_incident['call']['location_long']
-            
-            # Simple distance check (rough approximation)
-            if abs(base_lat - other_lat) < 0.01 and abs(base_lng - other_lng) < 0.01:
-                cluster_incidents.append(other_incident)
-                processed.add(j)
         
         if len(cluster_incidents) >= 2:  # Only create cluster if 2+ incidents
             clusters.append({
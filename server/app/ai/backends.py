@@ -0,0 +1,386 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
+import httpx
+from groq import AsyncGroq, InternalServerError, RateLimitError
+from app.core.config import settings
+from app.ai.rules import classify_incident
+from app.utils.tokens import estimate_tokens
+
+GROQ_COMPLETIONS_URL = "https://api.groq.com/openai/v1/chat/completions"
+
+
+# Minimal stand-ins for the Groq completion objects: the callers only read
+# choices[0].message.content, model and usage.
+@dataclass
+class CompletionMessage:
+    content: str
+    role: str = "assistant"
+
+
+@dataclass
+class CompletionChoice:
+    message: CompletionMessage
+    index: int = 0
+    finish_reason: str = "stop"
+
+
+@dataclass
+class CompletionUsage:
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_tokens: int = 0
+
+
+@dataclass
+class Completion:
+    model: str
+    choices: List[CompletionChoice]
+    usage: CompletionUsage = field(default_factory=CompletionUsage)
+
+
+def make_completion(model: str, content: str, prompt_tokens: int = 0, completion_tokens: int = 0) -> Completion:
+    return Completion(
+        model=model,
+        choices=[CompletionChoice(message=CompletionMessage(content=content))],
+        usage=CompletionUsage(prompt_tokens, completion_tokens, prompt_tokens + completion_tokens),
+    )
+
+
+# Streams yield content deltas, and optionally a final CompletionUsage
+StreamItem = Union[str, CompletionUsage]
+
+STREAM_CHUNK_CHARS = 16
+FIRST_TOKEN_SHARE = 0.3  # share of a simulated latency spent before the first delta
+
+
+async def simulate_stream(content: str, latency_ms: float, usage: CompletionUsage) -> AsyncIterator[StreamItem]:
+    """
+    Yield `content` in small deltas spread over `latency_ms`.
+    """
+    chunks = [content[i:i + STREAM_CHUNK_CHARS] for i in range(0, len(content), STREAM_CHUNK_CHARS)] or [""]
+    await asyncio.sleep(latency_ms * FIRST_TOKEN_SHARE / 1000)
+    delay = latency_ms * (1 - FIRST_TOKEN_SHARE) / 1000 / len(chunks)
+    for i, chunk in enumerate(chunks):
+        if i:
+            await asyncio.sleep(delay)
+        yield chunk
+    yield usage
+
+
+def request_key(kwargs: Dict[str, Any]) -> str:
+    """
+    Identity of a completion request for record/replay.
+    """
+    identity = {name: kwargs.get(name) for name in ("model", "messages", "temperature", "response_format")}
+    return hashlib.sha256(json.dumps(identity, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class ReplayMissError(Exception):
+    """
+    Raised by the replay backend for a request that was never recorded.
+    """
+
+
+class GroqBackend:
+    def __init__(self, api_key: str):
+        self.client = AsyncGroq(api_key=api_key, max_retries=0, timeout=settings.AI_REQUEST_TIMEOUT_SECONDS)
+
+    async def create(self, operation: str, **kwargs) -> Any:
+        return await self.client.chat.completions.create(**kwargs)
+
+    async def stream(self, operation: str, **kwargs) -> AsyncIterator[StreamItem]:
+        stream = await self.client.chat.completions.create(stream=True, **kwargs)
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+            # Groq reports usage on the last chunk
+            usage = getattr(getattr(chunk, "x_groq", None), "usage", None)
+            if usage is not None:
+                yield CompletionUsage(usage.prompt_tokens, usage.completion_tokens, usage.total_tokens)
+
+
+class FakeBackend:
+    """
+    In-process stand-in for Groq. Answers every operation with plausible
+    JSON (triage through the rule classifier) after a latency drawn from
+    the configured distribution, and fails or rate limits at the
+    configured rates.
+    """
+
+    def __init__(self):
+        self.random = random.Random(settings.AI_FAKE_SEED)
+
+    def latency_ms(self) -> float:
+        median = settings.AI_FAKE_LATENCY_MS
+        spread = settings.AI_FAKE_LATENCY_SPREAD
+        distribution = settings.AI_FAKE_LATENCY_DISTRIBUTION
+        if distribution == "constant":
+            return median
+        if distribution == "uniform":
+            return max(0.0, self.random.uniform(median * (1 - spread), median * (1 + spread)))
+        if distribution == "exponential":
+            return self.random.expovariate(1 / median) if median > 0 else 0.0
+        return self.random.lognormvariate(0, spread) * median
+
+    def _fail(self) -> None:
+        roll = self.random.random()
+        request = httpx.Request("POST", GROQ_COMPLETIONS_URL)
+        if roll < settings.AI_FAKE_RATE_LIMIT_RATE:
+            response = httpx.Response(429, request=request, headers={"retry-after": "1"})
+            raise RateLimitError("Fake rate limit", response=response, body=None)
+        if roll < settings.AI_FAKE_RATE_LIMIT_RATE + settings.AI_FAKE_ERROR_RATE:
+            response = httpx.Response(500, request=request)
+            raise InternalServerError("Fake server error", response=response, body=None)
+
+    def _respond(self, operation: str, kwargs: Dict[str, Any]) -> Completion:
+        self._fail()
+        messages = kwargs.get("messages", [])
+        prompt = "\n".join(str(message.get("content", "")) for message in messages)
+        content = fake_content(operation, str(messages[-1].get("content", "")) if messages else "")
+        return make_completion(
+            kwargs.get("model", "fake"), content,
+            prompt_tokens=estimate_tokens(prompt), completion_tokens=estimate_tokens(content),
+        )
+
+    async def create(self, operation: str, **kwargs) -> Completion:
+        await asyncio.sleep(self.latency_ms() / 1000)
+        return self._respond(operation, kwargs)
+
+    async def stream(self, operation: str, **kwargs) -> AsyncIterator[StreamItem]:
+        completion = self._respond(operation, kwargs)
+        async for item in simulate_stream(completion.choices[0].message.content, self.latency_ms(), completion.usage):
+            yield item
+
+
+FAKE_RESPONDER_TYPES = {
+    "fire": "fire",
+    "hazardous_material": "fire",
+    "medical_emergency": "medical",
+    "overdose": "medical",
+    "traffic_accident": "medical",
+    "natural_disaster": "medical",
+}
+
+FAKE_EQUIPMENT = {
+    "fire": ["Fire extinguisher", "Thermal camera", "Breathing apparatus"],
+    "medical": ["Defibrillator", "Oxygen kit", "Stretcher"],
+    "police": ["Body camera", "First aid kit", "Traffic cones"],
+}
+
+
+def _field(text: str, name: str) -> str:
+    match = re.search(rf"^- {name}: (.*)$", text, re.MULTILINE)
+    return match.group(1) if match else ""
+
+
+def fake_content(operation: str, user_content: str) -> str:
+    """
+    Synthetic response body for an operation, in the shape its prompt asks for.
+    """
+    if operation == "triage":
+        rules = classify_incident(user_content)
+        return json.dumps({key: rules[key] for key in ("priority_score", "category", "summary")})
+
+    if operation == "triage_batch":
+        parts = re.split(r"^\[(\d+)\] ", user_content, flags=re.MULTILINE)[1:]
+        results = []
+        for index, description in zip(parts[::2], parts[1::2]):
+            rules = classify_incident(description)
+            results.append({"index": int(index), **{key: rules[key] for key in ("priority_score", "category", "summary")}})
+        return json.dumps({"results": results})
+
+    if operation in ("detailed_analysis", "detailed_analysis_stream"):
+        category = _field(user_content, "Category")
+        responder = FAKE_RESPONDER_TYPES.get(category, "police")
+        return json.dumps({
+            "situation": " ".join(_field(user_content, "Description").split()[:20]) or "Unknown situation",
+            "instructions": [
+                "Approach and secure the scene",
+                "Assess casualties and hazards",
+                "Request additional units if needed",
+            ],
+            "equipment": FAKE_EQUIPMENT[responder],
+            "responders_count": {responder: 2},
+            "rescue_type": f"{category.replace('_', ' ').capitalize() or 'General'} response",
+        })
+
+    if operation == "dispatch_recommendation":
+        try:
+            category = json.loads(user_content.split(":", 1)[1]).get("category", "")
+        except (IndexError, ValueError, AttributeError):
+            category = ""
+        return json.dumps({"recommended_type": FAKE_RESPONDER_TYPES.get(category, "police"), "reasoning": "Fake backend"})
+
+    if operation in ("clustering", "prediction"):
+        return "[]"
+
+    return "{}"
+
+
+class Recorder:
+    """
+    Appends every completed exchange to a JSONL file for later replay.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = asyncio.Lock()
+        self.recorded = 0
+
+    def _append(self, line: str) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    async def record(self, operation: str, kwargs: Dict[str, Any], completion: Any, latency_ms: float) -> None:
+        usage = getattr(completion, "usage", None)
+        entry = {
+            "key": request_key(kwargs),
+            "operation": operation,
+            "model": getattr(completion, "model", None) or kwargs.get("model"),
+            "content": completion.choices[0].message.content,
+            "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+            "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+            "latency_ms": round(latency_ms, 2),
+        }
+        async with self.lock:
+            await asyncio.to_thread(self._append, json.dumps(entry))
+        self.recorded += 1
+
+
+class RecordingBackend:
+    def __init__(self, inner: GroqBackend, recorder: Recorder):
+        self.inner = inner
+        self.recorder = recorder
+
+    async def create(self, operation: str, **kwargs) -> Any:
+        started = time.perf_counter()
+        completion = await self.inner.create(operation, **kwargs)
+        try:
+            await self.recorder.record(operation, kwargs, completion, (time.perf_counter() - started) * 1000)
+        except Exception as e:
+            print(f"Error recording AI response: {e}")
+        return completion
+
+    async def stream(self, operation: str, **kwargs) -> AsyncIterator[StreamItem]:
+        # Recorded as a whole completion, so replay can serve it either way
+        started = time.perf_counter()
+        parts = []
+        usage = None
+        async for item in self.inner.stream(operation, **kwargs):
+            if isinstance(item, CompletionUsage):
+                usage = item
+            else:
+                parts.append(item)
+            yield item
+        content = "".join(parts)
+        completion = make_completion(
+            kwargs.get("model"), content,
+            usage.prompt_tokens if usage else 0,
+            usage.completion_tokens if usage else estimate_tokens(content),
+        )
+        try:
+            await self.recorder.record(operation, kwargs, completion, (time.perf_counter() - started) * 1000)
+        except Exception as e:
+            print(f"Error recording AI response: {e}")
+
+
+class ReplayBackend:
+    """
+    Serves completions recorded by the record backend, matched on the
+    request (model, messages, temperature, response_format). Repeated
+    recordings of one request are served round-robin.
+    """
+
+    def __init__(self, path: str):
+        self.entries: Dict[str, List[Dict[str, Any]]] = {}
+        self.positions: Dict[str, int] = {}
+        self.fake = FakeBackend()
+        self.hits = 0
+        self.misses = 0
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.entries.setdefault(entry["key"], []).append(entry)
+        else:
+            print(f"AI replay file {path} not found, every request will miss")
+
+    def _lookup(self, operation: str, kwargs: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        key = request_key(kwargs)
+        entries = self.entries.get(key)
+        if not entries:
+            self.misses += 1
+            if settings.AI_REPLAY_MISS == "fake":
+                return None
+            raise ReplayMissError(f"No recorded response for {operation} request {key[:12]}")
+
+        self.hits += 1
+        position = self.positions.get(key, 0)
+        self.positions[key] = position + 1
+        return entries[position % len(entries)]
+
+    def _completion(self, entry: Dict[str, Any]) -> Completion:
+        return make_completion(entry["model"], entry["content"], entry["prompt_tokens"], entry["completion_tokens"])
+
+    async def create(self, operation: str, **kwargs) -> Completion:
+        entry = self._lookup(operation, kwargs)
+        if entry is None:
+            return await self.fake.create(operation, **kwargs)
+        if settings.AI_REPLAY_LATENCY:
+            await asyncio.sleep(entry.get("latency_ms", 0) / 1000)
+        return self._completion(entry)
+
+    async def stream(self, operation: str, **kwargs) -> AsyncIterator[StreamItem]:
+        entry = self._lookup(operation, kwargs)
+        if entry is None:
+            async for item in self.fake.stream(operation, **kwargs):
+                yield item
+            return
+        completion = self._completion(entry)
+        latency_ms = entry.get("latency_ms", 0) if settings.AI_REPLAY_LATENCY else 0
+        async for item in simulate_stream(completion.choices[0].message.content, latency_ms, completion.usage):
+            yield item
+
+
+_shared: Dict[str, Any] = {}
+
+
+def build_backend(api_key: str) -> Any:
+    """
+    Backend for one gateway key slot according to AI_BACKEND. Only the
+    Groq backends are per key; fake, replay and the recorder are shared.
+    """
+    mode = settings.AI_BACKEND
+    if mode == "groq":
+        return GroqBackend(api_key)
+    if mode == "record":
+        if "recorder" not in _shared:
+            _shared["recorder"] = Recorder(settings.AI_RECORDING_PATH)
+        return RecordingBackend(GroqBackend(api_key), _shared["recorder"])
+    if mode == "fake":
+        if "fake" not in _shared:
+            _shared["fake"] = FakeBackend()
+        return _shared["fake"]
+    if mode == "replay":
+        if "replay" not in _shared:
+            _shared["replay"] = ReplayBackend(settings.AI_RECORDING_PATH)
+        return _shared["replay"]
+    raise ValueError(f"Unknown AI_BACKEND: {mode}")
+
+
+def backend_stats() -> Dict[str, Any]:
+    stats: Dict[str, Any] = {"mode": settings.AI_BACKEND}
+    if "recorder" in _shared:
+        stats["recorded"] = _shared["recorder"].recorded
+    if "replay" in _shared:
+        replay = _shared["replay"]
+        stats.update(recordings=sum(len(entries) for entries in replay.entries.values()), hits=replay.hits, misses=replay.misses)
+    return stats
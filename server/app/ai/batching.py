@@ -0,0 +1,87 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+BatchRunner = Callable[[List[str]], Awaitable[List[dict]]]
+SingleRunner = Callable[[str], Awaitable[dict]]
+
+
+class MicroBatcher:
+    """
+    Collects concurrent requests for a short window (or until `max_items`
+    are waiting) and runs them as one batch, handing each caller its own
+    result. If the batch call fails, every item is retried on its own.
+    """
+
+    def __init__(self, window_ms: int, max_items: int, run_batch: BatchRunner, run_single: SingleRunner):
+        self.window = window_ms / 1000
+        self.max_items = max_items
+        self.run_batch = run_batch
+        self.run_single = run_single
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()
+        self.batches = 0
+        self.batched_items = 0
+        self.singles = 0
+        self.batch_failures = 0
+
+    async def submit(self, item: str) -> dict:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+
+        if len(self._pending) >= self.max_items:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        items, self._pending = self._pending, []
+        if not items:
+            return
+        task = asyncio.create_task(self._run(items))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, items: List[Tuple[str, asyncio.Future]]) -> None:
+        if len(items) > 1:
+            try:
+                results = await self.run_batch([item for item, _ in items])
+                self.batches += 1
+                self.batched_items += len(items)
+                for (_, future), result in zip(items, results):
+                    if not future.done():
+                        future.set_result(result)
+                return
+            except Exception as e:
+                self.batch_failures += 1
+                print(f"Error in batched triage, retrying items individually: {e}")
+
+        await asyncio.gather(*(self._run_single(item, future) for item, future in items))
+
+    async def _run_single(self, item: str, future: asyncio.Future) -> None:
+        self.singles += 1
+        try:
+            result = await self.run_single(item)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            return
+        if not future.done():
+            future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "window_ms": round(self.window * 1000),
+            "max_items": self.max_items,
+            "pending": len(self._pending),
+            "batches": self.batches,
+            "batched_items": self.batched_items,
+            "avg_batch_size": round(self.batched_items / self.batches, 2) if self.batches else 0.0,
+            "single_calls": self.singles,
+            "batch_failures": self.batch_failures,
+        }
@@ -1,11 +1,15 @@
+import asyncio
 import json
-from groq import AsyncGroq
+import re
+from typing import Any, AsyncIterator, List, Optional, Set, Tuple
 from app.core.config import settings
 from app.models.enums import IncidentCategory, ResponderType
-
-client = AsyncGroq(
-    api_key=settings.GROQ_API_KEY,
-)
+from app.utils.cache import TTLCache
+from app.ai.batching import MicroBatcher
+from app.ai.rules import classify_incident
+from app.ai.gateway import gateway
+from app.ai.metrics import ai_metrics
+from app.utils.jsonstream import JSONFieldStream
 
 SYSTEM_PROMPT = f"""
 You are an expert emergency response dispatcher AI. Your task is to analyze incoming incident descriptions and extract structured information.
@@ -31,34 +35,156 @@ Example: For "House fire", return {{"recommended_type": "fire", "reasoning": "St
 Example: For "Car crash with injuries", return {{"recommended_type": "medical", "reasoning": "Immediate medical attention required"}}
 """
 
-async def analyze_incident_description(description: str) -> dict:
+triage_cache = TTLCache(maxsize=settings.TRIAGE_CACHE_SIZE, ttl=settings.TRIAGE_CACHE_TTL_SECONDS)
+
+def triage_cache_key(description: str, location: Optional[Tuple[float, float]] = None) -> tuple:
+    """
+    Cache key for a transcript: lowercased, punctuation stripped and
+    whitespace collapsed, plus a coarse location cell when enabled.
+    """
+    normalized = " ".join(re.sub(r"[^\w\s]", " ", description.lower()).split())
+    cell = None
+    if settings.TRIAGE_CACHE_USE_LOCATION and location and None not in location:
+        size = settings.TRIAGE_CACHE_CELL_DEGREES
+        cell = (int(location[0] // size), int(location[1] // size))
+    return normalized, cell
+
+BATCH_TRIAGE_PROMPT = SYSTEM_PROMPT + """
+You will receive several incidents, each introduced by its index like "[0]".
+Analyze each one independently and output a JSON object of the form
+{"results": [{"index": 0, "priority_score": ..., "category": ..., "summary": ...}, ...]}
+with exactly one entry per incident.
+"""
+
+async def _triage_single(description: str) -> dict:
+    completion = await gateway.chat_completion(
+        operation="triage",
+        messages=[
+            {
+                "role": "system",
+                "content": SYSTEM_PROMPT
+            },
+            {
+                "role": "user",
+                "content": description,
+            }
+        ],
+        model="llama-3.3-70b-versatile",
+        temperature=0.1,
+        response_format={"type": "json_object"},
+    )
+    
+    response_content = completion.choices[0].message.content
+    return json.loads(response_content)
+
+async def _triage_batch(descriptions: List[str]) -> List[dict]:
+    """
+    Triage several incidents with one completion. Raises if the response
+    doesn't contain a result for every incident.
+    """
+    content = "\n\n".join(f"[{i}] {description}" for i, description in enumerate(descriptions))
+    completion = await gateway.chat_completion(
+        operation="triage_batch",
+        messages=[
+            {
+                "role": "system",
+                "content": BATCH_TRIAGE_PROMPT
+            },
+            {
+                "role": "user",
+                "content": content,
+            }
+        ],
+        model="llama-3.3-70b-versatile",
+        temperature=0.1,
+        response_format={"type": "json_object"},
+    )
+
+    results = json.loads(completion.choices[0].message.content)["results"]
+    by_index = {int(result.pop("index")): result for result in results}
+    if set(by_index) != set(range(len(descriptions))):
+        raise ValueError(f"Batch response covered {sorted(by_index)} of {len(descriptions)} incidents")
+    return [by_index[i] for i in range(len(descriptions))]
+
+triage_batcher = MicroBatcher(
+    window_ms=settings.TRIAGE_BATCH_WINDOW_MS,
+    max_items=settings.TRIAGE_BATCH_MAX_ITEMS,
+    run_batch=_triage_batch,
+    run_single=_triage_single,
+)
+
+async def analyze_incident_description(description: str, location: Optional[Tuple[float, float]] = None) -> dict:
+    key = triage_cache_key(description, location)
+    cached = triage_cache.get(key)
+    if cached is not None:
+        return dict(cached)
+
     try:
-        completion = await client.chat.completions.create(
-            messages=[
-                {
-                    "role": "system",
-                    "content": SYSTEM_PROMPT
-                },
-                {
-                    "role": "user",
-                    "content": description,
-                }
-            ],
-            model="llama-3.3-70b-versatile",
-            temperature=0.1,
-            response_format={"type": "json_object"},
-        )
-        
-        response_content = completion.choices[0].message.content
-        return json.loads(response_content)
+        with ai_metrics.track("triage"):
+            if settings.TRIAGE_BATCH_WINDOW_MS > 0:
+                analysis = await triage_batcher.submit(description)
+            else:
+                analysis = await _triage_single(description)
+            analysis["source"] = "llm"
+        triage_cache.set(key, analysis)
+        return dict(analysis)
     except Exception as e:
         print(f"Error analyzing incident: {e}")
-        # Fallback values
-        return {
-            "priority_score": 5,
-            "category": "suspicious_activity",
-            "summary": "Processing failed, check details."
-        }
+        # Fall back to the local rule classifier
+        return classify_incident(description)
+
+# How often each triage path ended up deciding the result
+triage_wins = {"llm": 0, "llm_with_rule_floor": 0, "rules_deadline": 0, "rules_llm_error": 0}
+
+# LLM calls that outlived their triage deadline; held here so they can finish
+_late_llm_tasks: Set[asyncio.Future] = set()
+
+def coerce_priority(value: Any) -> int:
+    """
+    The LLM's priority_score as an int; 0 when it is missing or not a number.
+    """
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+def clamp_priority(value: Any) -> int:
+    """
+    A triage priority_score ready to store: an int from 1 to 10.
+    """
+    return max(1, min(10, coerce_priority(value)))
+
+async def triage_incident(description: str, location: Optional[Tuple[float, float]] = None) -> dict:
+    """
+    Race the local rule classifier against the LLM triage.
+
+    The rules answer instantly; the LLM result is preferred if it arrives
+    within TRIAGE_LLM_DEADLINE_MS. A confident rule result still acts as a
+    priority floor so a slow or optimistic LLM can't under-rate e.g. a
+    cardiac arrest. A late LLM call keeps running and warms the cache.
+    """
+    rules = classify_incident(description)
+    llm_task = asyncio.ensure_future(analyze_incident_description(description, location))
+
+    try:
+        llm = await asyncio.wait_for(asyncio.shield(llm_task), timeout=settings.TRIAGE_LLM_DEADLINE_MS / 1000)
+    except asyncio.TimeoutError:
+        _late_llm_tasks.add(llm_task)
+        llm_task.add_done_callback(_late_llm_tasks.discard)
+        triage_wins["rules_deadline"] += 1
+        return rules
+
+    if llm.get("source") != "llm":
+        triage_wins["rules_llm_error"] += 1
+        return rules
+
+    floor = rules["priority_score"] if rules["confidence"] >= settings.TRIAGE_RULE_FLOOR_CONFIDENCE else 0
+    if floor > coerce_priority(llm.get("priority_score")):
+        triage_wins["llm_with_rule_floor"] += 1
+        return {**llm, "priority_score": floor}
+
+    triage_wins["llm"] += 1
+    return llm
 
 DETAILED_ANALYSIS_PROMPT = """
 You are an expert emergency response analyst. Analyze the incident and provide detailed operational guidance.
@@ -73,18 +199,48 @@ Output a JSON object with these fields:
 Be specific and practical. Base recommendations on the incident severity and type.
 """
 
-async def get_detailed_analysis(incident_data: dict) -> dict:
-    """
-    Get detailed operational analysis for an incident
-    """
-    try:
-        content = f"""Incident Details:
+DETAILED_ANALYSIS_FALLBACK = {
+    "situation": "Unable to analyze incident",
+    "equipment": ["Standard emergency kit"],
+    "responders_count": {"police": 1},
+    "rescue_type": "General response",
+    "instructions": ["Assess situation on arrival", "Report findings to dispatch"]
+}
+
+# Streaming variant: the fields the responders act on first come first, and
+# no JSON mode (Groq doesn't stream it), so the prompt insists on bare JSON.
+STREAMING_ANALYSIS_PROMPT = """
+You are an expert emergency response analyst. Analyze the incident and provide detailed operational guidance.
+
+Output ONLY a JSON object, no markdown or other text, with these fields in exactly this order:
+1. "situation": Brief description of what is happening (1-2 sentences)
+2. "instructions": Array of step-by-step instructions for responders (3-5 clear action items)
+3. "equipment": Array of specific equipment items needed (e.g., ["Fire extinguisher", "Thermal camera", "Hydraulic rescue tools"])
+4. "responders_count": Object with recommended personnel count per type, e.g. {"fire": 4, "medical": 2, "police": 1}
+5. "rescue_type": The primary rescue operation type (e.g., "Fire suppression", "Medical evacuation", "Search and rescue", "Traffic control")
+
+Be specific and practical. Base recommendations on the incident severity and type.
+"""
+
+ANALYSIS_FIELD_ORDER = ["situation", "instructions", "equipment", "responders_count", "rescue_type"]
+
+def detailed_analysis_content(incident_data: dict) -> str:
+    return f"""Incident Details:
 - Description: {incident_data.get('description', 'N/A')}
 - Category: {incident_data.get('category', 'unknown')}
 - Priority Score: {incident_data.get('priority', 5)}/10
 - Location: {incident_data.get('location', 'Unknown')}"""
-        
-        completion = await client.chat.completions.create(
+
+async def generate_detailed_analysis(incident_data: dict) -> dict:
+    """
+    Detailed operational analysis from the LLM. Raises on failure instead
+    of returning the fallback, so callers can tell the two apart.
+    """
+    content = detailed_analysis_content(incident_data)
+
+    with ai_metrics.track("detailed_analysis"):
+        completion = await gateway.chat_completion(
+            operation="detailed_analysis",
             messages=[
                 {
                     "role": "system",
@@ -100,24 +256,63 @@ async def get_detailed_analysis(incident_data: dict) -> dict:
             response_format={"type": "json_object"}
         )
         return json.loads(completion.choices[0].message.content)
+
+async def stream_detailed_analysis(incident_data: dict) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Detailed analysis as (field, value) pairs, each yielded as soon as the
+    model has finished generating it. Raises on failure, including a
+    response that ends without all the fields.
+    """
+    parser = JSONFieldStream()
+    seen = set()
+    with ai_metrics.track("detailed_analysis_stream"):
+        async for delta in gateway.stream_chat_completion(
+            operation="detailed_analysis_stream",
+            messages=[
+                {
+                    "role": "system",
+                    "content": STREAMING_ANALYSIS_PROMPT
+                },
+                {
+                    "role": "user",
+                    "content": detailed_analysis_content(incident_data),
+                }
+            ],
+            model="llama-3.3-70b-versatile",
+            temperature=0.2,
+        ):
+            for key, value in parser.feed(delta):
+                seen.add(key)
+                yield key, value
+        missing = set(ANALYSIS_FIELD_ORDER) - seen
+        if missing:
+            raise ValueError(f"Streamed analysis is missing {sorted(missing)}")
+
+async def get_detailed_analysis(incident_data: dict) -> dict:
+    """
+    Get detailed operational analysis for an incident
+    """
+    try:
+        return await generate_detailed_analysis(incident_data)
     except Exception as e:
         print(f"Error in detailed analysis: {e}")
-        return {
-            "situation": "Unable to analyze incident",
-            "equipment": ["Standard emergency kit"],
-            "responders_count": {"police": 1},
-            "rescue_type": "General response",
-            "instructions": ["Assess situation on arrival", "Report findings to dispatch"]
-        }
+        return dict(DETAILED_ANALYSIS_FALLBACK)
 
-async def recommend_response_unit(incident_data: dict) -> dict:
+DISPATCH_FALLBACK = {
+    "recommended_type": "police", # Default fallback
+    "reasoning": "System fallback"
+}
+
+async def generate_response_unit_recommendation(incident_data: dict) -> dict:
     """
-    incident_data should contain 'description' and/or 'category'
+    Responder type recommendation from the LLM. Raises on failure instead
+    of returning the fallback.
     """
-    try:
-        content = f"Incident Analysis: {json.dumps(incident_data)}"
-        
-        completion = await client.chat.completions.create(
+    content = f"Incident Analysis: {json.dumps(incident_data)}"
+
+    with ai_metrics.track("dispatch_recommendation"):
+        completion = await gateway.chat_completion(
+            operation="dispatch_recommendation",
             messages=[
                 {
                     "role": "system",
@@ -132,10 +327,16 @@ async def recommend_response_unit(incident_data: dict) -> dict:
             temperature=0.1,
             response_format={"type": "json_object"}
         )
-        return json.loads(completion.choices[0].message.content)
+        recommendation = json.loads(completion.choices[0].message.content)
+        ResponderType(recommendation.get("recommended_type"))
+        return recommendation
+
+async def recommend_response_unit(incident_data: dict) -> dict:
+    """
+    incident_data should contain 'description' and/or 'category'
+    """
+    try:
+        return await generate_response_unit_recommendation(incident_data)
     except Exception as e:
         print(f"Error in Dispatch recommendation: {e}")
-        return {
-            "recommended_type": "police", # Default fallback
-            "reasoning": "System fallback"
-        }
+        return dict(DISPATCH_FALLBACK)
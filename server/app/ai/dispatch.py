@@ -0,0 +1,110 @@
+from typing import Any, Dict, Optional
+from app.core.config import settings
+from app.models.enums import IncidentCategory, ResponderType
+from app.ai.client import generate_response_unit_recommendation, DISPATCH_FALLBACK
+from app.utils.cache import TTLCache
+
+# Priority bands used by the dispatch table: 1-4 low, 5-7 medium, 8-10 high
+PRIORITY_BANDS = (("low", 4), ("medium", 7), ("high", 10))
+
+_police = {"low": ResponderType.POLICE, "medium": ResponderType.POLICE, "high": ResponderType.POLICE}
+_fire = {"low": ResponderType.FIRE, "medium": ResponderType.FIRE, "high": ResponderType.FIRE}
+_medical = {"low": ResponderType.MEDICAL, "medium": ResponderType.MEDICAL, "high": ResponderType.MEDICAL}
+
+# Category x priority band -> responder type. None marks an ambiguous cell
+# where the transcript decides, and only those go to the LLM.
+DISPATCH_TABLE: Dict[IncidentCategory, Dict[str, Optional[ResponderType]]] = {
+    IncidentCategory.FIRE: _fire,
+    IncidentCategory.HAZARDOUS_MATERIAL: _fire,
+    IncidentCategory.MEDICAL_EMERGENCY: _medical,
+    IncidentCategory.OVERDOSE: _medical,
+    IncidentCategory.CRIME_IN_PROGRESS: _police,
+    IncidentCategory.DOMESTIC_VIOLENCE: _police,
+    IncidentCategory.BURGLARY: _police,
+    IncidentCategory.ROBBERY: _police,
+    IncidentCategory.SUSPICIOUS_ACTIVITY: _police,
+    IncidentCategory.MISSING_PERSON: _police,
+    IncidentCategory.PUBLIC_DISTURBANCE: _police,
+    # Injuries are likely at higher priorities
+    IncidentCategory.TRAFFIC_ACCIDENT: {"low": ResponderType.POLICE, "medium": None, "high": ResponderType.MEDICAL},
+    IncidentCategory.ASSAULT: {"low": ResponderType.POLICE, "medium": ResponderType.POLICE, "high": None},
+    IncidentCategory.WELFARE_CHECK: {"low": ResponderType.POLICE, "medium": None, "high": None},
+    # Floods, collapses and storms need fire, medical or police depending on the call
+    IncidentCategory.NATURAL_DISASTER: {"low": None, "medium": None, "high": None},
+}
+
+recommendation_cache = TTLCache(maxsize=settings.DISPATCH_CACHE_SIZE, ttl=settings.DISPATCH_CACHE_TTL_SECONDS)
+
+# How each recommendation was answered
+recommendation_sources: Dict[str, int] = {"table": 0, "cache": 0, "llm": 0, "fallback": 0}
+
+
+def priority_band(priority: Optional[int]) -> str:
+    priority = priority or settings.TRIAGE_PROVISIONAL_PRIORITY
+    for band, upper in PRIORITY_BANDS:
+        if priority <= upper:
+            return band
+    return PRIORITY_BANDS[-1][0]
+
+
+def table_recommendation(category: Optional[IncidentCategory], priority: Optional[int]) -> Optional[ResponderType]:
+    """
+    Responder type from the dispatch table, or None when the incident is
+    uncategorized or falls in an ambiguous cell.
+    """
+    if category is None:
+        return None
+    return DISPATCH_TABLE.get(category, {}).get(priority_band(priority))
+
+
+async def recommend_responder_type(category: Optional[IncidentCategory], priority: Optional[int], summary: Optional[str]) -> Dict[str, Any]:
+    """
+    Recommendation in the RecommendationResponse shape. Answered from the
+    dispatch table when possible, otherwise from the LLM with results
+    cached per (category, band, summary).
+    """
+    recommended = table_recommendation(category, priority)
+    if recommended is not None:
+        recommendation_sources["table"] += 1
+        band = priority_band(priority)
+        return {
+            "recommended_type": recommended,
+            "reasoning": f"Standard protocol for {band} priority {category.value.replace('_', ' ')}",
+        }
+
+    key = (
+        category.value if category else None,
+        priority_band(priority),
+        " ".join((summary or "").lower().split()),
+    )
+    cached = recommendation_cache.get(key)
+    if cached is not None:
+        recommendation_sources["cache"] += 1
+        return cached
+
+    context = {
+        "description": summary,
+        "category": category.value if category else "unknown",
+        "priority": priority
+    }
+    try:
+        recommendation = await generate_response_unit_recommendation(context)
+    except Exception as e:
+        print(f"Error in Dispatch recommendation: {e}")
+        recommendation_sources["fallback"] += 1
+        return dict(DISPATCH_FALLBACK)
+
+    recommendation_sources["llm"] += 1
+    recommendation_cache.set(key, recommendation)
+    return recommendation
+
+
+def recommendation_stats() -> Dict[str, Any]:
+    total = sum(recommendation_sources.values())
+    avoided = recommendation_sources["table"] + recommendation_sources["cache"]
+    return {
+        "sources": dict(recommendation_sources),
+        "llm_calls_avoided": avoided,
+        "llm_avoided_rate": round(avoided / total, 4) if total else 0.0,
+        "cache": recommendation_cache.stats(),
+    }
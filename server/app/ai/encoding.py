@@ -0,0 +1,99 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.models.enums import IncidentCategory, IncidentStatus
+from app.utils.tokens import estimate_tokens
+
+# Two-letter category codes for compact prompts
+CATEGORY_CODES: Dict[str, str] = {
+    IncidentCategory.FIRE.value: "FI",
+    IncidentCategory.MEDICAL_EMERGENCY.value: "ME",
+    IncidentCategory.TRAFFIC_ACCIDENT.value: "TA",
+    IncidentCategory.CRIME_IN_PROGRESS.value: "CR",
+    IncidentCategory.DOMESTIC_VIOLENCE.value: "DV",
+    IncidentCategory.ASSAULT.value: "AS",
+    IncidentCategory.BURGLARY.value: "BU",
+    IncidentCategory.ROBBERY.value: "RO",
+    IncidentCategory.SUSPICIOUS_ACTIVITY.value: "SU",
+    IncidentCategory.MISSING_PERSON.value: "MP",
+    IncidentCategory.OVERDOSE.value: "OD",
+    IncidentCategory.NATURAL_DISASTER.value: "ND",
+    IncidentCategory.HAZARDOUS_MATERIAL.value: "HZ",
+    IncidentCategory.PUBLIC_DISTURBANCE.value: "PD",
+    IncidentCategory.WELFARE_CHECK.value: "WC",
+}
+STATUS_CODES: Dict[str, str] = {status.value: status.value[0].upper() for status in IncidentStatus}
+
+CATEGORY_LEGEND = " ".join(f"{code}={category}" for category, code in CATEGORY_CODES.items())
+STATUS_LEGEND = " ".join(f"{code}={status}" for status, code in STATUS_CODES.items())
+
+COLUMNS = "id|cat|pri|st|lat|lng|age_min|summary"
+
+
+def epoch_minutes(value: Any) -> Optional[int]:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return int(value.timestamp() // 60) if value else None
+
+
+def _summary(incident: Dict[str, Any], words: int) -> str:
+    text = incident.get("summary") or incident.get("call", {}).get("raw_transcript") or ""
+    return " ".join(text.replace("|", "/").split()[:words])
+
+
+def _coordinate(value: Optional[float], decimals: int) -> str:
+    return "" if value is None else f"{value:.{decimals}f}"
+
+
+def encode_incidents(
+    incidents: List[Dict[str, Any]],
+    token_budget: Optional[int] = None,
+) -> Tuple[str, int]:
+    """
+    Encode incident dicts (the analytics_rows_to_dicts shape) as a compact
+    pipe-separated table for a prompt: category and status codes,
+    coordinates rounded to AI_ANALYTICS_COORD_DECIMALS, age in minutes
+    before a reference epoch minute, and a short summary instead of the
+    transcript. Rows are added in order until the token budget is spent.
+
+    Returns the table (header, legend and rows) and how many incidents it holds.
+    """
+    budget = token_budget or settings.AI_ANALYTICS_TOKEN_BUDGET
+    decimals = settings.AI_ANALYTICS_COORD_DECIMALS
+    words = settings.AI_ANALYTICS_SUMMARY_WORDS
+
+    times = [minutes for minutes in (epoch_minutes(i.get("created_at")) for i in incidents) if minutes is not None]
+    reference = max(times) if times else 0
+
+    header = [
+        f"Columns: {COLUMNS}",
+        f"cat: {CATEGORY_LEGEND} --=uncategorized",
+        f"st: {STATUS_LEGEND}",
+        f"age_min: minutes before epoch minute {reference} "
+        f"({datetime.fromtimestamp(reference * 60, timezone.utc).strftime('%Y-%m-%d %H:%M')} UTC)",
+    ]
+    lines = list(header)
+    used = estimate_tokens("\n".join(header))
+    included = 0
+
+    for incident in incidents:
+        call = incident.get("call", {})
+        minutes = epoch_minutes(incident.get("created_at"))
+        row = "|".join([
+            str(incident.get("id", "")),
+            CATEGORY_CODES.get(incident.get("category"), "--"),
+            str(incident.get("priority_score") or ""),
+            STATUS_CODES.get(incident.get("status"), ""),
+            _coordinate(call.get("location_lat"), decimals),
+            _coordinate(call.get("location_long"), decimals),
+            "" if minutes is None else str(reference - minutes),
+            _summary(incident, words),
+        ])
+        cost = estimate_tokens(row) + 1
+        if used + cost > budget:
+            break
+        lines.append(row)
+        used += cost
+        included += 1
+
+    return "\n".join(lines), included
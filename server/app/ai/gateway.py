@@ -0,0 +1,313 @@
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+from groq import RateLimitError
+from app.core.config import settings
+from app.ai.metrics import ai_metrics
+from app.ai.backends import CompletionUsage, ReplayMissError, backend_stats, build_backend, make_completion
+from app.utils.tokens import estimate_tokens
+
+
+class AIUnavailableError(Exception):
+    """
+    Raised instead of calling the LLM when the circuit breaker is open or no
+    key can take a request in time. Callers should go to their fallback.
+    """
+
+
+class TokenBucket:
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or max(1.0, rate_per_minute / 6)  # ~10s burst
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def available(self) -> float:
+        self._refill()
+        return self.tokens
+
+    def try_acquire(self) -> bool:
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def wait_time(self) -> float:
+        self._refill()
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive failures; after `reset_seconds` a
+    single trial call is let through (half-open) and closes it on success.
+    """
+
+    def __init__(self, threshold: int, reset_seconds: float):
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_in_flight = False
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self.trial_in_flight:
+            self.trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self.trial_in_flight = False
+        if self.opened_at is not None or self.failures >= self.threshold:
+            if self.opened_at is None:
+                self.times_opened += 1
+            self.opened_at = time.monotonic()
+
+
+def retry_after_seconds(error: RateLimitError) -> float:
+    """
+    Cooldown from a 429's Retry-After header. Only the delta-seconds form is
+    used; an HTTP-date or garbage falls back to AI_RATE_LIMIT_COOLDOWN_SECONDS.
+    """
+    value = error.response.headers.get("retry-after") if error.response is not None else None
+    try:
+        seconds = float(value)
+    except (TypeError, ValueError):
+        return settings.AI_RATE_LIMIT_COOLDOWN_SECONDS
+    return seconds if seconds >= 0 else settings.AI_RATE_LIMIT_COOLDOWN_SECONDS
+
+
+class KeySlot:
+    def __init__(self, api_key: str, requests_per_minute: float):
+        self.label = f"...{api_key[-4:]}" if api_key else "(empty)"
+        self.backend = build_backend(api_key)
+        self.bucket = TokenBucket(requests_per_minute)
+        self.cooldown_until = 0.0
+        self.in_flight = 0
+        self.requests = 0
+        self.rate_limited = 0
+
+    def ready(self) -> bool:
+        return time.monotonic() >= self.cooldown_until
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "key": self.label,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "rate_limited": self.rate_limited,
+            "tokens_available": round(self.bucket.available(), 2),
+            "cooling_down": not self.ready(),
+        }
+
+
+class AIGateway:
+    """
+    Single entry point for all AI completions: spreads calls over a pool
+    of API keys with per-key request token buckets, caps global concurrency
+    and trips a circuit breaker on repeated failures.
+    """
+
+    def __init__(self, api_keys: List[str]):
+        self.slots = [KeySlot(key, settings.AI_KEY_REQUESTS_PER_MINUTE) for key in api_keys] or [
+            KeySlot("", settings.AI_KEY_REQUESTS_PER_MINUTE)
+        ]
+        self.semaphore = asyncio.Semaphore(settings.AI_MAX_CONCURRENCY)
+        self.breaker = CircuitBreaker(settings.AI_BREAKER_FAILURE_THRESHOLD, settings.AI_BREAKER_RESET_SECONDS)
+        self.in_flight = 0
+        self.rejected = 0
+
+    async def _acquire_slot(self) -> KeySlot:
+        deadline = time.monotonic() + settings.AI_MAX_QUEUE_WAIT_SECONDS
+        while True:
+            ready = [slot for slot in self.slots if slot.ready()]
+            # Least loaded key with a token available
+            for slot in sorted(ready, key=lambda s: (-s.bucket.available(), s.in_flight)):
+                if slot.bucket.try_acquire():
+                    return slot
+
+            now = time.monotonic()
+            waits = [slot.bucket.wait_time() for slot in ready] or [
+                min(slot.cooldown_until for slot in self.slots) - now
+            ]
+            wait = max(0.01, min(waits))
+            if now + wait > deadline:
+                raise AIUnavailableError("All AI keys are rate limited")
+            await asyncio.sleep(wait)
+
+    async def chat_completion(self, operation: str = "other", **kwargs) -> Any:
+        """
+        Same arguments as `AsyncGroq().chat.completions.create`, plus the
+        `operation` name the call is recorded under in `ai_metrics`.
+        """
+        model = kwargs.get("model", "unknown")
+        if not self.breaker.allow():
+            self.rejected += 1
+            ai_metrics.record_rejected(operation)
+            raise AIUnavailableError("AI circuit breaker is open")
+
+        # Whoever holds the half-open trial must give it back however the
+        # call ends: cancellation, a 429 or a replay miss say nothing about
+        # the service, and a stuck flag would keep the breaker open forever
+        trial = self.breaker.trial_in_flight
+        try:
+            async with self.semaphore:
+                try:
+                    slot = await self._acquire_slot()
+                except AIUnavailableError:
+                    self.rejected += 1
+                    ai_metrics.record_rejected(operation)
+                    raise
+
+                slot.in_flight += 1
+                slot.requests += 1
+                self.in_flight += 1
+                started = time.perf_counter()
+                try:
+                    completion = await slot.backend.create(operation, **kwargs)
+                    ai_metrics.record_completion(
+                        operation, getattr(completion, "model", None) or model,
+                        (time.perf_counter() - started) * 1000, completion,
+                    )
+                except RateLimitError as e:
+                    # The key is exhausted, not the service: rest this key only
+                    slot.rate_limited += 1
+                    ai_metrics.record_error(operation, model, (time.perf_counter() - started) * 1000)
+                    slot.cooldown_until = time.monotonic() + retry_after_seconds(e)
+                    raise
+                except ReplayMissError:
+                    # Nothing recorded for this request, the service is fine
+                    ai_metrics.record_error(operation, model, (time.perf_counter() - started) * 1000)
+                    raise
+                except Exception:
+                    ai_metrics.record_error(operation, model, (time.perf_counter() - started) * 1000)
+                    self.breaker.record_failure()
+                    raise
+                finally:
+                    slot.in_flight -= 1
+                    self.in_flight -= 1
+
+            self.breaker.record_success()
+            return completion
+        finally:
+            if trial:
+                self.breaker.trial_in_flight = False
+
+    async def stream_chat_completion(self, operation: str = "other", **kwargs) -> AsyncIterator[str]:
+        """
+        Streaming variant of `chat_completion`: yields the content as it is
+        generated. Admission, key rotation and the breaker work the same.
+        """
+        model = kwargs.get("model", "unknown")
+        if not self.breaker.allow():
+            self.rejected += 1
+            ai_metrics.record_rejected(operation)
+            raise AIUnavailableError("AI circuit breaker is open")
+
+        # Whoever holds the half-open trial must give it back however the
+        # call ends: cancellation, a 429 or a replay miss say nothing about
+        # the service, and a stuck flag would keep the breaker open forever
+        trial = self.breaker.trial_in_flight
+        try:
+            async with self.semaphore:
+                try:
+                    slot = await self._acquire_slot()
+                except AIUnavailableError:
+                    self.rejected += 1
+                    ai_metrics.record_rejected(operation)
+                    raise
+
+                slot.in_flight += 1
+                slot.requests += 1
+                self.in_flight += 1
+                started = time.perf_counter()
+                parts: List[str] = []
+                usage: Optional[CompletionUsage] = None
+                try:
+                    async for item in slot.backend.stream(operation, **kwargs):
+                        if isinstance(item, CompletionUsage):
+                            usage = item
+                            continue
+                        if not parts:
+                            ai_metrics.record_first_token(operation, (time.perf_counter() - started) * 1000)
+                        parts.append(item)
+                        yield item
+                except RateLimitError as e:
+                    slot.rate_limited += 1
+                    ai_metrics.record_error(operation, model, (time.perf_counter() - started) * 1000)
+                    slot.cooldown_until = time.monotonic() + retry_after_seconds(e)
+                    raise
+                except ReplayMissError:
+                    ai_metrics.record_error(operation, model, (time.perf_counter() - started) * 1000)
+                    raise
+                except Exception:
+                    ai_metrics.record_error(operation, model, (time.perf_counter() - started) * 1000)
+                    self.breaker.record_failure()
+                    raise
+                finally:
+                    slot.in_flight -= 1
+                    self.in_flight -= 1
+
+            self.breaker.record_success()
+            content = "".join(parts)
+            ai_metrics.record_completion(
+                operation, model, (time.perf_counter() - started) * 1000,
+                make_completion(
+                    model, content,
+                    usage.prompt_tokens if usage else 0,
+                    usage.completion_tokens if usage else estimate_tokens(content),
+                ),
+            )
+        finally:
+            if trial:
+                self.breaker.trial_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "breaker": {
+                "state": self.breaker.state,
+                "consecutive_failures": self.breaker.failures,
+                "times_opened": self.breaker.times_opened,
+            },
+            "max_concurrency": settings.AI_MAX_CONCURRENCY,
+            "in_flight": self.in_flight,
+            "rejected": self.rejected,
+            "backend": backend_stats(),
+            "keys": [slot.stats() for slot in self.slots],
+        }
+
+
+def configured_api_keys() -> List[str]:
+    keys = [settings.GROQ_API_KEY, settings.GROQ_API_KEY2, *settings.GROQ_API_KEYS.split(",")]
+    unique = []
+    for key in (k.strip() for k in keys):
+        if key and key not in unique:
+            unique.append(key)
+    return unique
+
+
+gateway = AIGateway(configured_api_keys())
@@ -0,0 +1,124 @@
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, List
+from app.utils.stats import LatencyWindow
+
+# Upper bounds (ms) of the completion latency histogram buckets
+LATENCY_BUCKETS_MS: List[float] = [100, 250, 500, 1000, 2000, 4000, 8000, 16000, float("inf")]
+
+# Outcomes per AI operation:
+#   success        the completion was parsed and used
+#   parse_failure  a completion arrived but was unusable, the fallback was used
+#   fallback       the call failed or was refused, the fallback was used
+OUTCOMES = ("success", "parse_failure", "fallback")
+
+PARSE_ERRORS = (ValueError, KeyError, TypeError, IndexError, AttributeError)
+
+
+class OperationMetrics:
+    def __init__(self):
+        self.latency = LatencyWindow()
+        self.first_token = LatencyWindow()  # streamed calls only
+        self.buckets = [0] * len(LATENCY_BUCKETS_MS)
+        self.calls = Counter()  # completed / error / rejected
+        self.models = Counter()
+        self.outcomes = Counter()
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.latency_total_ms = 0.0
+
+    def observe(self, latency_ms: float) -> None:
+        self.latency.add(latency_ms)
+        self.latency_total_ms += latency_ms
+        for i, upper in enumerate(LATENCY_BUCKETS_MS):
+            if latency_ms <= upper:
+                self.buckets[i] += 1
+                break
+
+    def snapshot(self) -> Dict[str, Any]:
+        completed = self.calls["completed"]
+        outcomes = sum(self.outcomes.values())
+        return {
+            "calls": dict(self.calls),
+            "latency": self.latency.snapshot(),
+            "latency_total_ms": round(self.latency_total_ms, 2),
+            "time_to_first_token": self.first_token.snapshot(),
+            "latency_histogram_ms": {
+                ("+Inf" if upper == float("inf") else str(int(upper))): count
+                for upper, count in zip(LATENCY_BUCKETS_MS, self.buckets)
+            },
+            "tokens": {
+                "prompt": self.prompt_tokens,
+                "completion": self.completion_tokens,
+                "total": self.prompt_tokens + self.completion_tokens,
+                "avg_per_call": round((self.prompt_tokens + self.completion_tokens) / completed, 1) if completed else 0.0,
+            },
+            "models": dict(self.models),
+            "outcomes": {outcome: self.outcomes[outcome] for outcome in OUTCOMES},
+            "fallback_rate": round((outcomes - self.outcomes["success"]) / outcomes, 4) if outcomes else 0.0,
+        }
+
+
+class AIMetrics:
+    """
+    Per-operation counters for the AI layer. The gateway records every
+    completion (latency, tokens, model); callers record what came of it
+    with `track()`.
+    """
+
+    def __init__(self):
+        self.operations: Dict[str, OperationMetrics] = {}
+
+    def _operation(self, operation: str) -> OperationMetrics:
+        metrics = self.operations.get(operation)
+        if metrics is None:
+            metrics = self.operations[operation] = OperationMetrics()
+        return metrics
+
+    def record_completion(self, operation: str, model: str, latency_ms: float, completion: Any) -> None:
+        metrics = self._operation(operation)
+        metrics.calls["completed"] += 1
+        metrics.models[model] += 1
+        metrics.observe(latency_ms)
+        usage = getattr(completion, "usage", None)
+        if usage is not None:
+            metrics.prompt_tokens += getattr(usage, "prompt_tokens", 0) or 0
+            metrics.completion_tokens += getattr(usage, "completion_tokens", 0) or 0
+
+    def record_first_token(self, operation: str, latency_ms: float) -> None:
+        self._operation(operation).first_token.add(latency_ms)
+
+    def record_error(self, operation: str, model: str, latency_ms: float) -> None:
+        metrics = self._operation(operation)
+        metrics.calls["error"] += 1
+        metrics.models[model] += 1
+        metrics.observe(latency_ms)
+
+    def record_rejected(self, operation: str) -> None:
+        self._operation(operation).calls["rejected"] += 1
+
+    def record_outcome(self, operation: str, outcome: str) -> None:
+        self._operation(operation).outcomes[outcome] += 1
+
+    @contextmanager
+    def track(self, operation: str):
+        """
+        Record the outcome of the enclosed completion-and-parse block:
+        success if it exits normally, parse_failure or fallback (by
+        exception type) if it raises. The exception is re-raised.
+        """
+        try:
+            yield
+        except PARSE_ERRORS:
+            self.record_outcome(operation, "parse_failure")
+            raise
+        except Exception:
+            self.record_outcome(operation, "fallback")
+            raise
+        self.record_outcome(operation, "success")
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {name: metrics.snapshot() for name, metrics in sorted(self.operations.items())}
+
+
+ai_metrics = AIMetrics()
@@ -0,0 +1,133 @@
+import re
+from typing import Dict, List, Tuple
+from app.models.enums import IncidentCategory
+
+# Keyword rules per category: (patterns, base priority). Patterns are
+# matched as whole words against the lowercased transcript. Words that
+# mostly describe who is involved ("husband", "elderly") rather than what
+# happened are only matched as part of a phrase.
+CATEGORY_RULES: Dict[IncidentCategory, Tuple[List[str], int]] = {
+    IncidentCategory.FIRE: (
+        ["fire", "smoke", "burning", "blaze", "sparks?"], 8),
+    IncidentCategory.MEDICAL_EMERGENCY: (
+        ["bleeding", "injured", "ambulance", "pregnant", "labou?r", "fainted", "fell down", "fallen"], 8),
+    IncidentCategory.TRAFFIC_ACCIDENT: (
+        ["accident", "crash(ed)?", "collided", "collision", "hit by a (car|bus|truck|bike)",
+         "overturned", "pile ?up", "run over"], 7),
+    IncidentCategory.CRIME_IN_PROGRESS: (
+        ["break(ing)? in", "gun", "armed", "kidnapp?(ing|ed)", "attacking (me|us|him|her|them|people)",
+         "under attack"], 9),
+    IncidentCategory.DOMESTIC_VIOLENCE: (
+        ["(husband|wife|boyfriend|girlfriend|partner) (is )?(hit(s|ting)?|beat(s|ing)?|hurt(s|ing)?|"
+         "attack(s|ed|ing)|threaten(s|ed|ing)|chok(es|ed|ing))( me)?",
+         "beating me", "hitting me", "domestic", "abus(e|ing|ive)"], 7),
+    IncidentCategory.ASSAULT: (
+        ["assault(ed)?", "beaten", "beat up", "punched", "fight(ing)?", "attacked"], 7),
+    IncidentCategory.BURGLARY: (
+        ["burglar(y|s)?", "broke in", "broken into", "break-in", "stolen from (my|the) (house|home|shop)"], 5),
+    IncidentCategory.ROBBERY: (
+        ["robb(ed|ery|ing)", "mugg(ed|ing)", "snatched", "hold ?up", "stole my"], 6),
+    IncidentCategory.SUSPICIOUS_ACTIVITY: (
+        ["suspicious", "loitering", "strange (man|person|vehicle)", "unattended (bag|package)"], 3),
+    IncidentCategory.MISSING_PERSON: (
+        ["missing", "lost (child|kid|boy|girl)", "can't find (my|our)", "cannot find (my|our)",
+         "wandering", "disappeared"], 6),
+    IncidentCategory.OVERDOSE: (
+        ["too many pills", "drugs?", "poison(ed|ing)?", "swallowed"], 8),
+    IncidentCategory.NATURAL_DISASTER: (
+        ["flood(ing|ed)?", "earthquake", "landslide", "cyclone", "tsunami", "storm", "tree fell",
+         "building collapse", "collapsed building"], 8),
+    IncidentCategory.HAZARDOUS_MATERIAL: (
+        ["chemical", "toxic", "fumes", "hazmat", "spill", "power lines?", "live wire"], 8),
+    IncidentCategory.PUBLIC_DISTURBANCE: (
+        ["loud music", "noise", "party", "drunk", "brawl", "crowd", "protest", "nuisance"], 3),
+    IncidentCategory.WELFARE_CHECK: (
+        ["welfare check", "haven't heard from", "not answering", "check on", "hasn't been seen",
+         "dehydrated"], 4),
+}
+
+# Life threats name what is happening, so each hit counts LIFE_THREAT_WEIGHT
+# keyword hits: a cardiac arrest called in about an elderly relative living
+# alone is a medical emergency, not a welfare check
+LIFE_THREAT_WEIGHT = 3
+LIFE_THREATS: Dict[IncidentCategory, List[str]] = {
+    IncidentCategory.FIRE: [
+        "on fire", "flames?", "explosion", "house fire", "building fire"],
+    IncidentCategory.MEDICAL_EMERGENCY: [
+        "heart attack", "cardiac( arrest)?", "chest pains?", "not breathing", "can'?t breathe",
+        "cannot breathe", "trouble breathing", "no pulse", "unconscious", "unresponsive", "collapsed",
+        "seizures?", "having a fit", "stroke", "choking"],
+    IncidentCategory.CRIME_IN_PROGRESS: [
+        "shooting", "shooter", "gunman", "gunfire", "gun ?shots?", "shots? (fired|being fired)",
+        "(fired|firing|fire) (a )?(gun|shots?|at)", "open(ed|ing)? fire", "(been|was|got|is) shot",
+        "shot (at|him|her|them|someone|somebody|me|my)", "hostage", "stabb(ing|ed)"],
+    IncidentCategory.OVERDOSE: [
+        "overdos(e|ed|ing)", "od'?d"],
+    IncidentCategory.HAZARDOUS_MATERIAL: [
+        "gas leak", "leaking gas", "smell (of )?gas"],
+}
+
+# Phrases that raise the priority regardless of category
+ESCALATORS: List[Tuple[str, int]] = [
+    (r"not breathing|unresponsive|no pulse|cardiac arrest", 2),
+    (r"chest pain|trouble breathing|collapsed|unconscious", 1),
+    (r"trapped|stuck inside|can't get out|cannot get out", 2),
+    (r"gun|shot|stabb|knife|weapon", 2),
+    (r"child(ren)?|baby|infant|kid", 1),
+    (r"multiple|several|many people|everyone", 1),
+    (r"bleeding|blood", 1),
+    (r"spreading|everywhere|getting worse", 1),
+]
+
+DEFAULT_CATEGORY = IncidentCategory.SUSPICIOUS_ACTIVITY
+DEFAULT_PRIORITY = 5
+
+_CATEGORY_PATTERNS = {
+    category: re.compile(r"\b(?:" + "|".join(patterns) + r")\b")
+    for category, (patterns, _) in CATEGORY_RULES.items()
+}
+_LIFE_THREAT_PATTERNS = {
+    category: re.compile(r"\b(?:" + "|".join(patterns) + r")\b")
+    for category, patterns in LIFE_THREATS.items()
+}
+_ESCALATOR_PATTERNS = [(re.compile(r"\b(?:" + pattern + r")"), boost) for pattern, boost in ESCALATORS]
+
+
+def classify_incident(description: str) -> dict:
+    """
+    Deterministic keyword triage. Same output shape as the LLM triage plus
+    a rough `confidence` in [0, 1] and `source: "rules"`.
+    """
+    text = description.lower()
+
+    best_category = None
+    best_hits = 0
+    for category, pattern in _CATEGORY_PATTERNS.items():
+        hits = len(pattern.findall(text))
+        if category in _LIFE_THREAT_PATTERNS:
+            hits += LIFE_THREAT_WEIGHT * len(_LIFE_THREAT_PATTERNS[category].findall(text))
+        # Ties go to the higher base priority (safer)
+        if hits > best_hits or (hits and hits == best_hits and CATEGORY_RULES[category][1] > CATEGORY_RULES[best_category][1]):
+            best_category, best_hits = category, hits
+
+    if best_category is None:
+        priority = DEFAULT_PRIORITY
+        confidence = 0.0
+        category = DEFAULT_CATEGORY
+    else:
+        priority = CATEGORY_RULES[best_category][1]
+        confidence = min(1.0, 0.5 + 0.2 * best_hits)
+        category = best_category
+
+    for pattern, boost in _ESCALATOR_PATTERNS:
+        if pattern.search(text):
+            priority += boost
+
+    summary = " ".join(description.split()[:15])
+    return {
+        "priority_score": max(1, min(10, priority)),
+        "category": category.value,
+        "summary": summary,
+        "confidence": round(confidence, 2),
+        "source": "rules",
+    }
@@ -0,0 +1,208 @@
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+from sqlalchemy import desc, select, update
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.events import incident_events
+from app.models.models import Incident, EmergencyCall
+from app.models.enums import IncidentCategory, IncidentStatus
+from app.ai.client import triage_incident, triage_cache, triage_batcher, triage_wins, clamp_priority
+from app.ai.rules import classify_incident
+from app.ai.gateway import gateway
+from app.crud.analysis import invalidate_analysis, prewarm_analysis
+from app.utils.stats import LatencyWindow
+
+
+def provisional_analysis(description: str) -> dict:
+    """
+    Values stored on an incident before the AI triage has run: the rule
+    classifier's priority, but no category so the incident still reads
+    as untriaged.
+    """
+    rules = classify_incident(description)
+    return {
+        "priority_score": rules["priority_score"],
+        "category": None,
+        "summary": description[:200],
+    }
+
+
+def coerce_category(value: Any) -> Optional[IncidentCategory]:
+    try:
+        return IncidentCategory(value)
+    except ValueError:
+        return None
+
+
+class TriageQueue:
+    """
+    Bounded queue of incidents waiting for AI triage, drained by a fixed
+    pool of background workers.
+    """
+
+    def __init__(self, workers: int, maxsize: int):
+        self.workers = workers
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._tasks: List[asyncio.Task] = []
+        self._feeders: Set[asyncio.Task] = set()
+        self.backlog = 0
+        self.active = 0
+        self.processed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.recovered = 0
+        self.wait_latency = LatencyWindow()
+        self.triage_latency = LatencyWindow()
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"triage-worker-{n}")
+            for n in range(self.workers)
+        ]
+        await self.recover()
+
+    async def recover(self) -> None:
+        """
+        Re-queue pending incidents that still have no category: the queue
+        only lives in memory, so whatever was waiting or in flight when the
+        process last stopped would otherwise keep its provisional triage.
+        """
+        if settings.TRIAGE_RECOVER_LIMIT <= 0:
+            return
+        try:
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(
+                    select(Incident.id, EmergencyCall.raw_transcript)
+                    .join(EmergencyCall, Incident.call_id == EmergencyCall.call_id)
+                    .where(Incident.category.is_(None), Incident.status == IncidentStatus.PENDING)
+                    .order_by(desc(Incident.priority_score), Incident.created_at)
+                    .limit(settings.TRIAGE_RECOVER_LIMIT)
+                )
+                items = [(incident_id, transcript or "") for incident_id, transcript in result.all()]
+        except Exception as e:
+            print(f"Error recovering untriaged incidents: {e}")
+            return
+        self.recovered += len(items)
+        self.submit_backlog(items)
+
+    async def stop(self) -> None:
+        tasks = [*self._tasks, *self._feeders]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+        self._feeders = set()
+        self.backlog = 0
+
+    def has_capacity(self) -> bool:
+        return self.running and not self.queue.full()
+
+    def submit(self, incident_id: int, description: str, location: Optional[Tuple[float, float]] = None) -> bool:
+        """
+        Queue an incident for triage. Returns False when the queue is full
+        so the caller can fall back to triaging inline.
+        """
+        if not self.running:
+            return False
+        try:
+            self.queue.put_nowait((incident_id, description, location, True, time.perf_counter()))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            return False
+        return True
+
+    def submit_backlog(self, items: List[Tuple[int, str]]) -> None:
+        """
+        Queue a large batch (e.g. a bulk import) for triage in the background.
+        Items are fed in as workers free up instead of being rejected when
+        the queue is full.
+        """
+        if not items:
+            return
+        self.backlog += len(items)
+        task = asyncio.create_task(self._feed(items))
+        self._feeders.add(task)
+        task.add_done_callback(self._feeders.discard)
+
+    async def _feed(self, items: List[Tuple[int, str]]) -> None:
+        for incident_id, description in items:
+            await self.queue.put((incident_id, description, None, False, time.perf_counter()))
+            self.backlog -= 1
+
+    async def _worker(self) -> None:
+        while True:
+            incident_id, description, location, live, enqueued_at = await self.queue.get()
+            started_at = time.perf_counter()
+            self.wait_latency.add((started_at - enqueued_at) * 1000)
+            self.active += 1
+            try:
+                await self.triage(incident_id, description, location, prewarm=live)
+                self.processed += 1
+            except Exception as e:
+                self.failed += 1
+                print(f"Error in background triage for incident {incident_id}: {e}")
+            finally:
+                self.active -= 1
+                self.triage_latency.add((time.perf_counter() - started_at) * 1000)
+                self.queue.task_done()
+
+    async def triage(self, incident_id: int, description: str, location: Optional[Tuple[float, float]] = None,
+                     prewarm: bool = True) -> Dict[str, Any]:
+        """
+        Run the AI triage for one incident and store the result. Backlog
+        items (bulk imports) skip the analysis pre-warm: nobody is about to
+        open them, and they would crowd out live submissions.
+        """
+        analysis = await triage_incident(description, location)
+        values = {
+            "priority_score": clamp_priority(analysis.get("priority_score", settings.TRIAGE_PROVISIONAL_PRIORITY)),
+            "category": coerce_category(analysis.get("category")),
+            "summary": analysis.get("summary", description),
+        }
+
+        async with AsyncSessionLocal() as session:
+            await session.execute(
+                update(Incident).where(Incident.id == incident_id).values(**values)
+            )
+            # Category and priority changed, any stored detailed analysis is stale
+            await invalidate_analysis(session, incident_id)
+            await session.commit()
+
+        incident_events.publish("incident.updated", {"id": incident_id, **values})
+        if prewarm:
+            prewarm_analysis(incident_id, values["priority_score"])
+        return values
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": settings.TRIAGE_MODE,
+            "running": self.running,
+            "queue_depth": self.queue.qsize(),
+            "queue_capacity": self.queue.maxsize,
+            "backlog": self.backlog,
+            "workers": self.workers,
+            "active_workers": self.active,
+            "processed": self.processed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "recovered": self.recovered,
+            "queue_wait": self.wait_latency.snapshot(),
+            "triage_latency": self.triage_latency.snapshot(),
+            "cache": triage_cache.stats(),
+            "batching": triage_batcher.stats(),
+            "wins": dict(triage_wins),
+            "gateway": gateway.stats(),
+        }
+
+
+triage_queue = TriageQueue(
+    workers=settings.TRIAGE_WORKERS,
+    maxsize=settings.TRIAGE_QUEUE_SIZE,
+)
@@ -1,19 +1,73 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
+from sqlalchemy import select, desc, func
 from app.core.database import get_db
-from app.models.models import Incident
+from app.models.models import Incident, EmergencyCall
+from app.core.config import settings
 from app.ai.analytics import analyze_incident_clusters, generate_risk_predictions
+from app.crud.geo import location_filters
+from app.utils.tiles import parse_bbox
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
-from sqlalchemy.orm import joinedload
 
 router = APIRouter()
 
+# Columns the AI analytics need, selected as plain rows instead of ORM objects
+ANALYTICS_COLUMNS = (
+    Incident.id,
+    Incident.category,
+    Incident.priority_score,
+    Incident.created_at,
+    Incident.status,
+    Incident.summary,
+    EmergencyCall.location_lat,
+    EmergencyCall.location_long,
+    # Only needed when an incident has no summary
+    func.substr(EmergencyCall.raw_transcript, 1, 200).label("raw_transcript"),
+)
+
+def analytics_rows_to_dicts(rows) -> List[Dict[str, Any]]:
+    return [
+        {
+            "id": id,
+            "category": category.value if category else None,
+            "priority_score": priority_score,
+            "created_at": created_at.isoformat(),
+            "status": status.value,
+            "summary": summary,
+            "call": {
+                "location_lat": location_lat,
+                "location_long": location_long,
+                "raw_transcript": raw_transcript
+            }
+        }
+        for id, category, priority_score, created_at, status, summary, location_lat, location_long, raw_transcript in rows
+    ]
+
+def area_filters(bbox: Optional[str], latitude: Optional[float], longitude: Optional[float], radius_km: Optional[float]) -> list:
+    """
+    Database filters restricting the analysis to a viewport and/or a
+    circle, so only incidents in the area are loaded.
+    """
+    bounds = None
+    if bbox:
+        try:
+            bounds = parse_bbox(bbox)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    return location_filters(
+        EmergencyCall.location_lat, EmergencyCall.location_long,
+        bounds=bounds, latitude=latitude, longitude=longitude, radius_km=radius_km,
+    )
+
 @router.get("/clusters")
 async def get_incident_clusters(
     category: Optional[str] = Query(None),
     days_back: int = Query(7, description="Number of days to look back for clustering"),
+    bbox: Optional[str] = Query(None, description="Only incidents in this area, as west,south,east,north"),
+    latitude: Optional[float] = Query(None, ge=-90, le=90),
+    longitude: Optional[float] = Query(None, ge=-180, le=180),
+    radius_km: Optional[float] = Query(None, gt=0, description="Only incidents within this distance of latitude/longitude"),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -24,11 +78,11 @@ async def get_incident_clusters(
     cutoff_date = datetime.utcnow() - timedelta(days=days_back)
     
     query = (
-        select(Incident)
-        .options(joinedload(Incident.call))
-        .where(Incident.created_at >= cutoff_date)
+        select(*ANALYTICS_COLUMNS)
+        .join(EmergencyCall, Incident.call_id == EmergencyCall.call_id)
+        .where(Incident.created_at >= cutoff_date, *area_filters(bbox, latitude, longitude, radius_km))
         .order_by(desc(Incident.created_at))
-        .limit(50)  # Limit for performance
+        .limit(settings.ANALYTICS_CLUSTER_MAX_INCIDENTS)  # the prompt keeps as many as its token budget allows
     )
     
     if category:
@@ -40,31 +94,16 @@ async def get_incident_clusters(
             pass  # Invalid category, ignore filter
     
     result = await db.execute(query)
-    incidents = result.scalars().all()
     
     # Convert to dict format for AI analysis
-    incidents_data = []
-    for incident in incidents:
-        incidents_data.append({
-            "id": incident.id,
-            "category": incident.category.value if incident.category else None,
-            "priority_score": incident.priority_score,
-            "created_at": incident.created_at.isoformat(),
-            "status": incident.status.value,
-            "summary": incident.summary,
-            "call": {
-                "location_lat": incident.call.location_lat,
-                "location_long": incident.call.location_long,
-                "raw_transcript": incident.call.raw_transcript
-            }
-        })
+    incidents_data = analytics_rows_to_dicts(result.all())
     
     # Use AI to analyze and create clusters
-    clusters = await analyze_incident_clusters(incidents_data)
+    clusters, analyzed = await analyze_incident_clusters(incidents_data)
     
     return {
         "clusters": clusters,
-        "total_incidents_analyzed": len(incidents_data),
+        "total_incidents_analyzed": analyzed,
         "analysis_period_days": days_back,
         "timestamp": datetime.utcnow().isoformat()
     }
@@ -72,6 +111,10 @@ async def get_incident_clusters(
 @router.get("/predictions")
 async def get_risk_predictions(
     hours_ahead: int = Query(24, description="Hours ahead to predict"),
+    bbox: Optional[str] = Query(None, description="Only incidents in this area, as west,south,east,north"),
+    latitude: Optional[float] = Query(None, ge=-90, le=90),
+    longitude: Optional[float] = Query(None, ge=-180, le=180),
+    radius_km: Optional[float] = Query(None, gt=0, description="Only incidents within this distance of latitude/longitude"),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -82,40 +125,25 @@ async def get_risk_predictions(
     cutoff_date = datetime.utcnow() - timedelta(days=30)
     
     query = (
-        select(Incident)
-        .options(joinedload(Incident.call))
-        .where(Incident.created_at >= cutoff_date)
+        select(*ANALYTICS_COLUMNS)
+        .join(EmergencyCall, Incident.call_id == EmergencyCall.call_id)
+        .where(Incident.created_at >= cutoff_date, *area_filters(bbox, latitude, longitude, radius_km))
         .order_by(desc(Incident.created_at))
-        .limit(100)  # More data for better predictions
+        .limit(settings.ANALYTICS_PREDICTION_MAX_INCIDENTS)  # More data for better predictions
     )
     
     result = await db.execute(query)
-    incidents = result.scalars().all()
     
     # Convert to dict format for AI analysis
-    historical_data = []
-    for incident in incidents:
-        historical_data.append({
-            "id": incident.id,
-            "category": incident.category.value if incident.category else None,
-            "priority_score": incident.priority_score,
-            "created_at": incident.created_at.isoformat(),
-            "status": incident.status.value,
-            "summary": incident.summary,
-            "call": {
-                "location_lat": incident.call.location_lat,
-                "location_long": incident.call.location_long,
-                "raw_transcript": incident.call.raw_transcript
-            }
-        })
+    historical_data = analytics_rows_to_dicts(result.all())
     
     # Use AI to generate predictions
-    predictions = await generate_risk_predictions(historical_data)
+    predictions, analyzed = await generate_risk_predictions(historical_data)
     
     return {
         "predictions": predictions,
         "prediction_horizon_hours": hours_ahead,
-        "based_on_incidents": len(historical_data),
+        "based_on_incidents": analyzed,
         "generated_at": datetime.utcnow().isoformat()
     }
 
@@ -129,49 +157,41 @@ async def get_analytics_summary(db: AsyncSession = Depends(get_db)):
     # Last 7 days  
     last_7d = datetime.utcnow() - timedelta(days=7)
     
-    # Query recent incidents
-    recent_query = (
-        select(Incident)
+    # Aggregate in the database instead of loading every incident
+    totals_query = select(
+        func.count().filter(Incident.created_at >= last_24h),
+        func.count(),
+        func.coalesce(func.avg(Incident.priority_score).filter(Incident.created_at >= last_24h), 0),
+        func.coalesce(func.avg(Incident.priority_score), 0),
+    ).where(Incident.created_at >= last_7d)
+
+    status_query = (
+        select(Incident.status, func.count())
         .where(Incident.created_at >= last_24h)
+        .group_by(Incident.status)
     )
-    
-    weekly_query = (
-        select(Incident)
-        .where(Incident.created_at >= last_7d)
+
+    category_query = (
+        select(Incident.category, func.count())
+        .where(Incident.created_at >= last_7d, Incident.category.is_not(None))
+        .group_by(Incident.category)
+        .order_by(desc(func.count()))
     )
-    
-    recent_result = await db.execute(recent_query)
-    weekly_result = await db.execute(weekly_query)
-    
-    recent_incidents = recent_result.scalars().all()
-    weekly_incidents = weekly_result.scalars().all()
-    
-    # Calculate metrics
-    total_24h = len(recent_incidents)
-    total_7d = len(weekly_incidents)
-    
-    avg_severity_24h = sum(i.priority_score for i in recent_incidents) / max(1, total_24h)
-    avg_severity_7d = sum(i.priority_score for i in weekly_incidents) / max(1, total_7d)
+
+    total_24h, total_7d, avg_severity_24h, avg_severity_7d = (await db.execute(totals_query)).one()
     
     # Count by status
-    status_counts = {}
-    for incident in recent_incidents:
-        status = incident.status.value
-        status_counts[status] = status_counts.get(status, 0) + 1
+    status_counts = {status.value: count for status, count in (await db.execute(status_query)).all()}
     
     # Count by category
-    category_counts = {}
-    for incident in weekly_incidents:
-        if incident.category:
-            category = incident.category.value
-            category_counts[category] = category_counts.get(category, 0) + 1
+    category_counts = {category.value: count for category, count in (await db.execute(category_query)).all()}
     
     return {
         "summary": {
             "incidents_24h": total_24h,
             "incidents_7d": total_7d,
-            "avg_severity_24h": round(avg_severity_24h, 1),
-            "avg_severity_7d": round(avg_severity_7d, 1),
+            "avg_severity_24h": round(float(avg_severity_24h), 1),
+            "avg_severity_7d": round(float(avg_severity_7d), 1),
             "status_distribution": status_counts,
             "category_distribution": dict(list(category_counts.items())[:5])  # Top 5
         },
@@ -1,20 +1,34 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Form, Response, Request, Header
+from fastapi.responses import StreamingResponse, JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc, asc
+from sqlalchemy import select, desc, asc, and_, or_
 from app.core.database import get_db
 from app.models.models import Incident, EmergencyCall
 from app.models.enums import IncidentStatus, IncidentCategory
-from app.schemas.incident import IncidentCreate, IncidentResponse, IncidentUpdate
-from app.ai.client import analyze_incident_description, get_detailed_analysis
-import shutil
-import os
-import uuid
+from app.schemas.incident import IncidentResponse, IncidentUpdate
+from app.ai.client import triage_incident, clamp_priority
+from app.ai.rules import classify_incident
+from app.ai.triage_queue import triage_queue, provisional_analysis, coerce_category
+from app.crud.analysis import get_or_create_analysis, load_incident_analysis, stream_analysis_events, invalidate_analysis, prewarm_analysis, ANALYSIS_INPUT_FIELDS
+from app.crud.incident import create_incident_with_call, cluster_incidents, bbox_clause, incident_listing_select, rows_to_payloads, copy_incidents
+from app.crud.geo import location_filters
+from app.core.config import settings
+from app.core.events import incident_events, sse_stream, format_sse
+from app.utils.storage import media_storage, UploadReport
+from app.utils.pagination import encode_cursor, decode_cursor
+from app.utils.tiles import tile_bounds, parse_bbox, valid_tile, CLUSTER_MAX_ZOOM, MAX_ZOOM
+from app.utils.serialization import json_response
+from app.utils.ingest import iter_csv, iter_ndjson, parse_record
+from app.utils.versioning import table_version, listing_etag, not_modified, set_version_headers, since_clause
 
 router = APIRouter()
 
+TILE_POINT_LIMIT = 5000
+
 @router.post("", response_model=IncidentResponse, status_code=201)
 async def create_incident(
+    response: Response,
     description: str = Form(...),
     latitude: Optional[float] = Form(None),
     longitude: Optional[float] = Form(None),
@@ -28,61 +42,201 @@ async def create_incident(
     """
     image_path = None
     audio_path = None
+    upload_report = UploadReport()
     
     if image:
-        filename = f"{uuid.uuid4()}_{image.filename}"
-        save_path = f"uploads/images/{filename}"
-        with open(save_path, "wb") as buffer:
-            shutil.copyfileobj(image.file, buffer)
-        image_path = save_path
+        stored = await media_storage.save(image, "image", upload_report)
+        image_path = stored.path
         
     if audio:
-        filename = f"{uuid.uuid4()}_{audio.filename}"
-        save_path = f"uploads/voice/{filename}"
-        with open(save_path, "wb") as buffer:
-            shutil.copyfileobj(audio.file, buffer)
-        audio_path = save_path
-
-    # 1. Create the EmergencyCall record
-    db_call = EmergencyCall(
-        raw_transcript=description,
-        caller_phone=reporter_id,
-        location_lat=latitude,
-        location_long=longitude,
-        media_url=image_path or audio_path, # Legacy support
-        image_url=image_path,
-        audio_url=audio_path
-    )
-    db.add(db_call)
-    await db.flush()
-
-    # AI Analysis
-    analysis = await analyze_incident_description(description)
-
-    # 2. Create the Incident record linked to the call
-    db_incident = Incident(
-        call_id=db_call.call_id,
-        status=IncidentStatus.PENDING,
-        priority_score=analysis.get("priority_score", 1),
-        summary=analysis.get("summary", description),
-        category=analysis.get("category")
+        stored = await media_storage.save(audio, "audio", upload_report)
+        audio_path = stored.path
+
+    response.headers.update(upload_report.headers())
+
+    # AI Analysis: in async triage mode store a provisional priority now and
+    # let the background workers fill in the real one.
+    deferred = settings.TRIAGE_MODE == "async" and triage_queue.has_capacity()
+    if deferred:
+        analysis = provisional_analysis(description)
+    else:
+        analysis = await triage_incident(description, (latitude, longitude))
+
+    # Insert the EmergencyCall and its Incident in a single statement
+    incident = await create_incident_with_call(
+        db,
+        call_values={
+            "raw_transcript": description,
+            "caller_phone": reporter_id,
+            "location_lat": latitude,
+            "location_long": longitude,
+            "media_url": image_path or audio_path, # Legacy support
+            "image_url": image_path,
+            "audio_url": audio_path,
+        },
+        incident_values={
+            "status": IncidentStatus.PENDING,
+            "priority_score": clamp_priority(analysis.get("priority_score", 1)),
+            "summary": analysis.get("summary", description),
+            "category": coerce_category(analysis.get("category")),
+        },
     )
-    
-    db.add(db_incident)
-    await db.commit()
-    await db.refresh(db_incident)
-    
-    from sqlalchemy.orm import joinedload
-    query = select(Incident).where(Incident.id == db_incident.id).options(joinedload(Incident.call))
-    result = await db.execute(query)
-    incident = result.scalars().first()
+
+    if deferred and not triage_queue.submit(incident["id"], description, (latitude, longitude)):
+        # Queue filled up in the meantime, triage inline instead
+        incident.update(await triage_queue.triage(incident["id"], description, (latitude, longitude)))
+    elif not deferred:
+        prewarm_analysis(incident["id"], incident["priority_score"])
+
+    incident_events.publish("incident.created", incident)
     
     return incident
 
+@router.post("/bulk")
+async def bulk_ingest_incidents(
+    request: Request,
+    format: Optional[str] = Query(None, description="ndjson or csv, defaults from Content-Type"),
+    triage: str = Query("none", description="none: keep imported or provisional values, rules: classify rows without a category locally, deferred: queue AI triage for rows without a category"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Bulk import of historical calls (e.g. a legacy CAD backfill) from an
+    NDJSON or CSV request body.
+
+    The body is parsed as it streams in and loaded with COPY in batches of
+    BULK_INGEST_BATCH_SIZE rows, one transaction per batch. Each row needs a
+    description; location, caller phone, timestamp, priority_score,
+    category, summary and status are optional. Invalid rows are skipped and
+    reported. A batch that fails to load is rolled back on its own and
+    reported with its line range, so only those lines need resending.
+    """
+    import time
+
+    if triage not in ("none", "rules", "deferred"):
+        raise HTTPException(status_code=400, detail="triage must be 'none', 'rules' or 'deferred'")
+
+    content_type = request.headers.get("content-type", "")
+    format = format or ("csv" if "csv" in content_type else "ndjson")
+    if format == "csv":
+        rows = iter_csv(request.stream())
+    elif format == "ndjson":
+        rows = iter_ndjson(request.stream())
+    else:
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'csv'")
+
+    if triage == "deferred":
+        await triage_queue.start()
+
+    started = time.perf_counter()
+    batch = []
+    batch_lines = []
+    inserted = 0
+    batches = 0
+    queued = 0
+    errors = []
+    skipped = 0
+    failed = 0
+    failed_batches = []
+
+    async def flush():
+        nonlocal inserted, batches, queued, failed
+        try:
+            incident_ids = await copy_incidents(db, batch, settings.TRIAGE_PROVISIONAL_PRIORITY)
+            await db.commit()
+        except Exception as e:
+            print(f"Error loading bulk import batch (lines {batch_lines[0]}-{batch_lines[-1]}): {e}")
+            await db.rollback()
+            failed += len(batch)
+            failed_batches.append({"first_line": batch_lines[0], "last_line": batch_lines[-1], "rows": len(batch), "error": str(e)})
+            batch.clear()
+            batch_lines.clear()
+            return
+        inserted += len(batch)
+        batches += 1
+        if triage == "deferred":
+            pending = [
+                (incident_id, record.description)
+                for incident_id, record in zip(incident_ids, batch)
+                if record.category is None
+            ]
+            triage_queue.submit_backlog(pending)
+            queued += len(pending)
+        batch.clear()
+        batch_lines.clear()
+
+    async for line_number, raw in rows:
+        try:
+            if isinstance(raw, str):
+                raise ValueError(raw)
+            record = parse_record(raw)
+        except (ValueError, TypeError) as e:
+            skipped += 1
+            if len(errors) < 20:
+                errors.append({"line": line_number, "error": str(e)})
+            continue
+
+        if triage == "rules" and record.category is None:
+            rules = classify_incident(record.description)
+            record.category = IncidentCategory(rules["category"])
+            record.priority_score = record.priority_score or rules["priority_score"]
+        batch.append(record)
+        batch_lines.append(line_number)
+
+        if len(batch) >= settings.BULK_INGEST_BATCH_SIZE:
+            await flush()
+
+    if batch:
+        await flush()
+
+    if inserted:
+        incident_events.publish("incident.bulk", {"count": inserted})
+
+    elapsed = time.perf_counter() - started
+    return {
+        "inserted": inserted,
+        "skipped": skipped,
+        "failed": failed,
+        "errors": errors,
+        "failed_batches": failed_batches,
+        "batches": batches,
+        "queued_for_triage": queued,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(inserted / elapsed) if elapsed else 0,
+    }
+
+@router.get("/triage/stats")
+async def get_triage_stats():
+    """
+    Queue depth, worker concurrency and per-item latency of the background triage.
+    """
+    return triage_queue.stats()
+
+@router.get("/stream")
+async def stream_incidents(
+    request: Request,
+    resume: Optional[str] = Query(None, description="Resume token (id of the last event received)"),
+    last_event_id: Optional[str] = Header(None),
+):
+    """
+    Live feed of incident create/update deltas as Server-Sent Events.
+
+    Reconnect with `resume` (or the Last-Event-ID header EventSource sends
+    automatically) to receive only the events missed in between.
+    """
+    return StreamingResponse(
+        sse_stream(incident_events, request, resume or last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @router.get("", response_model=List[IncidentResponse])
 async def read_incidents(
-    skip: int = 0,
-    limit: int = 100,
+    request: Request,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from a previous page's X-Next-Cursor header"),
+    since: Optional[str] = Query(None, description="Only incidents changed after this X-Change-Version or ISO timestamp"),
     category: Optional[str] = Query(None),
     status: Optional[str] = Query(None),
     db: AsyncSession = Depends(get_db)
@@ -90,15 +244,51 @@ async def read_incidents(
     """
     Retrieve incidents.
     Sorted by severity_score (priority_score) Descending, then created_at Ascending.
+
+    Pass `cursor` to page with keyset pagination instead of `skip`; the cursor
+    for the next page is returned in the X-Next-Cursor header.
+
+    Supports If-None-Match against the returned ETag, and `since` to get
+    only the rows changed after a previous response's X-Change-Version.
     """
-    from sqlalchemy.orm import joinedload
+    version = await table_version(db, Incident.updated_at)
+    etag = listing_etag(version, request)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    set_version_headers(response, version, etag)
+
     query = (
-        select(Incident)
-        .options(joinedload(Incident.call))
-        .order_by(desc(Incident.priority_score), asc(Incident.created_at))
-        .offset(skip)
+        incident_listing_select()
+        .order_by(desc(Incident.priority_score), asc(Incident.created_at), asc(Incident.id))
         .limit(limit)
     )
+
+    if cursor:
+        try:
+            after_priority, after_created_at, after_id = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        query = query.where(
+            or_(
+                Incident.priority_score < after_priority,
+                and_(
+                    Incident.priority_score == after_priority,
+                    or_(
+                        Incident.created_at > after_created_at,
+                        and_(Incident.created_at == after_created_at, Incident.id > after_id),
+                    ),
+                ),
+            )
+        )
+    else:
+        query = query.offset(skip)
+
+    if since:
+        changed = since_clause(since, version, Incident.updated_at)
+        response.headers["X-Delta-Mode"] = "full" if changed is None else "delta"
+        if changed is not None:
+            query = query.where(changed)
     
     # Add filtering
     if category:
@@ -115,8 +305,12 @@ async def read_incidents(
         except ValueError:
             pass  # Invalid status, ignore filter
     result = await db.execute(query)
-    incidents = result.scalars().all()
-    return incidents
+    incidents = rows_to_payloads(list(result.keys()), result.all())
+
+    if len(incidents) == limit:
+        last = incidents[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last["priority_score"], last["created_at"], last["id"])
+    return json_response(incidents, response.headers)
 
 @router.patch("/{incident_id}", response_model=IncidentResponse)
 async def update_incident(
@@ -137,6 +331,13 @@ async def update_incident(
         raise HTTPException(status_code=404, detail="Incident not found")
 
     update_data = incident_in.model_dump(exclude_unset=True)
+
+    # The stored detailed analysis only depends on some of the fields
+    if any(
+        field in ANALYSIS_INPUT_FIELDS and getattr(incident, field) != value
+        for field, value in update_data.items()
+    ):
+        await invalidate_analysis(db, incident_id)
     
     for field, value in update_data.items():
         setattr(incident, field, value)
@@ -144,83 +345,256 @@ async def update_incident(
     db.add(incident)
     await db.commit()
     await db.refresh(incident)
+
+    incident_events.publish("incident.updated", IncidentResponse.model_validate(incident))
     return incident
 
-@router.get("/geojson")
-async def get_incidents_geojson(
-    category: Optional[str] = Query(None),
-    start_date: Optional[str] = Query(None),
-    end_date: Optional[str] = Query(None),
-    db: AsyncSession = Depends(get_db)
-):
+def _map_filters(category: Optional[str], start_date: Optional[str], end_date: Optional[str]) -> list:
     """
-    Get incidents as GeoJSON FeatureCollection for map rendering.
-    Optimized for map libraries like Mapbox/MapLibre.
+    Filters shared by the map endpoints. Invalid values are ignored.
     """
-    from sqlalchemy.orm import joinedload
     from datetime import datetime
-    
-    query = (
-        select(Incident)
-        .options(joinedload(Incident.call))
-        .order_by(desc(Incident.created_at))
-        .limit(500)  # Reasonable limit for map performance
-    )
-    
-    # Add filters
+
+    filters = []
     if category:
         try:
             category_enum = IncidentCategory(category)
-            query = query.where(Incident.category == category_enum)
+            filters.append(Incident.category == category_enum)
         except ValueError:
             pass
     
     if start_date:
         try:
             start_dt = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
-            query = query.where(Incident.created_at >= start_dt)
+            filters.append(Incident.created_at >= start_dt)
         except ValueError:
             pass
     
     if end_date:
         try:
             end_dt = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
-            query = query.where(Incident.created_at <= end_dt)
+            filters.append(Incident.created_at <= end_dt)
         except ValueError:
             pass
+    return filters
+
+@router.get("/geojson")
+async def get_incidents_geojson(
+    request: Request,
+    response: Response,
+    category: Optional[str] = Query(None),
+    start_date: Optional[str] = Query(None),
+    end_date: Optional[str] = Query(None),
+    since: Optional[str] = Query(None, description="Only incidents changed after this X-Change-Version or ISO timestamp"),
+    bbox: Optional[str] = Query(None, description="Viewport as west,south,east,north"),
+    latitude: Optional[float] = Query(None, ge=-90, le=90, description="Center of a radius filter"),
+    longitude: Optional[float] = Query(None, ge=-180, le=180, description="Center of a radius filter"),
+    radius_km: Optional[float] = Query(None, gt=0, description="Only incidents within this distance of latitude/longitude"),
+    zoom: Optional[int] = Query(None, ge=0, le=MAX_ZOOM, description="Map zoom; below the cluster zoom points are grid-clustered"),
+    limit: int = Query(500, ge=1, le=10000),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get incidents as GeoJSON FeatureCollection for map rendering.
+    Optimized for map libraries like Mapbox/MapLibre.
+
+    With `zoom` below the cluster zoom, incidents in the viewport are
+    clustered on the server and returned as features with `cluster: true`
+    and a `point_count`, so the whole city fits in one response.
+
+    The viewport and radius filters run in the database, so only incidents
+    in the area are read.
+    """
+    from datetime import datetime
+
+    version = await table_version(db, Incident.updated_at)
+    etag = listing_etag(version, request)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    set_version_headers(response, version, etag)
+
+    bounds = None
+    if bbox:
+        try:
+            bounds = parse_bbox(bbox)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    filters = _map_filters(category, start_date, end_date)
+    near = latitude is not None and longitude is not None and radius_km is not None
+    if near:
+        filters.extend(location_filters(
+            EmergencyCall.location_lat, EmergencyCall.location_long,
+            latitude=latitude, longitude=longitude, radius_km=radius_km,
+        ))
+
+    if since:
+        changed = since_clause(since, version, Incident.updated_at)
+        response.headers["X-Delta-Mode"] = "full" if changed is None else "delta"
+        if changed is not None:
+            filters.append(changed)
+
+    if zoom is not None and zoom < CLUSTER_MAX_ZOOM:
+        cells = await cluster_incidents(db, zoom, bounds, filters)
+        features = [
+            {
+                "type": "Feature",
+                "geometry": {
+                    "type": "Point",
+                    "coordinates": [round(cell.lng, 6), round(cell.lat, 6)]
+                },
+                "properties": {
+                    "cluster": cell.count > 1,
+                    "point_count": cell.count,
+                    "max_priority": cell.max_priority,
+                    "id": cell.id if cell.count == 1 else None,
+                }
+            }
+            for cell in cells
+        ]
+        return {
+            "type": "FeatureCollection",
+            "features": features,
+            "metadata": {
+                "total_features": len(features),
+                "total_incidents": sum(cell.count for cell in cells),
+                "clustered": True,
+                "zoom": zoom,
+                "generated_at": datetime.utcnow().isoformat()
+            }
+        }
+    
+    query = (
+        select(
+            Incident.id,
+            Incident.category,
+            Incident.status,
+            Incident.priority_score,
+            Incident.created_at,
+            Incident.summary,
+            EmergencyCall.caller_phone,
+            EmergencyCall.location_lat,
+            EmergencyCall.location_long,
+        )
+        .join(EmergencyCall, Incident.call_id == EmergencyCall.call_id)
+        .where(EmergencyCall.location_lat.is_not(None), EmergencyCall.location_long.is_not(None), *filters)
+        .order_by(desc(Incident.created_at))
+        .limit(limit)
+    )
+    if bounds:
+        query = query.where(bbox_clause(*bounds))
     
     result = await db.execute(query)
-    incidents = result.scalars().all()
+    rows = result.all()
+    truncated = len(rows) == limit
     
     # Build GeoJSON FeatureCollection
     features = []
-    for incident in incidents:
-        if incident.call.location_lat and incident.call.location_long:
+    for id, category, status, priority_score, created_at, summary, caller_phone, lat, lng in rows:
+        if lat and lng:
             features.append({
                 "type": "Feature",
                 "geometry": {
                     "type": "Point",
-                    "coordinates": [incident.call.location_long, incident.call.location_lat]
+                    "coordinates": [lng, lat]
                 },
                 "properties": {
-                    "id": incident.id,
-                    "category": incident.category.value if incident.category else None,
-                    "status": incident.status.value,
-                    "priority_score": incident.priority_score,
-                    "created_at": incident.created_at.isoformat(),
-                    "summary": incident.summary,
-                    "caller_phone": incident.call.caller_phone
+                    "id": id,
+                    "category": category,
+                    "status": status,
+                    "priority_score": priority_score,
+                    "created_at": created_at,
+                    "summary": summary,
+                    "caller_phone": caller_phone
                 }
             })
     
-    return {
+    return json_response({
         "type": "FeatureCollection",
         "features": features,
         "metadata": {
             "total_features": len(features),
+            "clustered": False,
+            "truncated": truncated,
             "generated_at": datetime.utcnow().isoformat()
         }
-    }
+    }, response.headers)
+
+@router.get("/tiles/{z}/{x}/{y}")
+async def get_incident_tile(
+    z: int,
+    x: int,
+    y: int,
+    request: Request,
+    category: Optional[str] = Query(None),
+    start_date: Optional[str] = Query(None),
+    end_date: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Compact per-tile payload for the map (z/x/y slippy-map tiles).
+
+    Below the cluster zoom rows are [lng, lat, count, max_priority, id],
+    where id is only set for single-incident cells. From the cluster zoom on
+    rows are individual incidents [lng, lat, id, priority_score, category, status].
+    A tile holding more than TILE_POINT_LIMIT incidents is clustered too
+    rather than cut short; `clustered` says which shape was returned.
+    """
+    if not valid_tile(z, x, y):
+        raise HTTPException(status_code=404, detail="Tile out of range")
+
+    version = await table_version(db, Incident.updated_at)
+    etag = listing_etag(version, request)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+
+    bounds = tile_bounds(z, x, y)
+    filters = _map_filters(category, start_date, end_date)
+
+    clustered = z < CLUSTER_MAX_ZOOM
+    if not clustered:
+        query = (
+            select(
+                EmergencyCall.location_long,
+                EmergencyCall.location_lat,
+                Incident.id,
+                Incident.priority_score,
+                Incident.category,
+                Incident.status,
+            )
+            .join(EmergencyCall, Incident.call_id == EmergencyCall.call_id)
+            .where(bbox_clause(*bounds), *filters)
+            .order_by(desc(Incident.priority_score))
+            .limit(TILE_POINT_LIMIT + 1)
+        )
+        points = (await db.execute(query)).all()
+        # Too dense to send every point: cluster instead of dropping the rest
+        clustered = len(points) > TILE_POINT_LIMIT
+
+    if clustered:
+        cells = await cluster_incidents(db, z, bounds, filters)
+        columns = ["lng", "lat", "count", "max_priority", "id"]
+        rows = [
+            [round(c.lng, 5), round(c.lat, 5), c.count, c.max_priority, c.id if c.count == 1 else None]
+            for c in cells
+        ]
+    else:
+        columns = ["lng", "lat", "id", "priority_score", "category", "status"]
+        rows = [
+            [round(lng, 5), round(lat, 5), incident_id, priority, category.value if category else None, status.value]
+            for lng, lat, incident_id, priority, category, status in points
+        ]
+
+    return JSONResponse(
+        {"z": z, "x": x, "y": y, "clustered": clustered, "columns": columns, "rows": rows},
+        headers={
+            "ETag": etag,
+            "Cache-Control": "public, max-age=10",
+            "X-Change-Version": version,
+        },
+    )
 
 @router.get("/{incident_id}/analysis")
 async def get_incident_analysis(
@@ -230,24 +604,39 @@ async def get_incident_analysis(
     """
     Get detailed AI analysis for an incident including equipment, 
     responder count, rescue type, and instructions.
+
+    The analysis is stored per incident and reused while its inputs
+    (transcript, category, priority, location) are unchanged.
     """
-    from sqlalchemy.orm import joinedload
-    
-    query = select(Incident).where(Incident.id == incident_id).options(joinedload(Incident.call))
-    result = await db.execute(query)
-    incident = result.scalars().first()
-    
-    if not incident:
+    analysis = await get_or_create_analysis(db, incident_id)
+    if analysis is None:
         raise HTTPException(status_code=404, detail="Incident not found")
-    
-    # Prepare data for AI analysis
-    incident_data = {
-        "description": incident.call.raw_transcript if incident.call else "",
-        "category": incident.category.value if incident.category else "unknown",
-        "priority": incident.priority_score,
-        "location": f"{incident.call.location_lat}, {incident.call.location_long}" if incident.call and incident.call.location_lat else "Unknown"
-    }
-    
-    analysis = await get_detailed_analysis(incident_data)
-    
+
     return analysis
+
+@router.get("/{incident_id}/analysis/stream")
+async def stream_incident_analysis(
+    incident_id: int,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Streaming variant of the incident analysis as Server-Sent Events.
+
+    Sends a "field" event ({"key", "value"}) as soon as each field is
+    generated, situation and instructions first, then a "done" event with
+    the source: "stored", "llm" or "fallback".
+    """
+    loaded = await load_incident_analysis(db, incident_id)
+    if loaded is None:
+        raise HTTPException(status_code=404, detail="Incident not found")
+    incident_data, payload = loaded
+
+    async def events():
+        async for event, data in stream_analysis_events(incident_id, incident_data, payload):
+            yield format_sse(event, data)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
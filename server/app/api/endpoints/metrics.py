@@ -0,0 +1,32 @@
+from fastapi import APIRouter
+from app.ai.metrics import ai_metrics
+from app.ai.gateway import gateway
+from app.ai.client import triage_cache, triage_batcher, triage_wins
+from app.ai.dispatch import recommendation_stats
+from app.ai.triage_queue import triage_queue
+
+router = APIRouter()
+
+@router.get("")
+async def get_metrics():
+    """
+    AI layer metrics since startup. Per operation (triage, triage_batch,
+    detailed_analysis, dispatch_recommendation, clustering, prediction):
+    latency histogram and percentiles, prompt/completion tokens, models
+    used and success / parse_failure / fallback counts. Also the gateway,
+    cache and triage queue state.
+    """
+    return {
+        "ai": ai_metrics.snapshot(),
+        "gateway": gateway.stats(),
+        "triage": {
+            "queue": {
+                key: value for key, value in triage_queue.stats().items()
+                if key not in ("cache", "batching", "wins", "gateway")
+            },
+            "cache": triage_cache.stats(),
+            "batching": triage_batcher.stats(),
+            "wins": dict(triage_wins),
+        },
+        "recommendations": recommendation_stats(),
+    }
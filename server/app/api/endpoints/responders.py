@@ -1,13 +1,23 @@
+import asyncio
+import json
+from datetime import datetime
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from app.core.database import get_db
+from app.core.database import get_db, AsyncSessionLocal
+from app.core.config import settings
 from app.models.models import Responder, Incident
 from app.models.enums import ResponderStatus, ResponderType, IncidentStatus
-from app.schemas.responder import ResponderResponse, ResponderUpdateLocation, DispatchRequest, RecommendationRequest, RecommendationResponse
-from app.utils.distance import calculate_haversine_distance
-from app.ai.client import recommend_response_unit
+from app.schemas.responder import ResponderResponse, ResponderUpdateLocation, LocationBatch, LocationBatchResult, DispatchRequest, MultiDispatchRequest, RecommendationRequest, RecommendationResponse
+from app.utils.distance import haversine_one_to_many
+from app.ai.dispatch import recommend_responder_type, recommendation_stats
+from app.core.events import incident_events
+from app.core.fleet import fleet_hub, FleetSubscription
+from app.crud.responder import responder_index, set_responder_status, dispatch_units, DispatchResult
+from app.utils.serialization import dumps
+from app.crud.geo import radius_filter
+from app.utils.tiles import parse_bbox
 import random
 
 router = APIRouter()
@@ -18,25 +28,38 @@ async def recommend_responder(
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Use AI to determine the best responder type for an incident.
+    Determine the best responder type for an incident. Unambiguous
+    category and priority combinations come from the dispatch table, the
+    rest are asked of the AI.
     """
-    result = await db.execute(select(Incident).where(Incident.id == request.incident_id))
-    incident = result.scalars().first()
+    result = await db.execute(
+        select(Incident.category, Incident.priority_score, Incident.summary).where(Incident.id == request.incident_id)
+    )
+    incident = result.first()
     
     if not incident:
         raise HTTPException(status_code=404, detail="Incident not found")
-        
-    # Prepare context for AI
-    context = {
-        "description": incident.summary,
-        "category": incident.category.value if incident.category else "unknown",
-        "priority": incident.priority_score
-    }
     
-    recommendation = await recommend_response_unit(context)
+    recommendation = await recommend_responder_type(incident.category, incident.priority_score, incident.summary)
     
     return recommendation
 
+@router.get("/recommend/stats")
+async def get_recommendation_stats():
+    """
+    How responder recommendations were answered since startup: dispatch
+    table, cached AI answer, AI call or fallback.
+    """
+    return recommendation_stats()
+
+@router.get("/index/stats")
+async def get_responder_index_stats():
+    """
+    Size and query count of the in-memory responder index, the location
+    buffer's flush counters and the fleet channel's subscribers.
+    """
+    return {**responder_index.stats(), "fleet": fleet_hub.stats()}
+
 @router.get("/nearby", response_model=List[ResponderResponse])
 async def get_nearby_responders(
     latitude: float,
@@ -47,8 +70,18 @@ async def get_nearby_responders(
 ):
     """
     Get nearby IDLE responders sorted by distance.
+
+    Served from the in-memory responder index; the database is only read
+    if the index could not be loaded, and then only for units inside the
+    search area.
     """
-    query = select(Responder).where(Responder.status == ResponderStatus.IDLE)
+    if responder_index.loaded:
+        return responder_index.nearby(latitude, longitude, radius_km, type=type)
+
+    query = select(Responder).where(
+        Responder.status == ResponderStatus.IDLE,
+        radius_filter(Responder.latitude, Responder.longitude, latitude, longitude, radius_km),
+    )
     
     if type:
         query = query.where(Responder.type == type)
@@ -56,24 +89,38 @@ async def get_nearby_responders(
     result = await db.execute(query)
     responders = result.scalars().all()
     
-    # Calculate distances and filter
+    # Calculate distances in one vectorized pass and filter
+    positioned = [r for r in responders if r.latitude is not None and r.longitude is not None]
+    if not positioned:
+        return []
+    distances = haversine_one_to_many(
+        latitude, longitude,
+        [r.latitude for r in positioned], [r.longitude for r in positioned],
+    )
     nearby_responders = []
-    for responder in responders:
-        if responder.latitude is not None and responder.longitude is not None:
-            dist = calculate_haversine_distance(
-                latitude, longitude, 
-                responder.latitude, responder.longitude
-            )
-            if dist <= radius_km:
-                # Add distance attribute dynamically for sorting (won't be in response model by default but useful)
-                responder.distance = dist 
-                nearby_responders.append(responder)
-    
-    # Sort by distance
-    nearby_responders.sort(key=lambda x: x.distance)
+    for index in distances.argsort():
+        if distances[index] <= radius_km:
+            responder = positioned[index]
+            responder.distance = float(distances[index])
+            nearby_responders.append(responder)
     
     return nearby_responders
 
+def _raise_dispatch_error(result: DispatchResult, single: bool) -> None:
+    if result.missing:
+        raise HTTPException(status_code=404, detail="Responder not found" if single else f"Responders not found: {result.missing}")
+    if result.not_idle:
+        raise HTTPException(status_code=400, detail="Responder is not IDLE" if single else f"Responders not IDLE: {result.not_idle}")
+    if not result.incident_found:
+        raise HTTPException(status_code=404, detail="Incident not found")
+    # Every unit was IDLE again by the time we looked: lost a race, worth a retry
+    raise HTTPException(status_code=409, detail="Dispatch conflicted with another update, retry")
+
+def _publish_dispatch(incident_id: int, result: DispatchResult) -> None:
+    for responder in result.responders:
+        responder_index.upsert(responder)
+    incident_events.publish("incident.updated", {"id": incident_id, "status": IncidentStatus.DISPATCHED})
+
 @router.post("/dispatch", response_model=ResponderResponse)
 async def dispatch_responder(
     dispatch_data: DispatchRequest,
@@ -81,36 +128,36 @@ async def dispatch_responder(
 ):
     """
     Dispatch a responder to an incident.
+
+    The responder is claimed with a conditional UPDATE (only while IDLE) in
+    the same statement that marks the incident dispatched, so concurrent
+    dispatchers can never assign the same unit twice.
     """
-    # Fetch responder
-    result = await db.execute(select(Responder).where(Responder.id == dispatch_data.responder_id))
-    responder = result.scalars().first()
-    
-    if not responder:
-        raise HTTPException(status_code=404, detail="Responder not found")
-        
-    if responder.status != ResponderStatus.IDLE:
-        raise HTTPException(status_code=400, detail="Responder is not IDLE")
-        
-    # Fetch incident
-    result = await db.execute(select(Incident).where(Incident.id == dispatch_data.incident_id))
-    incident = result.scalars().first()
-        
-    if not incident:
-        raise HTTPException(status_code=404, detail="Incident not found")
+    result = await dispatch_units(db, dispatch_data.incident_id, [dispatch_data.responder_id])
+    if not result.ok:
+        _raise_dispatch_error(result, single=True)
 
-    # Update states
-    responder.status = ResponderStatus.DISPATCHED
-    responder.current_incident_id = incident.id
-    
-    incident.status = IncidentStatus.DISPATCHED
-    
-    db.add(responder)
-    db.add(incident)
-    await db.commit()
-    await db.refresh(responder)
-    
-    return responder
+    _publish_dispatch(dispatch_data.incident_id, result)
+    return result.responders[0]
+
+@router.post("/dispatch/multi", response_model=List[ResponderResponse])
+async def dispatch_responders(
+    dispatch_data: MultiDispatchRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Dispatch several responders to one incident, all or none: if any unit
+    is unknown or no longer IDLE nothing is changed and the error lists them.
+    """
+    result = await dispatch_units(db, dispatch_data.incident_id, dispatch_data.responder_ids)
+    if not result.ok:
+        _raise_dispatch_error(result, single=False)
+
+    _publish_dispatch(dispatch_data.incident_id, result)
+    return result.responders
+
+def _epoch(value: Optional[datetime]) -> Optional[float]:
+    return value.timestamp() if value else None
 
 @router.patch("/{id}/location", response_model=ResponderResponse)
 async def update_responder_location(
@@ -120,7 +167,17 @@ async def update_responder_location(
 ):
     """
     Update responder's real-time location.
+
+    The fix is visible to nearby queries at once and written to the
+    database by the location buffer's next bulk flush. Only while the
+    responder index is unavailable is it written directly.
     """
+    if responder_index.loaded:
+        if id not in responder_index.records:
+            raise HTTPException(status_code=404, detail="Responder not found")
+        responder_index.report_position(id, location.latitude, location.longitude, _epoch(location.recorded_at))
+        return responder_index.records[id]
+
     result = await db.execute(select(Responder).where(Responder.id == id))
     responder = result.scalars().first()
     
@@ -133,9 +190,123 @@ async def update_responder_location(
     db.add(responder)
     await db.commit()
     await db.refresh(responder)
+    responder_index.upsert(responder)
     
     return responder
 
+@router.post("/locations", response_model=LocationBatchResult, status_code=202)
+async def report_responder_locations(batch: LocationBatch):
+    """
+    Ingest a batch of GPS fixes, e.g. from a fleet gateway. Only the latest
+    fix per responder is kept and written in the next bulk flush. Fixes for
+    responders the index doesn't know are reported back as unknown.
+    """
+    if len(batch.reports) > settings.RESPONDER_LOCATION_BATCH_MAX:
+        raise HTTPException(status_code=413, detail=f"At most {settings.RESPONDER_LOCATION_BATCH_MAX} reports per batch")
+
+    accepted, stale, unknown = 0, 0, []
+    for report in batch.reports:
+        if responder_index.loaded and report.responder_id not in responder_index.records:
+            unknown.append(report.responder_id)
+        elif responder_index.report_position(report.responder_id, report.latitude, report.longitude, _epoch(report.recorded_at)):
+            accepted += 1
+        else:
+            stale += 1
+    return {"accepted": accepted, "stale": stale, "unknown": unknown}
+
+async def _send_fleet_updates(websocket: WebSocket, subscription: FleetSubscription) -> None:
+    while True:
+        await subscription.wake.wait()
+        subscription.wake.clear()
+        if subscription.needs_snapshot:
+            if subscription.bounds is not None:
+                records = responder_index.in_bbox(*subscription.bounds)
+            else:
+                records = [r for r in responder_index.records.values() if r["latitude"] is not None and r["longitude"] is not None]
+            subscription.reset(records)
+            await websocket.send_text(dumps({"type": "snapshot", "responders": records}).decode())
+            continue
+        upserts, removes = subscription.take()
+        if upserts or removes:
+            await websocket.send_text(dumps({"type": "delta", "upserts": upserts, "removes": removes}).decode())
+
+@router.websocket("/fleet")
+async def fleet_updates(websocket: WebSocket):
+    """
+    Live fleet map for dispatch consoles.
+
+    The console sends {"type": "watch", "bbox": [west, south, east, north]}
+    (bbox null for the whole fleet), and again whenever its viewport
+    changes. Each watch is answered with a "snapshot" of the units inside;
+    after that "delta" messages carry `upserts` (units that changed or
+    entered the viewport) and `removes` (ids that left it), coalesced per
+    unit and sent at most every FLEET_PUSH_INTERVAL_MS.
+    """
+    await websocket.accept()
+    if not responder_index.loaded:
+        # Nothing to snapshot from; the console polls /nearby until it reconnects
+        await websocket.close(code=1013, reason="Responder index not loaded")
+        return
+    with fleet_hub.subscribe() as subscription:
+        sender = asyncio.create_task(_send_fleet_updates(websocket, subscription))
+        try:
+            while True:
+                message = await websocket.receive_json()
+                if not isinstance(message, dict) or message.get("type") != "watch":
+                    continue
+                bbox = message.get("bbox")
+                try:
+                    bounds = parse_bbox(",".join(str(v) for v in bbox)) if bbox else None
+                except (TypeError, ValueError) as e:
+                    await websocket.close(code=1008, reason=str(e))
+                    return
+                subscription.watch(bounds)
+        except (WebSocketDisconnect, ValueError):
+            pass
+        finally:
+            sender.cancel()
+            await asyncio.gather(sender, return_exceptions=True)
+
+@router.websocket("/{id}/telemetry")
+async def responder_telemetry(websocket: WebSocket, id: int):
+    """
+    Persistent channel for a field unit instead of a PATCH per fix.
+
+    The unit sends {"type": "position", "latitude", "longitude",
+    "recorded_at"?} as often as it reports, handled like PATCH
+    /{id}/location, and {"type": "status", "status"} when its status
+    changes, which is written at once and echoed back. Invalid messages
+    are answered with {"type": "error", "detail"}.
+    """
+    await websocket.accept()
+    if responder_index.loaded and id not in responder_index.records:
+        await websocket.close(code=4404, reason="Responder not found")
+        return
+
+    try:
+        while True:
+            text = await websocket.receive_text()
+            try:
+                message = json.loads(text)
+                kind = message.get("type") if isinstance(message, dict) else None
+                if kind == "position":
+                    location = ResponderUpdateLocation(**message)
+                    responder_index.report_position(id, location.latitude, location.longitude, _epoch(location.recorded_at))
+                elif kind == "status":
+                    status = ResponderStatus(message.get("status"))
+                    async with AsyncSessionLocal() as session:
+                        found = await set_responder_status(session, id, status)
+                    if not found:
+                        await websocket.close(code=4404, reason="Responder not found")
+                        return
+                    await websocket.send_json({"type": "status", "status": status.value})
+                else:
+                    await websocket.send_json({"type": "error", "detail": f"Unknown message type: {kind}"})
+            except ValueError as e:
+                await websocket.send_json({"type": "error", "detail": str(e)})
+    except WebSocketDisconnect:
+        pass
+
 @router.post("/seed", status_code=201)
 async def seed_responders(
     lat: float = 40.7128, 
@@ -186,4 +357,6 @@ async def seed_responders(
         created.append(responder)
         
     await db.commit()
+    for responder in created:
+        responder_index.upsert(responder)
     return {"message": f"Seeded {len(created)} responders"}
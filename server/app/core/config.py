@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
@@ -12,6 +13,108 @@ class Settings(BaseSettings):
     
     GROQ_API_KEY: str = "" 
     GROQ_API_KEY2: str = ""
+    GROQ_API_KEYS: str = ""  # extra comma-separated keys for the AI gateway pool
+
+    # Shared AI gateway: per-key request rate, global concurrency and
+    # circuit breaker settings
+    AI_KEY_REQUESTS_PER_MINUTE: int = 30
+    AI_MAX_CONCURRENCY: int = 16
+    AI_MAX_QUEUE_WAIT_SECONDS: float = 5.0
+    AI_REQUEST_TIMEOUT_SECONDS: float = 20.0
+    AI_RATE_LIMIT_COOLDOWN_SECONDS: float = 10.0
+    AI_BREAKER_FAILURE_THRESHOLD: int = 5
+    AI_BREAKER_RESET_SECONDS: float = 30.0
+
+    # AI backend behind the gateway: "groq" (real API), "fake" (in-process
+    # stand-in with synthetic latency and errors), "record" (groq, saving
+    # every exchange to AI_RECORDING_PATH) or "replay" (serve recordings).
+    AI_BACKEND: str = "groq"
+    AI_RECORDING_PATH: str = "ai_recordings.jsonl"
+    AI_REPLAY_MISS: str = "error"  # on a request with no recording: "error" or "fake"
+    AI_REPLAY_LATENCY: bool = True  # replay with the recorded latency
+    # Fake backend latency in ms: "constant", "uniform" (median +/- spread*median),
+    # "lognormal" (median, sigma=spread) or "exponential" (mean=median)
+    AI_FAKE_LATENCY_DISTRIBUTION: str = "lognormal"
+    AI_FAKE_LATENCY_MS: float = 800.0
+    AI_FAKE_LATENCY_SPREAD: float = 0.5
+    AI_FAKE_ERROR_RATE: float = 0.0
+    AI_FAKE_RATE_LIMIT_RATE: float = 0.0
+    AI_FAKE_SEED: Optional[int] = None
+
+    # AI triage for POST /incidents: "inline" waits for the LLM before responding,
+    # "async" stores a provisional priority and lets background workers fill it in.
+    TRIAGE_MODE: str = "inline"
+    TRIAGE_WORKERS: int = 4
+    TRIAGE_QUEUE_SIZE: int = 1000
+    TRIAGE_PROVISIONAL_PRIORITY: int = 5
+    # On start, re-queue up to this many pending incidents still waiting for
+    # triage (left over from a restart or crash); 0 disables
+    TRIAGE_RECOVER_LIMIT: int = 5000
+
+    # Triage result cache keyed on the normalized transcript (and optionally
+    # a coarse location cell of TRIAGE_CACHE_CELL_DEGREES, ~1 km at 0.01)
+    TRIAGE_CACHE_SIZE: int = 5000
+    TRIAGE_CACHE_TTL_SECONDS: int = 900
+    TRIAGE_CACHE_USE_LOCATION: bool = False
+    TRIAGE_CACHE_CELL_DEGREES: float = 0.01
+
+    # Micro-batching of concurrent triage calls into one completion
+    # (0 disables batching)
+    TRIAGE_BATCH_WINDOW_MS: int = 50
+    TRIAGE_BATCH_MAX_ITEMS: int = 20
+
+    # Hedged triage: the local rule classifier answers immediately, the LLM
+    # result is used if it arrives within the deadline. Rule results at or
+    # above the confidence floor can still raise the LLM's priority.
+    TRIAGE_LLM_DEADLINE_MS: int = 3000
+    TRIAGE_RULE_FLOOR_CONFIDENCE: float = 0.9
+
+    # Stored detailed analyses: pre-warm in the background for incidents at
+    # or above this priority once triaged (0 disables pre-warming). Past
+    # ANALYSIS_PREWARM_MAX_PENDING waiting or running, new ones are dropped
+    ANALYSIS_PREWARM_PRIORITY: int = 8
+    ANALYSIS_PREWARM_MAX_PENDING: int = 20
+
+    # LLM responder-type recommendations for categories the dispatch table
+    # leaves open, cached per category, priority band and summary
+    DISPATCH_CACHE_SIZE: int = 2000
+    DISPATCH_CACHE_TTL_SECONDS: int = 3600
+
+    # Incident tables in the clustering and prediction prompts: token budget
+    # for the rows, coordinate precision (3 decimals ~ 110 m) and summary length
+    AI_ANALYTICS_TOKEN_BUDGET: int = 2500
+    AI_ANALYTICS_COORD_DECIMALS: int = 3
+    AI_ANALYTICS_SUMMARY_WORDS: int = 8
+    ANALYTICS_CLUSTER_MAX_INCIDENTS: int = 300
+    ANALYTICS_PREDICTION_MAX_INCIDENTS: int = 500
+
+    # In-memory responder index for nearby queries: grid cell size (0.05 deg
+    # ~ 5.5 km) and how often it is reloaded from the database (0 = never)
+    RESPONDER_INDEX_CELL_DEGREES: float = 0.05
+    RESPONDER_INDEX_REFRESH_SECONDS: int = 30
+
+    # Responder GPS fixes are buffered in memory (latest per unit) and
+    # written to the database in one bulk UPDATE this often
+    RESPONDER_LOCATION_FLUSH_MS: int = 1000
+    RESPONDER_LOCATION_BATCH_MAX: int = 5000  # fixes per POST /responders/locations
+
+    # Fleet WebSocket: responder changes are coalesced per unit and pushed to
+    # watching consoles at most this often
+    FLEET_PUSH_INTERVAL_MS: int = 500
+
+    # Geographic filters pushed into the database: "bbox" (lat/lng ranges on
+    # the composite location indexes, haversine for the exact circle),
+    # "earthdistance" or "postgis" (radius filters on GiST indexes; run
+    # scripts/migrate/geo_indexes.py first)
+    SPATIAL_BACKEND: str = "bbox"
+
+    # Media uploads
+    UPLOAD_DIR: str = "uploads"
+    MAX_IMAGE_UPLOAD_MB: int = 10
+    MAX_AUDIO_UPLOAD_MB: int = 25
+
+    # Bulk CAD/backfill import: rows per COPY batch (one transaction each)
+    BULK_INGEST_BATCH_SIZE: int = 5000
 
     @property
     def SQLALCHEMY_DATABASE_URI(self) -> str:
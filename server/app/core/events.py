@@ -0,0 +1,139 @@
+import asyncio
+import json
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, List, Optional, Set, Tuple
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+
+SSE_KEEPALIVE_SECONDS = 15
+
+
+@dataclass
+class Event:
+    seq: int
+    type: str
+    data: Dict[str, Any]
+    at: float
+
+
+class Subscription:
+    def __init__(self, maxsize: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+
+class EventBus:
+    """
+    In-process publish/subscribe channel with a replay buffer.
+
+    Every published event gets a sequence number. Clients hold on to a
+    resume token ("<epoch>:<seq>") and, when they reconnect, get the events
+    they missed from the buffer. A token from another process lifetime or
+    older than the buffer can't be resumed and the client has to reload.
+    """
+
+    def __init__(self, name: str, history: int = 1000, subscriber_queue: int = 1000):
+        self.name = name
+        self.epoch = uuid.uuid4().hex[:8]
+        self.seq = 0
+        self.history: Deque[Event] = deque(maxlen=history)
+        self.subscriber_queue = subscriber_queue
+        self.subscribers: Set[Subscription] = set()
+
+    def token(self, seq: Optional[int] = None) -> str:
+        return f"{self.epoch}:{self.seq if seq is None else seq}"
+
+    def publish(self, type: str, data: Any) -> Event:
+        self.seq += 1
+        event = Event(seq=self.seq, type=type, data=jsonable_encoder(data), at=time.time())
+        self.history.append(event)
+
+        for subscription in self.subscribers:
+            if subscription.overflowed:
+                continue
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Slow consumer: stop feeding it, it will be told to reload
+                subscription.overflowed = True
+        return event
+
+    def parse_token(self, token: Optional[str]) -> Optional[int]:
+        """
+        Sequence number a resume token points at, or None if it can't be
+        resumed from this bus.
+        """
+        if not token:
+            return None
+        epoch, _, seq = token.partition(":")
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        return int(seq)
+
+    def since(self, seq: int) -> Tuple[List[Event], bool]:
+        """
+        Events published after `seq`. The flag is False when part of that
+        range has already dropped out of the buffer.
+        """
+        if seq >= self.seq:
+            return [], True
+        complete = bool(self.history) and self.history[0].seq <= seq + 1
+        return [event for event in self.history if event.seq > seq], complete
+
+    @contextmanager
+    def subscribe(self) -> Iterator[Subscription]:
+        subscription = Subscription(self.subscriber_queue)
+        self.subscribers.add(subscription)
+        try:
+            yield subscription
+        finally:
+            self.subscribers.discard(subscription)
+
+
+def format_sse(event_type: str, data: Any, id: Optional[str] = None) -> str:
+    lines = []
+    if id:
+        lines.append(f"id: {id}")
+    lines.append(f"event: {event_type}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def sse_stream(bus: EventBus, request: Request, token: Optional[str]) -> AsyncIterator[str]:
+    """
+    Server-Sent Events stream of a bus, resuming after `token` when possible.
+
+    A "reset" event means the client's state can't be brought up to date
+    from deltas and it should reload the full listing.
+    """
+    with bus.subscribe() as subscription:
+        last_seq = bus.parse_token(token)
+        missed, complete = bus.since(last_seq) if last_seq is not None else ([], False)
+
+        if not complete:
+            missed, last_seq = [], bus.seq
+            yield format_sse("reset", {"token": bus.token()}, id=bus.token())
+        for event in missed:
+            last_seq = event.seq
+            yield format_sse(event.type, event.data, id=bus.token(event.seq))
+
+        while not await request.is_disconnected():
+            if subscription.overflowed and subscription.queue.empty():
+                yield format_sse("reset", {"token": bus.token()}, id=bus.token())
+                return
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), timeout=SSE_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if event.seq <= last_seq:
+                continue  # already sent while replaying
+            last_seq = event.seq
+            yield format_sse(event.type, event.data, id=bus.token(event.seq))
+
+
+incident_events = EventBus("incidents")
@@ -0,0 +1,143 @@
+import asyncio
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+from app.core.config import settings
+
+Bounds = Tuple[float, float, float, float]
+
+
+def in_bounds(record: Dict[str, Any], bounds: Optional[Bounds]) -> bool:
+    lat, lng = record.get("latitude"), record.get("longitude")
+    if lat is None or lng is None:
+        return False
+    if bounds is None:
+        return True
+    west, south, east, north = bounds
+    if not south <= lat <= north:
+        return False
+    return (lng >= west or lng <= east) if west > east else west <= lng <= east
+
+
+class FleetSubscription:
+    """
+    One console's view of the fleet: its viewport, the units it currently
+    shows and the changes not yet sent to it. Changes are kept per unit, so
+    a slow console gets one row per unit instead of a backlog.
+    """
+
+    def __init__(self):
+        self.bounds: Optional[Bounds] = None
+        self.watching = False
+        self.visible: Set[int] = set()
+        # responder id -> current record, or None to remove it from the view
+        self.pending: Dict[int, Optional[Dict[str, Any]]] = {}
+        self.needs_snapshot = False
+        self.wake = asyncio.Event()
+
+    def watch(self, bounds: Optional[Bounds]) -> None:
+        """
+        Switch viewport; the sender answers with a fresh snapshot.
+        """
+        self.bounds = bounds
+        self.watching = True
+        self.needs_snapshot = True
+        self.wake.set()
+
+    def reset(self, records: List[Dict[str, Any]]) -> None:
+        """
+        The snapshot in `records` was sent: it replaces the view and
+        anything pending.
+        """
+        self.visible = {record["id"] for record in records}
+        self.pending.clear()
+        self.needs_snapshot = False
+
+    def offer(self, responder_id: int, record: Optional[Dict[str, Any]]) -> None:
+        if not self.watching:
+            return
+        if record is not None and in_bounds(record, self.bounds):
+            self.visible.add(responder_id)
+            self.pending[responder_id] = record
+        elif responder_id in self.visible:
+            self.visible.discard(responder_id)
+            self.pending[responder_id] = None
+        else:
+            return
+        self.wake.set()
+
+    def take(self) -> Tuple[List[Dict[str, Any]], List[int]]:
+        """
+        (upserts, removes) accumulated since the last call.
+        """
+        pending, self.pending = self.pending, {}
+        upserts = [record for record in pending.values() if record is not None]
+        removes = [responder_id for responder_id, record in pending.items() if record is None]
+        return upserts, removes
+
+
+class FleetHub:
+    """
+    Fans responder changes out to dispatch consoles watching a viewport.
+
+    Changes are coalesced per unit and pushed at most every `interval_ms`,
+    so a unit that reports five times between pushes costs one delta row,
+    and a console only hears about units inside (or leaving) its viewport.
+    """
+
+    def __init__(self, interval_ms: int):
+        self.interval = interval_ms / 1000
+        # responder id -> record (read at push time, so always the latest), or None if removed
+        self.changed: Dict[int, Optional[Dict[str, Any]]] = {}
+        self.subscriptions: Set[FleetSubscription] = set()
+        self.changes = 0
+        self.pushes = 0
+        self._pusher: Optional[asyncio.Task] = None
+
+    def notify(self, responder_id: int, record: Optional[Dict[str, Any]]) -> None:
+        self.changes += 1
+        if self.subscriptions:
+            self.changed[responder_id] = record
+
+    def fan_out(self) -> None:
+        if not self.changed:
+            return
+        changed, self.changed = self.changed, {}
+        self.pushes += 1
+        for subscription in self.subscriptions:
+            for responder_id, record in changed.items():
+                subscription.offer(responder_id, record)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            self.fan_out()
+
+    async def start(self) -> None:
+        if self._pusher is None:
+            self._pusher = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._pusher is not None:
+            self._pusher.cancel()
+            await asyncio.gather(self._pusher, return_exceptions=True)
+            self._pusher = None
+
+    @contextmanager
+    def subscribe(self) -> Iterator[FleetSubscription]:
+        subscription = FleetSubscription()
+        self.subscriptions.add(subscription)
+        try:
+            yield subscription
+        finally:
+            self.subscriptions.discard(subscription)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": len(self.subscriptions),
+            "changes": self.changes,
+            "pushes": self.pushes,
+            "push_interval_ms": int(self.interval * 1000),
+        }
+
+
+fleet_hub = FleetHub(settings.FLEET_PUSH_INTERVAL_MS)
@@ -0,0 +1,176 @@
+import asyncio
+import hashlib
+import json
+from typing import Any, AsyncIterator, Dict, Optional, Set, Tuple
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.models import Incident, EmergencyCall, IncidentAnalysis
+from app.ai.client import generate_detailed_analysis, stream_detailed_analysis, DETAILED_ANALYSIS_FALLBACK, ANALYSIS_FIELD_ORDER
+
+# Incident fields the detailed analysis depends on
+ANALYSIS_INPUT_FIELDS = {"priority_score", "category"}
+
+_prewarm_tasks: Set[asyncio.Task] = set()
+_prewarm_slots = asyncio.Semaphore(2)
+
+
+def analysis_inputs(transcript: Optional[str], category: Any, priority: Optional[int],
+                    lat: Optional[float], lng: Optional[float]) -> Dict[str, Any]:
+    """
+    The incident_data passed to the detailed analysis prompt.
+    """
+    return {
+        "description": transcript or "",
+        "category": category.value if category else "unknown",
+        "priority": priority,
+        "location": f"{lat}, {lng}" if lat else "Unknown",
+    }
+
+
+def analysis_input_hash(incident_data: Dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(incident_data, sort_keys=True).encode()).hexdigest()
+
+
+async def load_incident_analysis(db: AsyncSession, incident_id: int) -> Optional[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]]:
+    """
+    Fetch an incident's analysis inputs and its stored analysis in one
+    primary-key query. Returns None for an unknown incident, otherwise
+    (incident_data, payload) where payload is None unless the stored
+    analysis was made from the current inputs.
+    """
+    query = (
+        select(
+            EmergencyCall.raw_transcript,
+            Incident.category,
+            Incident.priority_score,
+            EmergencyCall.location_lat,
+            EmergencyCall.location_long,
+            IncidentAnalysis.input_hash,
+            IncidentAnalysis.payload,
+        )
+        .select_from(Incident)
+        .outerjoin(EmergencyCall, EmergencyCall.call_id == Incident.call_id)
+        .outerjoin(IncidentAnalysis, IncidentAnalysis.incident_id == Incident.id)
+        .where(Incident.id == incident_id)
+    )
+    row = (await db.execute(query)).first()
+    if row is None:
+        return None
+
+    transcript, category, priority, lat, lng, stored_hash, payload = row
+    incident_data = analysis_inputs(transcript, category, priority, lat, lng)
+    if stored_hash != analysis_input_hash(incident_data):
+        payload = None
+    return incident_data, payload
+
+
+async def store_analysis(db: AsyncSession, incident_id: int, incident_data: Dict[str, Any], payload: Dict[str, Any]) -> None:
+    statement = insert(IncidentAnalysis).values(
+        incident_id=incident_id,
+        input_hash=analysis_input_hash(incident_data),
+        payload=payload,
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[IncidentAnalysis.incident_id],
+        set_={"input_hash": statement.excluded.input_hash, "payload": statement.excluded.payload},
+    )
+    await db.execute(statement)
+    await db.commit()
+
+
+async def invalidate_analysis(db: AsyncSession, incident_id: int) -> None:
+    """
+    Drop the stored analysis. Does not commit.
+    """
+    await db.execute(delete(IncidentAnalysis).where(IncidentAnalysis.incident_id == incident_id))
+
+
+async def get_or_create_analysis(db: AsyncSession, incident_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Stored analysis for the incident, generating and storing it when
+    missing or stale. The fallback analysis is returned but never stored,
+    so the next request tries the LLM again.
+    """
+    loaded = await load_incident_analysis(db, incident_id)
+    if loaded is None:
+        return None
+    incident_data, payload = loaded
+    if payload is not None:
+        return payload
+
+    try:
+        payload = await generate_detailed_analysis(incident_data)
+    except Exception as e:
+        print(f"Error in detailed analysis: {e}")
+        return dict(DETAILED_ANALYSIS_FALLBACK)
+
+    await store_analysis(db, incident_id, incident_data, payload)
+    return payload
+
+
+async def stream_analysis_events(incident_id: int, incident_data: Dict[str, Any], payload: Optional[Dict[str, Any]]) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """
+    (event, data) pairs for the streaming analysis endpoint: one "field"
+    event per analysis field, situation and instructions first, then
+    "done" with where the analysis came from (stored, llm or fallback).
+
+    A stored analysis is replayed at once. Otherwise fields are forwarded
+    as the LLM produces them and the complete analysis is stored; if the
+    stream fails, the fields still missing are filled from the fallback,
+    which is not stored.
+    """
+    if payload is not None:
+        for key in ANALYSIS_FIELD_ORDER + [key for key in payload if key not in ANALYSIS_FIELD_ORDER]:
+            if key in payload:
+                yield "field", {"key": key, "value": payload[key]}
+        yield "done", {"source": "stored"}
+        return
+
+    fields: Dict[str, Any] = {}
+    try:
+        async for key, value in stream_detailed_analysis(incident_data):
+            fields[key] = value
+            yield "field", {"key": key, "value": value}
+    except Exception as e:
+        print(f"Error in streamed detailed analysis: {e}")
+        for key, value in DETAILED_ANALYSIS_FALLBACK.items():
+            if key not in fields:
+                yield "field", {"key": key, "value": value}
+        yield "done", {"source": "fallback"}
+        return
+
+    # The request's session is gone by now, store with a fresh one
+    try:
+        async with AsyncSessionLocal() as session:
+            await store_analysis(session, incident_id, incident_data, fields)
+    except Exception as e:
+        print(f"Error storing streamed analysis for incident {incident_id}: {e}")
+    yield "done", {"source": "llm"}
+
+
+async def _prewarm(incident_id: int) -> None:
+    async with _prewarm_slots:
+        try:
+            async with AsyncSessionLocal() as session:
+                await get_or_create_analysis(session, incident_id)
+        except Exception as e:
+            print(f"Error pre-warming analysis for incident {incident_id}: {e}")
+
+
+def prewarm_analysis(incident_id: int, priority: Optional[int]) -> None:
+    """
+    Generate the detailed analysis in the background for high-priority
+    incidents so the dispatcher's first open is already a stored read.
+    """
+    threshold = settings.ANALYSIS_PREWARM_PRIORITY
+    if not threshold or priority is None or priority < threshold:
+        return
+    if len(_prewarm_tasks) >= settings.ANALYSIS_PREWARM_MAX_PENDING:
+        # Opening the incident still generates it; don't pile up behind the slots
+        return
+    task = asyncio.create_task(_prewarm(incident_id))
+    _prewarm_tasks.add(task)
+    task.add_done_callback(_prewarm_tasks.discard)
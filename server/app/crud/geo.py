@@ -0,0 +1,104 @@
+from typing import Any, List, Optional, Tuple
+from sqlalchemy import and_, func, or_
+from app.core.config import settings
+from app.utils.distance import EARTH_RADIUS_KM
+from app.utils.spatial import radius_bounds
+
+SPATIAL_BACKENDS = ("bbox", "earthdistance", "postgis")
+
+
+def bbox_filter(lat_column, lng_column, west: float, south: float, east: float, north: float):
+    """
+    Filter a lat/lng column pair on a box; handles boxes crossing the
+    antimeridian (west > east). Served by the composite location indexes.
+    """
+    west, south, east, north = float(west), float(south), float(east), float(north)
+    if west <= east:
+        lng_clause = lng_column.between(west, east)
+    else:
+        lng_clause = or_(lng_column >= west, lng_column <= east)
+    return and_(lat_column.between(south, north), lng_clause)
+
+
+def geography_point(lat, lng):
+    """
+    geography(ST_SetSRID(ST_MakePoint(lng, lat), 4326)), the expression the
+    PostGIS location indexes are built on.
+    """
+    return func.geography(func.ST_SetSRID(func.ST_MakePoint(lng, lat), 4326))
+
+
+def haversine_km(lat_column, lng_column, latitude: float, longitude: float):
+    """
+    Great-circle distance from (latitude, longitude) in km as a SQL
+    expression; the same formula as app.utils.distance.
+    """
+    half_dlat = func.radians(lat_column - latitude) * 0.5
+    half_dlng = func.radians(lng_column - longitude) * 0.5
+    a = (
+        func.power(func.sin(half_dlat), 2)
+        + func.cos(func.radians(latitude)) * func.cos(func.radians(lat_column)) * func.power(func.sin(half_dlng), 2)
+    )
+    # Rounding can push a just past 1, outside asin's domain
+    return 2 * EARTH_RADIUS_KM * func.asin(func.sqrt(func.least(a, 1.0)))
+
+
+def radius_filter(lat_column, lng_column, latitude: float, longitude: float, radius_km: float, backend: Optional[str] = None):
+    """
+    Filter a lat/lng column pair on a circle, using SPATIAL_BACKEND:
+
+    - "bbox": the circle's bounding box, served by the composite location
+      indexes, then haversine on the rows inside it to drop the corners.
+    - "earthdistance": earth_box/earth_distance, backed by a GiST index on
+      ll_to_earth(lat, lng).
+    - "postgis": ST_DWithin on geography points, backed by a GiST index on
+      the same expression.
+
+    The GiST indexes are created by scripts/migrate/geo_indexes.py.
+    """
+    backend = backend or settings.SPATIAL_BACKEND
+    radius_m = radius_km * 1000.0
+
+    if backend == "earthdistance":
+        center = func.ll_to_earth(latitude, longitude)
+        point = func.ll_to_earth(lat_column, lng_column)
+        # earth_box over-covers the circle, earth_distance makes it exact
+        return and_(
+            func.earth_box(center, radius_m).op("@>")(point),
+            func.earth_distance(center, point) <= radius_m,
+        )
+    if backend == "postgis":
+        return func.ST_DWithin(
+            geography_point(lat_column, lng_column),
+            geography_point(latitude, longitude),
+            radius_m,
+            False,  # sphere, like haversine; the spheroid is slower
+        )
+    return and_(
+        bbox_filter(lat_column, lng_column, *radius_bounds(latitude, longitude, radius_km)),
+        haversine_km(lat_column, lng_column, latitude, longitude) <= radius_km,
+    )
+
+
+def location_filters(
+    lat_column,
+    lng_column,
+    bounds: Optional[Tuple[float, float, float, float]] = None,
+    latitude: Optional[float] = None,
+    longitude: Optional[float] = None,
+    radius_km: Optional[float] = None,
+) -> List[Any]:
+    """
+    Filters for an optional viewport and an optional circle around
+    (latitude, longitude). Rows without a location are excluded whenever
+    either is given.
+    """
+    filters = []
+    if bounds is not None:
+        filters.append(bbox_filter(lat_column, lng_column, *bounds))
+    if latitude is not None and longitude is not None and radius_km is not None:
+        filters.append(radius_filter(lat_column, lng_column, latitude, longitude, radius_km))
+    if filters:
+        filters[:0] = [lat_column.is_not(None), lng_column.is_not(None)]
+    return filters
+
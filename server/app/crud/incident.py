@@ -0,0 +1,197 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import func, insert, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.models import Incident, EmergencyCall
+from app.models.enums import IncidentStatus
+from app.utils.tiles import cluster_cell_size
+from app.crud.geo import bbox_filter
+
+calls_table = EmergencyCall.__table__
+incidents_table = Incident.__table__
+
+
+def build_create_statement(call_values: Dict[str, Any], incident_values: Dict[str, Any]):
+    """
+    Single statement that inserts the EmergencyCall and its Incident and
+    returns both rows:
+
+        WITH new_call AS (INSERT INTO emergency_calls ... RETURNING *),
+             new_incident AS (INSERT INTO incidents ... SELECT ... FROM new_call RETURNING *)
+        SELECT ... FROM new_incident JOIN new_call
+    """
+    new_call = (
+        insert(calls_table)
+        .values(**call_values)
+        .returning(*calls_table.c)
+        .cte("new_call")
+    )
+
+    incident_values = {"status": IncidentStatus.PENDING, **incident_values}
+    columns = list(incident_values)
+    new_incident = (
+        insert(incidents_table)
+        .from_select(
+            ["call_id", *columns],
+            select(
+                new_call.c.call_id,
+                *[
+                    literal(incident_values[name], type_=incidents_table.c[name].type)
+                    for name in columns
+                ],
+            ),
+        )
+        .returning(*incidents_table.c)
+        .cte("new_incident")
+    )
+
+    return select(
+        *new_incident.c,
+        *[column.label(f"call__{column.name}") for column in new_call.c],
+    ).join_from(new_incident, new_call, new_incident.c.call_id == new_call.c.call_id)
+
+
+def incident_listing_select():
+    """
+    Column-projected Core select of incidents joined with their call, in
+    the IncidentResponse shape. Call columns are labelled "call__<name>".
+    Rows come back as plain tuples, no ORM objects are built.
+    """
+    return select(
+        *incidents_table.c,
+        *[column.label(f"call__{column.name}") for column in calls_table.c],
+    ).join_from(incidents_table, calls_table, incidents_table.c.call_id == calls_table.c.call_id)
+
+
+def rows_to_payloads(keys: Sequence[str], rows: Sequence[Sequence[Any]]) -> List[Dict[str, Any]]:
+    """
+    Nest "call__" columns under "call", turning rows into IncidentResponse dicts.
+    """
+    incident_keys = [(i, key) for i, key in enumerate(keys) if not key.startswith("call__")]
+    call_keys = [(i, key[len("call__"):]) for i, key in enumerate(keys) if key.startswith("call__")]
+
+    payloads = []
+    for row in rows:
+        payload = {key: row[i] for i, key in incident_keys}
+        payload["call"] = {key: row[i] for i, key in call_keys}
+        payloads.append(payload)
+    return payloads
+
+
+def row_to_incident_payload(row) -> Dict[str, Any]:
+    """
+    Turn a row of build_create_statement into the IncidentResponse shape.
+    """
+    return rows_to_payloads(list(row._mapping.keys()), [row])[0]
+
+
+async def create_incident_with_call(
+    db: AsyncSession,
+    call_values: Dict[str, Any],
+    incident_values: Dict[str, Any],
+    commit: bool = True,
+) -> Optional[Dict[str, Any]]:
+    """
+    Insert an EmergencyCall and its Incident in one round trip and return
+    the IncidentResponse payload without re-querying.
+    """
+    result = await db.execute(build_create_statement(call_values, incident_values))
+    row = result.first()
+    if commit:
+        await db.commit()
+    return row_to_incident_payload(row) if row else None
+
+
+def bbox_clause(west: float, south: float, east: float, north: float):
+    """
+    Filter on the call location; handles boxes crossing the antimeridian.
+    """
+    return bbox_filter(EmergencyCall.location_lat, EmergencyCall.location_long, west, south, east, north)
+
+
+async def cluster_incidents(
+    db: AsyncSession,
+    zoom: int,
+    bounds: Optional[Tuple[float, float, float, float]],
+    filters: Sequence[Any] = (),
+) -> List[Any]:
+    """
+    Grid-cluster incident locations in the database. Returns one row per
+    non-empty cell with its count, centroid, highest priority and the
+    lowest incident id in it.
+    """
+    cell = cluster_cell_size(zoom)
+    lat = EmergencyCall.location_lat
+    lng = EmergencyCall.location_long
+
+    query = (
+        select(
+            func.floor(lng / cell).label("gx"),
+            func.floor(lat / cell).label("gy"),
+            func.count().label("count"),
+            func.avg(lng).label("lng"),
+            func.avg(lat).label("lat"),
+            func.max(Incident.priority_score).label("max_priority"),
+            func.min(Incident.id).label("id"),
+        )
+        .select_from(Incident)
+        .join(EmergencyCall, Incident.call_id == EmergencyCall.call_id)
+        .where(lat.is_not(None), lng.is_not(None), *filters)
+        .group_by("gx", "gy")
+    )
+    if bounds:
+        query = query.where(bbox_clause(*bounds))
+
+    result = await db.execute(query)
+    return result.all()
+
+
+async def copy_incidents(db: AsyncSession, records: Sequence[Any], default_priority: int) -> List[int]:
+    """
+    Bulk-load imported calls (app.utils.ingest.IngestRecord) with Postgres
+    COPY. Ids are reserved from the sequences first so both tables can be
+    copied without RETURNING. Runs in the session's transaction; the caller
+    commits. Returns the new incident ids.
+    """
+    count = len(records)
+    ids = await db.execute(
+        select(
+            func.nextval(func.pg_get_serial_sequence("emergency_calls", "call_id")),
+            func.nextval(func.pg_get_serial_sequence("incidents", "id")),
+        ).select_from(func.generate_series(1, count))
+    )
+    call_ids, incident_ids = zip(*ids.all())
+
+    # Enum columns store member names, COPY bypasses SQLAlchemy's conversion
+    now = datetime.now(timezone.utc)
+    call_rows = []
+    incident_rows = []
+    for call_id, incident_id, record in zip(call_ids, incident_ids, records):
+        timestamp = record.timestamp or now
+        call_rows.append((
+            call_id, timestamp, record.caller_phone, record.description,
+            record.latitude, record.longitude,
+        ))
+        incident_rows.append((
+            incident_id, call_id, record.status.name,
+            record.priority_score or default_priority,
+            timestamp, now,
+            record.category.name if record.category else None,
+            record.summary or record.description[:200],
+        ))
+
+    connection = await db.connection()
+    raw = await connection.get_raw_connection()
+    driver = raw.driver_connection  # asyncpg connection, same transaction
+
+    await driver.copy_records_to_table(
+        calls_table.name,
+        records=call_rows,
+        columns=["call_id", "timestamp", "caller_phone", "raw_transcript", "location_lat", "location_long"],
+    )
+    await driver.copy_records_to_table(
+        incidents_table.name,
+        records=incident_rows,
+        columns=["id", "call_id", "status", "priority_score", "created_at", "updated_at", "category", "summary"],
+    )
+    return list(incident_ids)
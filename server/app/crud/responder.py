@@ -0,0 +1,422 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import bindparam, exists, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.fleet import fleet_hub
+from app.models.models import Responder, Incident
+from app.models.enums import ResponderStatus, ResponderType, IncidentStatus
+from app.utils.spatial import GridIndex
+
+# Responder fields kept in memory, in the ResponderResponse shape
+RESPONDER_FIELDS = ("id", "name", "type", "status", "latitude", "longitude", "current_incident_id")
+
+# Core executemany UPDATE; unlike the ORM bulk update it doesn't fail the
+# batch when a fix's responder no longer exists
+LOCATION_UPDATE = (
+    update(Responder.__table__)
+    .where(Responder.__table__.c.id == bindparam("responder_id"))
+    .values(latitude=bindparam("fix_latitude"), longitude=bindparam("fix_longitude"))
+)
+
+
+class LocationBuffer:
+    """
+    Write-behind buffer for responder GPS fixes. Only the latest fix per
+    responder is kept, and every RESPONDER_LOCATION_FLUSH_MS the buffered
+    ones are written to `responders` in one bulk UPDATE instead of a
+    transaction per report.
+
+    Fixes are numbered in arrival order; `committed` is the highest number
+    known to be in the database, so readers of a database snapshot can tell
+    which fixes it may be missing.
+    """
+
+    def __init__(self):
+        # responder id -> (sequence, latitude, longitude, recorded_at)
+        self.latest: Dict[int, Tuple[int, float, float, Optional[float]]] = {}
+        # responder id -> sequence of its fix awaiting a flush
+        self.pending: Dict[int, int] = {}
+        self.sequence = 0
+        self.committed = 0
+        self.reports = 0
+        self.stale = 0
+        self.flushes = 0
+        self.rows_written = 0
+        self.failures = 0
+        self._lock = asyncio.Lock()
+        self._flusher: Optional[asyncio.Task] = None
+
+    def add(self, responder_id: int, latitude: float, longitude: float, recorded_at: Optional[float] = None) -> bool:
+        """
+        Buffer a fix. Returns False if it is older (by `recorded_at`, epoch
+        seconds) than the fix already held for the responder.
+        """
+        self.reports += 1
+        current = self.latest.get(responder_id)
+        if current is not None and None not in (recorded_at, current[3]) and recorded_at < current[3]:
+            self.stale += 1
+            return False
+        self.sequence += 1
+        self.latest[responder_id] = (self.sequence, latitude, longitude, recorded_at)
+        self.pending[responder_id] = self.sequence
+        return True
+
+    def unflushed(self, responder_id: int) -> Optional[Tuple[float, float]]:
+        """
+        The responder's buffered position if it may not be in the database yet.
+        """
+        fix = self.latest.get(responder_id)
+        if fix is None or fix[0] <= self.committed:
+            return None
+        return fix[1], fix[2]
+
+    def since(self, mark: int) -> Dict[int, Tuple[float, float]]:
+        """
+        Latest positions of fixes newer than `mark` (a previous `committed`).
+        """
+        return {responder_id: (fix[1], fix[2]) for responder_id, fix in self.latest.items() if fix[0] > mark}
+
+    async def flush(self) -> int:
+        """
+        Write the buffered fixes in one executemany UPDATE. On failure they
+        go back to the buffer unless a newer fix has arrived meanwhile.
+        Returns the number of rows written.
+        """
+        async with self._lock:
+            if not self.pending:
+                return 0
+            batch, self.pending = self.pending, {}
+            rows = [
+                {
+                    "responder_id": responder_id,
+                    "fix_latitude": self.latest[responder_id][1],
+                    "fix_longitude": self.latest[responder_id][2],
+                }
+                for responder_id in sorted(batch)  # fixed lock order across workers
+            ]
+            try:
+                async with AsyncSessionLocal() as session:
+                    await session.execute(LOCATION_UPDATE, rows)
+                    await session.commit()
+            except Exception as e:
+                print(f"Error flushing responder locations: {e}")
+                self.failures += 1
+                for responder_id, sequence in batch.items():
+                    self.pending.setdefault(responder_id, sequence)
+                return 0
+
+            self.committed = max(self.committed, max(batch.values()))
+            self.flushes += 1
+            self.rows_written += len(rows)
+            return len(rows)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(settings.RESPONDER_LOCATION_FLUSH_MS / 1000)
+            await self.flush()
+
+    async def start(self) -> None:
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._flusher is not None:
+            self._flusher.cancel()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+        # Don't lose the last interval's fixes on shutdown
+        await self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "reports": self.reports,
+            "stale": self.stale,
+            "pending": len(self.pending),
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+            "failures": self.failures,
+            "flush_interval_ms": settings.RESPONDER_LOCATION_FLUSH_MS,
+        }
+
+
+class ResponderIndex:
+    """
+    In-memory copy of the responder fleet with a grid index over positions,
+    so nearby queries don't touch the database.
+
+    Kept current by the responder endpoints that change a unit, and
+    reloaded from the database every RESPONDER_INDEX_REFRESH_SECONDS to
+    pick up writes made elsewhere (other workers, seed scripts). GPS fixes
+    apply here at once and reach the database later through `locations`,
+    so rows read from the database are overlaid with the fixes they may
+    not contain yet, and units written while a reload was reading keep
+    their in-memory record.
+    """
+
+    def __init__(self, cell_degrees: float, locations: LocationBuffer):
+        self.locations = locations
+        self.grid = GridIndex(cell_degrees)
+        self.records: Dict[int, Dict[str, Any]] = {}
+        self.loaded = False
+        self.queries = 0
+        # Bumped on every write; responder id -> version of its last write,
+        # so a reload knows which units changed while it was reading
+        self.version = 0
+        self.written: Dict[int, int] = {}
+        # Called with (responder_id, record or None when removed) on every change
+        self.listeners: List[Callable[[int, Optional[Dict[str, Any]]], None]] = []
+        self._refresher: Optional[asyncio.Task] = None
+
+    def upsert(self, responder: Any) -> None:
+        """
+        Add or update a unit from a Responder (or anything with its attributes).
+        """
+        record = {field: getattr(responder, field) for field in RESPONDER_FIELDS}
+        position = self.locations.unflushed(record["id"])
+        if position is not None:
+            record["latitude"], record["longitude"] = position
+        self._store(record)
+
+    def _store(self, record: Dict[str, Any]) -> None:
+        self.version += 1
+        self.written[record["id"]] = self.version
+        self.records[record["id"]] = record
+        if record["latitude"] is not None and record["longitude"] is not None:
+            self.grid.set(record["id"], record["latitude"], record["longitude"])
+        else:
+            self.grid.remove(record["id"])
+        self._notify(record["id"], record)
+
+    def _notify(self, responder_id: int, record: Optional[Dict[str, Any]]) -> None:
+        for listener in self.listeners:
+            listener(responder_id, record)
+
+    def update(self, responder_id: int, **values: Any) -> None:
+        record = self.records.get(responder_id)
+        if record is None:
+            return
+        record.update(values)
+        self._store(record)
+
+    def report_position(self, responder_id: int, latitude: float, longitude: float, recorded_at: Optional[float] = None) -> bool:
+        """
+        Take a GPS fix: visible to nearby queries immediately, written to
+        the database on the next buffer flush. Returns False for a fix
+        older than the one already buffered.
+        """
+        if not self.locations.add(responder_id, latitude, longitude, recorded_at):
+            return False
+        self.update(responder_id, latitude=latitude, longitude=longitude)
+        return True
+
+    def nearby(
+        self,
+        latitude: float,
+        longitude: float,
+        radius_km: float,
+        type: Optional[ResponderType] = None,
+        status: Optional[ResponderStatus] = ResponderStatus.IDLE,
+    ) -> List[Dict[str, Any]]:
+        """
+        Units within `radius_km` matching type and status, nearest first,
+        as ResponderResponse dicts including `distance`.
+        """
+        self.queries += 1
+        results = []
+        for responder_id, distance in self.grid.within(latitude, longitude, radius_km):
+            record = self.records[responder_id]
+            if (type is None or record["type"] == type) and (status is None or record["status"] == status):
+                results.append({**record, "distance": distance})
+        return results
+
+    def in_bbox(self, west: float, south: float, east: float, north: float) -> List[Dict[str, Any]]:
+        return [self.records[responder_id] for responder_id in self.grid.in_bbox(west, south, east, north)]
+
+    async def load(self, db: AsyncSession) -> None:
+        # Fixes flushed and units written after this point may be missing
+        # from the snapshot
+        mark = self.locations.committed
+        start = self.version
+        result = await db.execute(select(*[getattr(Responder, field) for field in RESPONDER_FIELDS]))
+        grid = GridIndex(self.grid.cell)
+        records = {}
+        for row in result.all():
+            record = dict(zip(RESPONDER_FIELDS, row))
+            records[record["id"]] = record
+            if record["latitude"] is not None and record["longitude"] is not None:
+                grid.set(record["id"], record["latitude"], record["longitude"])
+        for responder_id, (latitude, longitude) in self.locations.since(mark).items():
+            record = records.get(responder_id)
+            if record is not None:
+                record["latitude"], record["longitude"] = latitude, longitude
+                grid.set(responder_id, latitude, longitude)
+        # Dispatches and status changes made during the read are newer than
+        # the snapshot rows: keep the in-memory records for those units
+        for responder_id, version in self.written.items():
+            record = self.records.get(responder_id)
+            if version > start and record is not None:
+                records[responder_id] = record
+                if record["latitude"] is not None and record["longitude"] is not None:
+                    grid.set(responder_id, record["latitude"], record["longitude"])
+                else:
+                    grid.remove(responder_id)
+        self.written = {responder_id: version for responder_id, version in self.written.items() if version > start}
+        # Swap in one step so queries never see a half-built index
+        previous, self.grid, self.records = self.records, grid, records
+        self.loaded = True
+
+        for responder_id, record in records.items():
+            if previous.get(responder_id) != record:
+                self._notify(responder_id, record)
+        for responder_id in previous.keys() - records.keys():
+            self._notify(responder_id, None)
+
+    async def _refresh(self) -> None:
+        while True:
+            await asyncio.sleep(settings.RESPONDER_INDEX_REFRESH_SECONDS)
+            try:
+                async with AsyncSessionLocal() as session:
+                    await self.load(session)
+            except Exception as e:
+                print(f"Error refreshing responder index: {e}")
+
+    async def start(self) -> None:
+        try:
+            async with AsyncSessionLocal() as session:
+                await self.load(session)
+        except Exception as e:
+            # Nearby queries fall back to the database until a refresh succeeds
+            print(f"Error loading responder index: {e}")
+        if self._refresher is None and settings.RESPONDER_INDEX_REFRESH_SECONDS > 0:
+            self._refresher = asyncio.create_task(self._refresh())
+
+    async def stop(self) -> None:
+        if self._refresher is not None:
+            self._refresher.cancel()
+            await asyncio.gather(self._refresher, return_exceptions=True)
+            self._refresher = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "loaded": self.loaded,
+            "responders": len(self.records),
+            "positioned": len(self.grid),
+            "occupied_cells": len(self.grid.cells),
+            "cell_degrees": self.grid.cell,
+            "queries": self.queries,
+            "locations": self.locations.stats(),
+        }
+
+
+async def set_responder_status(db: AsyncSession, responder_id: int, status: ResponderStatus) -> bool:
+    """
+    Persist a status reported by the unit itself and apply it to the index.
+    Going IDLE releases the unit from its incident. Returns False for an
+    unknown responder.
+    """
+    values: Dict[str, Any] = {"status": status}
+    if status == ResponderStatus.IDLE:
+        values["current_incident_id"] = None
+    result = await db.execute(update(Responder).where(Responder.id == responder_id).values(**values))
+    await db.commit()
+    if not result.rowcount:
+        return False
+    responder_index.update(responder_id, **values)
+    return True
+
+
+responders_table = Responder.__table__
+incidents_table = Incident.__table__
+
+
+def build_dispatch_statement(incident_id: int, responder_ids: Sequence[int]):
+    """
+    Single statement that claims the responders if they are IDLE and marks
+    the incident DISPATCHED:
+
+        WITH claimed AS (
+            UPDATE responders SET status = 'DISPATCHED', current_incident_id = :incident
+            WHERE id IN (SELECT id FROM responders
+                         WHERE id = ANY(:ids) AND status = 'IDLE' AND EXISTS (incident)
+                         ORDER BY id FOR UPDATE)
+            RETURNING *),
+        dispatched AS (
+            UPDATE incidents SET status = 'DISPATCHED'
+            WHERE id = :incident AND EXISTS (SELECT 1 FROM claimed))
+        SELECT * FROM claimed
+
+    The status check happens under the row lock, so of two dispatchers
+    racing for a unit only one gets it back. Locking candidates in id order
+    keeps overlapping multi-unit dispatches from deadlocking.
+    """
+    candidates = (
+        select(responders_table.c.id)
+        .where(
+            responders_table.c.id.in_(responder_ids),
+            responders_table.c.status == ResponderStatus.IDLE,
+            exists().where(incidents_table.c.id == incident_id),
+        )
+        .order_by(responders_table.c.id)
+        .with_for_update()
+    )
+    claimed = (
+        update(responders_table)
+        .where(responders_table.c.id.in_(candidates))
+        .values(status=ResponderStatus.DISPATCHED, current_incident_id=incident_id)
+        .returning(*responders_table.c)
+        .cte("claimed")
+    )
+    dispatched = (
+        update(incidents_table)
+        .where(incidents_table.c.id == incident_id, exists(select(claimed.c.id)))
+        .values(status=IncidentStatus.DISPATCHED)
+        .cte("dispatched")
+    )
+    return select(*claimed.c).add_cte(dispatched)
+
+
+@dataclass
+class DispatchResult:
+    responders: List[Any] = field(default_factory=list)
+    incident_found: bool = True
+    missing: List[int] = field(default_factory=list)
+    not_idle: List[int] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return bool(self.responders)
+
+
+async def dispatch_units(db: AsyncSession, incident_id: int, responder_ids: Sequence[int]) -> DispatchResult:
+    """
+    Dispatch all of `responder_ids` to the incident, or none of them.
+
+    The happy path is one statement and a commit. Only when some unit could
+    not be claimed is the transaction rolled back and the reason looked up
+    (unknown incident, unknown responders, responders not IDLE).
+    """
+    responder_ids = sorted(set(responder_ids))
+    result = await db.execute(build_dispatch_statement(incident_id, responder_ids))
+    claimed = result.all()
+    if len(claimed) == len(responder_ids):
+        await db.commit()
+        return DispatchResult(responders=claimed)
+
+    await db.rollback()
+    incident = await db.execute(select(Incident.id).where(Incident.id == incident_id))
+    statuses = dict((await db.execute(
+        select(Responder.id, Responder.status).where(Responder.id.in_(responder_ids))
+    )).all())
+    return DispatchResult(
+        incident_found=incident.first() is not None,
+        missing=[responder_id for responder_id in responder_ids if responder_id not in statuses],
+        not_idle=[responder_id for responder_id, status in statuses.items() if status != ResponderStatus.IDLE],
+    )
+
+
+location_buffer = LocationBuffer()
+responder_index = ResponderIndex(settings.RESPONDER_INDEX_CELL_DEGREES, location_buffer)
+responder_index.listeners.append(fleet_hub.notify)
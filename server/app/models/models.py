@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Enum as SQLEnum, DateTime, ForeignKey, Numeric, Float
+from sqlalchemy import Column, Integer, String, Text, Enum as SQLEnum, DateTime, ForeignKey, Numeric, Float, Index, JSON, DDL, event
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.models.base import Base
@@ -14,6 +14,11 @@ class Responder(Base):
     latitude = Column(Float, nullable=True)
     longitude = Column(Float, nullable=True)
     current_incident_id = Column(Integer, ForeignKey("incidents.id"), nullable=True)
+
+    # Composite location index for bounding-box prefilters
+    __table_args__ = (
+        Index("ix_responders_location", latitude, longitude),
+    )
     
     # Relationships
     incident = relationship("Incident", back_populates="responders")
@@ -30,6 +35,11 @@ class EmergencyCall(Base):
     audio_url = Column(Text, nullable=True)
     location_lat = Column(Float, nullable=True)
     location_long = Column(Float, nullable=True)
+
+    # Composite location index for bounding-box prefilters
+    __table_args__ = (
+        Index("ix_emergency_calls_location", location_lat, location_long),
+    )
     
     # Relationships
     incidents = relationship("Incident", back_populates="call")
@@ -42,9 +52,57 @@ class Incident(Base):
     status = Column(SQLEnum(IncidentStatus), default=IncidentStatus.PENDING)
     priority_score = Column(Integer, default=0) # 1 - 10
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     category = Column(SQLEnum(IncidentCategory), nullable=True)
     summary = Column(Text, nullable=True)
 
+    # Indexes matching the queue ordering (priority_score DESC, created_at, id)
+    # so keyset pages and the filtered views are index scans instead of sorts.
+    __table_args__ = (
+        Index("ix_incidents_queue", priority_score.desc(), created_at, id),
+        Index("ix_incidents_status_queue", status, priority_score.desc(), created_at, id),
+        Index("ix_incidents_category_queue", category, priority_score.desc(), created_at, id),
+        Index(
+            "ix_incidents_pending_queue",
+            priority_score.desc(), created_at, id,
+            postgresql_where=(status == IncidentStatus.PENDING),
+        ),
+        Index("ix_incidents_created_at", created_at),
+        Index("ix_incidents_updated_at", updated_at),
+    )
+
     # Relationships
     call = relationship("EmergencyCall", back_populates="incidents")
     responders = relationship("Responder", back_populates="incident")
+
+# onupdate only covers updates made through SQLAlchemy; the trigger keeps
+# updated_at (and so the listings' change version) current for plain SQL
+# and other clients too. scripts/migrate/incident_updated_at.py adds it to
+# existing databases.
+INCIDENT_UPDATED_AT_DDL = [
+    """
+    CREATE OR REPLACE FUNCTION incidents_touch_updated_at() RETURNS trigger AS $$
+    BEGIN
+        NEW.updated_at := now();
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS incidents_touch_updated_at ON incidents",
+    """
+    CREATE TRIGGER incidents_touch_updated_at BEFORE UPDATE ON incidents
+    FOR EACH ROW EXECUTE FUNCTION incidents_touch_updated_at()
+    """,
+]
+for statement in INCIDENT_UPDATED_AT_DDL:
+    event.listen(Incident.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+
+class IncidentAnalysis(Base):
+    __tablename__ = "incident_analyses"
+
+    # One stored detailed analysis per incident, valid while input_hash
+    # matches the hash of the incident's current analysis inputs.
+    incident_id = Column(Integer, ForeignKey("incidents.id", ondelete="CASCADE"), primary_key=True)
+    input_hash = Column(String(64), nullable=False)
+    payload = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
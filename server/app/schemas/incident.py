@@ -86,6 +86,7 @@ class IncidentResponse(BaseModel):
     status: IncidentStatus
     priority_score: int
     created_at: datetime
+    updated_at: Optional[datetime] = None
     category: Optional[IncidentCategory] = None
     summary: Optional[str] = None
     call: Optional[EmergencyCallResponse] = None
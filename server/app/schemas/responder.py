@@ -1,5 +1,6 @@
-from typing import Optional
-from pydantic import BaseModel
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel, Field
 from app.models.enums import ResponderStatus, ResponderType
 
 class ResponderBase(BaseModel):
@@ -12,8 +13,20 @@ class ResponderCreate(ResponderBase):
     pass
 
 class ResponderUpdateLocation(BaseModel):
-    latitude: float
-    longitude: float
+    latitude: float = Field(..., ge=-90, le=90)
+    longitude: float = Field(..., ge=-180, le=180)
+    recorded_at: Optional[datetime] = None  # device time of the fix, used to drop out-of-order reports
+
+class LocationReport(ResponderUpdateLocation):
+    responder_id: int
+
+class LocationBatch(BaseModel):
+    reports: List[LocationReport]
+
+class LocationBatchResult(BaseModel):
+    accepted: int
+    stale: int
+    unknown: List[int]
 
 class ResponderResponse(ResponderBase):
     id: int
@@ -28,6 +41,10 @@ class DispatchRequest(BaseModel):
     responder_id: int
     incident_id: int
 
+class MultiDispatchRequest(BaseModel):
+    incident_id: int
+    responder_ids: List[int] = Field(..., min_length=1, max_length=50)
+
 class RecommendationRequest(BaseModel):
     incident_id: int
 
@@ -1,4 +1,7 @@
 import math
+import numpy as np
+
+EARTH_RADIUS_KM = 6371
 
 def calculate_haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     """
@@ -13,6 +16,38 @@ def calculate_haversine_distance(lat1: float, lon1: float, lat2: float, lon2: fl
     dlat = lat2 - lat1 
     a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
     c = 2 * math.asin(math.sqrt(a)) 
-    r = 6371 # Radius of earth in kilometers 
+    r = EARTH_RADIUS_KM # Radius of earth in kilometers 
     
     return c * r
+
+def _haversine(lat1, lon1, lat2, lon2, dtype) -> np.ndarray:
+    # Inputs in radians, broadcastable against each other
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    # Rounding (float32 especially) can push a just outside [0, 1]
+    return (2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))).astype(dtype, copy=False)
+
+def haversine_one_to_many(lat: float, lon: float, lats, lons, dtype=np.float64) -> np.ndarray:
+    """
+    Distances in km from one point to each of `lats`/`lons` (degrees).
+    float32 halves memory and is faster on large arrays, but can be off by
+    tens of metres.
+    """
+    lats = np.radians(np.asarray(lats, dtype=dtype))
+    lons = np.radians(np.asarray(lons, dtype=dtype))
+    return _haversine(dtype(math.radians(lat)), dtype(math.radians(lon)), lats, lons, dtype)
+
+def haversine_matrix(lats1, lons1, lats2=None, lons2=None, dtype=np.float64) -> np.ndarray:
+    """
+    len(lats1) x len(lats2) matrix of distances in km. Without a second
+    set of points, the pairwise distances within the first.
+    """
+    lats1 = np.radians(np.asarray(lats1, dtype=dtype))[:, np.newaxis]
+    lons1 = np.radians(np.asarray(lons1, dtype=dtype))[:, np.newaxis]
+    if lats2 is None:
+        lats2, lons2 = lats1.T, lons1.T
+    else:
+        lats2 = np.radians(np.asarray(lats2, dtype=dtype))[np.newaxis, :]
+        lons2 = np.radians(np.asarray(lons2, dtype=dtype))[np.newaxis, :]
+    return _haversine(lats1, lons1, lats2, lons2, dtype)
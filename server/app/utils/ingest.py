@@ -0,0 +1,143 @@
+import csv
+import json
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional
+from app.models.enums import IncidentCategory, IncidentStatus
+
+# Accepted spellings for each field of an imported call
+FIELD_ALIASES = {
+    "description": ("description", "raw_transcript", "transcript"),
+    "latitude": ("latitude", "lat", "location_lat"),
+    "longitude": ("longitude", "long", "lng", "lon", "location_long"),
+    "caller_phone": ("caller_phone", "reporter_id", "phone"),
+    "timestamp": ("timestamp", "created_at", "call_time"),
+    "priority_score": ("priority_score", "priority"),
+    "category": ("category",),
+    "summary": ("summary",),
+    "status": ("status",),
+}
+
+
+@dataclass
+class IngestRecord:
+    description: str
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    caller_phone: Optional[str] = None
+    timestamp: Optional[datetime] = None
+    priority_score: Optional[int] = None
+    category: Optional[IncidentCategory] = None
+    summary: Optional[str] = None
+    status: IncidentStatus = IncidentStatus.PENDING
+
+
+def _pick(raw: Dict[str, Any], field: str) -> Any:
+    for key in FIELD_ALIASES[field]:
+        value = raw.get(key)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def parse_record(raw: Dict[str, Any]) -> IngestRecord:
+    """
+    Validate one imported call. Raises ValueError with a readable message.
+    """
+    description = _pick(raw, "description")
+    if not description:
+        raise ValueError("missing description")
+
+    record = IngestRecord(description=str(description))
+
+    latitude, longitude = _pick(raw, "latitude"), _pick(raw, "longitude")
+    if latitude is not None and longitude is not None:
+        record.latitude, record.longitude = float(latitude), float(longitude)
+        if not (-90 <= record.latitude <= 90 and -180 <= record.longitude <= 180):
+            raise ValueError("location out of range")
+
+    phone = _pick(raw, "caller_phone")
+    record.caller_phone = str(phone) if phone is not None else None
+
+    timestamp = _pick(raw, "timestamp")
+    if timestamp is not None:
+        parsed = datetime.fromisoformat(str(timestamp).replace('Z', '+00:00'))
+        record.timestamp = parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+    priority = _pick(raw, "priority_score")
+    if priority is not None:
+        record.priority_score = int(priority)
+        if not 1 <= record.priority_score <= 10:
+            raise ValueError("priority_score must be between 1 and 10")
+
+    category = _pick(raw, "category")
+    if category is not None:
+        record.category = IncidentCategory(category)
+
+    status = _pick(raw, "status")
+    if status is not None:
+        record.status = IncidentStatus(status)
+
+    summary = _pick(raw, "summary")
+    record.summary = str(summary) if summary is not None else None
+    return record
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    Split a byte stream into text lines without buffering the whole body.
+    """
+    pending = b""
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8-sig").rstrip("\r")
+    if pending:
+        yield pending.decode("utf-8-sig").rstrip("\r")
+
+
+async def iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[Any]:
+    """
+    Yield (line_number, dict | error message) for each non-empty NDJSON line.
+    """
+    line_number = 0
+    async for line in iter_lines(chunks):
+        line_number += 1
+        if not line.strip():
+            continue
+        try:
+            value = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_number, f"invalid JSON: {e.msg}"
+            continue
+        yield line_number, value if isinstance(value, dict) else "expected a JSON object"
+
+
+async def iter_csv(chunks: AsyncIterator[bytes]) -> AsyncIterator[Any]:
+    """
+    Yield (line_number, dict) for each CSV row, using the first row as header.
+    Quoted fields may span lines.
+    """
+    header: Optional[List[str]] = None
+    record_lines: List[str] = []
+    line_number = 0
+    start_line = 0
+
+    async for line in iter_lines(chunks):
+        line_number += 1
+        if not record_lines:
+            start_line = line_number
+        record_lines.append(line)
+        text = "\n".join(record_lines)
+        if text.count('"') % 2:
+            continue  # inside a quoted field that continues on the next line
+        record_lines = []
+        if not text.strip():
+            continue
+
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        yield start_line, dict(zip(header, values))
@@ -0,0 +1,93 @@
+import json
+from typing import Any, List, Optional, Tuple
+
+
+class JSONFieldStream:
+    """
+    Incremental parser for a streamed JSON object: feed it text as it
+    arrives and it returns each top-level field as soon as its value is
+    complete. Anything before the opening brace (e.g. a code fence) is
+    skipped.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.started = False
+        self.done = False
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.expect = "key"  # at depth 1: "key", "key_string", "colon" or "value"
+        self.key: Optional[str] = None
+        self.key_start = 0
+        self.value_start: Optional[int] = None
+
+    def feed(self, text: str) -> List[Tuple[str, Any]]:
+        fields = []
+        start = len(self.buffer)
+        self.buffer += text
+        for i in range(start, len(self.buffer)):
+            if self.done:
+                break
+            char = self.buffer[i]
+
+            if not self.started:
+                if char == "{":
+                    self.started = True
+                    self.depth = 1
+                continue
+
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif char == "\\":
+                    self.escape = True
+                elif char == '"':
+                    self.in_string = False
+                    if self.depth == 1 and self.expect == "key_string":
+                        self.key = json.loads(self.buffer[self.key_start:i + 1])
+                        self.expect = "colon"
+                continue
+
+            if self.depth == 1:
+                if self.expect == "key":
+                    if char == '"':
+                        self.in_string = True
+                        self.key_start = i
+                        self.expect = "key_string"
+                    elif char == "}":
+                        self.done = True
+                    continue
+                if self.expect == "colon":
+                    if char == ":":
+                        self.expect = "value"
+                        self.value_start = None
+                    continue
+                if char in ",}":
+                    field = self._finish_value(i)
+                    if field:
+                        fields.append(field)
+                    self.done = char == "}"
+                    continue
+                if self.value_start is None and not char.isspace():
+                    self.value_start = i
+
+            if char == '"':
+                self.in_string = True
+            elif char in "{[":
+                self.depth += 1
+            elif char in "}]":
+                self.depth -= 1
+        return fields
+
+    def _finish_value(self, end: int) -> Optional[Tuple[str, Any]]:
+        key, start = self.key, self.value_start
+        self.key = None
+        self.value_start = None
+        self.expect = "key"
+        if key is None or start is None:
+            return None
+        try:
+            return key, json.loads(self.buffer[start:end])
+        except ValueError:
+            return None
@@ -0,0 +1,25 @@
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+
+
+def encode_cursor(priority_score: int, created_at: datetime, id: int) -> str:
+    """
+    Opaque keyset cursor pointing just after the given incident in the
+    queue ordering (priority_score DESC, created_at ASC, id ASC).
+    """
+    raw = json.dumps([priority_score, created_at.isoformat(), id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[int, datetime, int]:
+    """
+    Inverse of encode_cursor. Raises ValueError on a malformed cursor.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        priority_score, created_at, id = json.loads(base64.urlsafe_b64decode(padded))
+        return int(priority_score), datetime.fromisoformat(created_at), int(id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
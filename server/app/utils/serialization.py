@@ -0,0 +1,47 @@
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Mapping, Optional
+from fastapi import Response
+
+try:
+    import orjson
+except ImportError:  # optional speedup, fall back to the stdlib encoder
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Encode plain dicts/lists (with datetimes and enums) straight to JSON bytes.
+    """
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(content, default=_default, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(Response):
+    """
+    JSON response for pre-built payloads; skips response_model validation
+    and jsonable_encoder entirely.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def json_response(content: Any, headers: Optional[Mapping[str, str]] = None, status_code: int = 200) -> FastJSONResponse:
+    """
+    FastJSONResponse carrying over headers set on an endpoint's injected
+    Response (which FastAPI ignores once a Response is returned).
+    """
+    headers = {k: v for k, v in (headers or {}).items() if k.lower() != "content-length"}
+    return FastJSONResponse(content, status_code=status_code, headers=headers)
@@ -0,0 +1,138 @@
+import math
+from typing import Dict, Hashable, List, Set, Tuple
+from app.utils.distance import haversine_one_to_many
+
+KM_PER_DEGREE_LAT = 111.32
+
+
+def degree_spans(lat: float, radius_km: float) -> Tuple[float, float]:
+    """
+    Half-height and half-width in degrees of the box around a circle of
+    `radius_km` centered at latitude `lat` (widest at its poleward edge).
+    """
+    lat_span = radius_km / KM_PER_DEGREE_LAT
+    cos_lat = math.cos(math.radians(min(89.9, abs(lat) + lat_span)))
+    lng_span = min(180.0, radius_km / (KM_PER_DEGREE_LAT * max(cos_lat, 1e-6)))
+    return lat_span, lng_span
+
+
+def radius_bounds(lat: float, lng: float, radius_km: float) -> Tuple[float, float, float, float]:
+    """
+    (west, south, east, north) box containing the circle. West is greater
+    than east when the box crosses the antimeridian, as in bbox filters.
+    """
+    lat_span, lng_span = degree_spans(lat, radius_km)
+    south, north = max(-90.0, lat - lat_span), min(90.0, lat + lat_span)
+    if lng_span >= 180.0:
+        return -180.0, south, 180.0, north
+    west = (lng - lng_span + 180) % 360 - 180
+    east = (lng + lng_span + 180) % 360 - 180
+    return west, south, east, north
+
+
+class GridIndex:
+    """
+    Uniform lat/lng grid of point positions. A radius query only looks at
+    the cells overlapping the search circle's bounding box, so its cost
+    depends on how many points are nearby rather than on the total.
+    """
+
+    def __init__(self, cell_degrees: float = 0.05):
+        self.cell = cell_degrees
+        self.lng_cells = max(1, int(round(360 / cell_degrees)))
+        self.positions: Dict[Hashable, Tuple[float, float]] = {}
+        self.cells: Dict[Tuple[int, int], Set[Hashable]] = {}
+
+    def _cell(self, lat: float, lng: float) -> Tuple[int, int]:
+        return int(math.floor((lng + 180) / self.cell)) % self.lng_cells, int(math.floor((lat + 90) / self.cell))
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.positions
+
+    def set(self, key: Hashable, lat: float, lng: float) -> None:
+        cell = self._cell(lat, lng)
+        previous = self.positions.get(key)
+        if previous is not None:
+            old_cell = self._cell(*previous)
+            if old_cell != cell:
+                self._discard(old_cell, key)
+        self.positions[key] = (lat, lng)
+        self.cells.setdefault(cell, set()).add(key)
+
+    def remove(self, key: Hashable) -> None:
+        previous = self.positions.pop(key, None)
+        if previous is not None:
+            self._discard(self._cell(*previous), key)
+
+    def clear(self) -> None:
+        self.positions.clear()
+        self.cells.clear()
+
+    def _discard(self, cell: Tuple[int, int], key: Hashable) -> None:
+        members = self.cells.get(cell)
+        if members is not None:
+            members.discard(key)
+            if not members:
+                del self.cells[cell]
+
+    def _candidate_ranges(self, lat: float, lng: float, radius_km: float) -> Tuple[range, List[int]]:
+        """
+        Row range and column list of the cells overlapping the bounding
+        box of the search circle, wrapping at the antimeridian.
+        """
+        lat_span, lng_span = degree_spans(lat, radius_km)
+        _, y0 = self._cell(max(-90.0, lat - lat_span), lng)
+        _, y1 = self._cell(min(90.0, lat + lat_span), lng)
+        x0 = int(math.floor((lng - lng_span + 180) / self.cell))
+        x1 = int(math.floor((lng + lng_span + 180) / self.cell))
+        if x1 - x0 + 1 >= self.lng_cells:
+            return range(y0, y1 + 1), list(range(self.lng_cells))
+        return range(y0, y1 + 1), [x % self.lng_cells for x in range(x0, x1 + 1)]
+
+    def within(self, lat: float, lng: float, radius_km: float) -> List[Tuple[Hashable, float]]:
+        """
+        (key, distance_km) of every point within `radius_km`, nearest first.
+        """
+        rows, columns = self._candidate_ranges(lat, lng, radius_km)
+        if len(rows) * len(columns) <= len(self.cells):
+            cells = ((x, y) for y in rows for x in columns)
+        else:
+            # Huge radius: cheaper to walk the occupied cells
+            column_set = set(columns)
+            cells = (cell for cell in list(self.cells) if cell[1] in rows and cell[0] in column_set)
+
+        keys = [key for cell in cells for key in self.cells.get(cell, ())]
+        if not keys:
+            return []
+        points = [self.positions[key] for key in keys]
+        distances = haversine_one_to_many(lat, lng, [p[0] for p in points], [p[1] for p in points])
+        return [(keys[i], float(distances[i])) for i in distances.argsort() if distances[i] <= radius_km]
+
+    def in_bbox(self, west: float, south: float, east: float, north: float) -> List[Hashable]:
+        """
+        Keys of the points inside a (west, south, east, north) box; west is
+        greater than east for a box crossing the antimeridian.
+        """
+        crosses = west > east
+        _, y0 = self._cell(south, west)
+        _, y1 = self._cell(north, west)
+        x0 = int(math.floor((west + 180) / self.cell))
+        x1 = int(math.floor((east + 180 + (360 if crosses else 0)) / self.cell))
+        width = min(self.lng_cells, x1 - x0 + 1)
+        rows = range(y0, y1 + 1)
+        if len(rows) * width <= len(self.cells):
+            cells = ((((x0 + i) % self.lng_cells), y) for y in rows for i in range(width))
+        else:
+            cells = (cell for cell in list(self.cells) if cell[1] in rows)
+
+        keys = []
+        for cell in cells:
+            for key in self.cells.get(cell, ()):
+                lat, lng = self.positions[key]
+                inside_lng = (lng >= west or lng <= east) if crosses else west <= lng <= east
+                if south <= lat <= north and inside_lng:
+                    keys.append(key)
+        return keys
@@ -0,0 +1,33 @@
+from collections import deque
+from typing import Deque, Dict
+
+
+class LatencyWindow:
+    """
+    Keeps the most recent latency samples (in milliseconds) and reports
+    simple percentiles over them.
+    """
+
+    def __init__(self, size: int = 1000):
+        self.samples: Deque[float] = deque(maxlen=size)
+        self.count = 0
+
+    def add(self, value_ms: float) -> None:
+        self.samples.append(value_ms)
+        self.count += 1
+
+    def percentile(self, pct: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "p50_ms": round(self.percentile(50), 2),
+            "p95_ms": round(self.percentile(95), 2),
+            "p99_ms": round(self.percentile(99), 2),
+            "max_ms": round(max(self.samples), 2) if self.samples else 0.0,
+        }
@@ -0,0 +1,154 @@
+import asyncio
+import hashlib
+import os
+import re
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from fastapi import HTTPException, UploadFile
+from app.core.config import settings
+
+CHUNK_SIZE = 1024 * 1024  # 1 MB
+
+
+@dataclass
+class StoredUpload:
+    path: str
+    size: int
+    sha256: str
+    deduplicated: bool
+    io_seconds: float
+
+
+@dataclass
+class UploadReport:
+    """
+    Upload I/O done while handling one request.
+    """
+    files: List[StoredUpload] = field(default_factory=list)
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(f.size for f in self.files)
+
+    @property
+    def io_seconds(self) -> float:
+        return sum(f.io_seconds for f in self.files)
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.total_bytes / self.io_seconds if self.io_seconds else 0.0
+
+    def headers(self) -> Dict[str, str]:
+        if not self.files:
+            return {}
+        return {
+            "Server-Timing": f'upload-io;dur={self.io_seconds * 1000:.1f};desc="{len(self.files)} file(s), {self.total_bytes} bytes"',
+            "X-Upload-Bytes-Per-Second": str(int(self.bytes_per_second)),
+        }
+
+
+class MediaStorage:
+    """
+    Content-addressed storage for incident media.
+
+    Uploads are streamed to disk in chunks off the event loop and stored
+    under the SHA-256 of their content, so the same photo uploaded twice
+    ends up as one file.
+    """
+
+    def __init__(self, root: str, limits: Dict[str, int]):
+        self.root = root
+        self.limits = limits
+        self.directories = {"image": "images", "audio": "voice"}
+
+    async def save(self, upload: UploadFile, kind: str, report: Optional[UploadReport] = None) -> StoredUpload:
+        limit = self.limits[kind]
+        directory = os.path.join(self.root, self.directories[kind])
+        tmp_path = os.path.join(directory, f".tmp-{uuid.uuid4()}")
+
+        io_seconds = 0.0
+        size = 0
+        hasher = hashlib.sha256()
+
+        started = time.perf_counter()
+        await asyncio.to_thread(os.makedirs, directory, exist_ok=True)
+        buffer = await asyncio.to_thread(open, tmp_path, "wb")
+        io_seconds += time.perf_counter() - started
+
+        try:
+            while True:
+                started = time.perf_counter()
+                chunk = await upload.read(CHUNK_SIZE)
+                if not chunk:
+                    io_seconds += time.perf_counter() - started
+                    break
+
+                size += len(chunk)
+                if size > limit:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"{kind.capitalize()} upload exceeds {limit // (1024 * 1024)} MB limit",
+                    )
+
+                await asyncio.to_thread(_write_chunk, buffer, hasher, chunk)
+                io_seconds += time.perf_counter() - started
+        except BaseException:
+            await asyncio.to_thread(_discard, buffer, tmp_path)
+            raise
+
+        started = time.perf_counter()
+        digest = hasher.hexdigest()
+        final_path = os.path.join(directory, f"{digest}{_extension(upload.filename)}")
+        deduplicated = await asyncio.to_thread(_commit, buffer, tmp_path, final_path)
+        io_seconds += time.perf_counter() - started
+
+        stored = StoredUpload(
+            path=final_path,
+            size=size,
+            sha256=digest,
+            deduplicated=deduplicated,
+            io_seconds=io_seconds,
+        )
+        if report is not None:
+            report.files.append(stored)
+        return stored
+
+
+def _write_chunk(buffer, hasher, chunk: bytes) -> None:
+    hasher.update(chunk)
+    buffer.write(chunk)
+
+
+def _discard(buffer, tmp_path: str) -> None:
+    buffer.close()
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+
+def _commit(buffer, tmp_path: str, final_path: str) -> bool:
+    """
+    Move the temp file into place. Returns True if identical content was
+    already stored and the temp file was dropped instead.
+    """
+    buffer.close()
+    if os.path.exists(final_path):
+        os.remove(tmp_path)
+        return True
+    os.replace(tmp_path, final_path)
+    return False
+
+
+def _extension(filename: Optional[str]) -> str:
+    ext = os.path.splitext(filename or "")[1].lower()
+    return ext if re.fullmatch(r"\.[a-z0-9]{1,8}", ext) else ""
+
+
+media_storage = MediaStorage(
+    root=settings.UPLOAD_DIR,
+    limits={
+        "image": settings.MAX_IMAGE_UPLOAD_MB * 1024 * 1024,
+        "audio": settings.MAX_AUDIO_UPLOAD_MB * 1024 * 1024,
+    },
+)
@@ -0,0 +1,41 @@
+import math
+from typing import Tuple
+
+# Grid cells per tile edge used for clustering (256px tiles -> 32px cells)
+CLUSTER_CELLS_PER_TILE = 8
+# At this zoom and above individual incidents are returned instead of clusters
+CLUSTER_MAX_ZOOM = 14
+MAX_ZOOM = 22
+
+
+def tile_bounds(z: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """
+    (west, south, east, north) in degrees of a Web Mercator (slippy map) tile.
+    """
+    n = 2 ** z
+    west = x / n * 360.0 - 180.0
+    east = (x + 1) / n * 360.0 - 180.0
+    north = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
+    south = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * (y + 1) / n))))
+    return west, south, east, north
+
+
+def cluster_cell_size(zoom: int) -> float:
+    """
+    Width in degrees of a clustering grid cell at the given zoom level.
+    """
+    return 360.0 / (2 ** zoom * CLUSTER_CELLS_PER_TILE)
+
+
+def parse_bbox(bbox: str) -> Tuple[float, float, float, float]:
+    """
+    Parse "west,south,east,north". Raises ValueError when malformed.
+    """
+    west, south, east, north = (float(v) for v in bbox.split(","))
+    if not (-90 <= south <= north <= 90 and -180 <= west <= 180 and -180 <= east <= 180):
+        raise ValueError(f"Invalid bbox: {bbox}")
+    return west, south, east, north
+
+
+def valid_tile(z: int, x: int, y: int) -> bool:
+    return 0 <= z <= MAX_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z
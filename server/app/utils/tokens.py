@@ -0,0 +1,6 @@
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count for budgeting prompts and filling in usage when a
+    stream doesn't report it: about four characters per token.
+    """
+    return max(1, len(text) // 4)
@@ -0,0 +1,86 @@
+import hashlib
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+from fastapi import HTTPException, Request, Response
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# "<max(updated_at) in microseconds since the epoch>.<row count>"
+VERSION_TOKEN = re.compile(r"^\d+\.\d+$")
+
+# A row's updated_at is its transaction's start time, so a slow transaction
+# can commit a row older than a version handed out meanwhile. Deltas reach
+# back this far before the version; clients apply them by id, so the
+# overlap only costs a few repeated rows.
+SINCE_OVERLAP = timedelta(seconds=10)
+
+
+async def table_version(db: AsyncSession, updated_column) -> str:
+    """
+    Change version of a table, read from the database so writes from other
+    workers, scripts and plain SQL count too: the newest updated_at (a
+    trigger keeps it current on every UPDATE) plus the row count, which
+    catches deletes.
+    """
+    newest, count = (await db.execute(
+        select(func.max(updated_column), func.count()).select_from(updated_column.table)
+    )).one()
+    micros = 0 if newest is None else int(newest.timestamp() * 1_000_000)
+    return f"{micros}.{count}"
+
+
+def parse_version(version: str) -> Tuple[datetime, int]:
+    micros, count = version.split(".")
+    return datetime.fromtimestamp(int(micros) / 1_000_000, timezone.utc), int(count)
+
+
+def listing_etag(version: str, request: Request) -> str:
+    """
+    Weak ETag for a listing: the table's change version plus the path
+    (path parameters such as a tile's z/x/y) and query parameters. Must be
+    computed before querying so a concurrent write can only make the ETag
+    older than the body, never newer.
+    """
+    params = sorted(request.query_params.multi_items())
+    digest = hashlib.md5(repr((request.url.path, params)).encode()).hexdigest()[:8]
+    return f'W/"{version}-{digest}"'
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """
+    304 response when the client's If-None-Match already matches `etag`.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    return None
+
+
+def set_version_headers(response: Response, version: str, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Change-Version"] = version
+
+
+def since_clause(since: str, version: str, updated_column):
+    """
+    Filter selecting rows changed after `since`, which is either a change
+    version from X-Change-Version or an ISO timestamp. `version` is the
+    table's current version.
+
+    Returns None when the table has fewer rows than at that version (a
+    delta can't express deletes) and the caller should send everything.
+    """
+    if VERSION_TOKEN.match(since):
+        since_dt, since_count = parse_version(since)
+        _, count = parse_version(version)
+        if count < since_count:
+            return None
+        return updated_column > since_dt - SINCE_OVERLAP
+
+    try:
+        since_dt = datetime.fromisoformat(since.replace('Z', '+00:00'))
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid since value: {since}")
+    return updated_column > since_dt
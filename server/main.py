@@ -7,6 +7,9 @@ from app.core.config import settings
 from app.api.api import api_router
 from app.core.database import engine
 from app.models.base import Base
+from app.ai.triage_queue import triage_queue
+from app.crud.responder import responder_index, location_buffer
+from app.core.fleet import fleet_hub
 
 from app.models import models 
 
@@ -14,9 +17,20 @@ from app.models import models
 async def lifespan(app: FastAPI):
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+
+    await responder_index.start()
+    await location_buffer.start()
+    await fleet_hub.start()
+
+    if settings.TRIAGE_MODE == "async":
+        await triage_queue.start()
     
     yield
     
+    await triage_queue.stop()
+    await fleet_hub.stop()
+    await location_buffer.stop()
+    await responder_index.stop()
     await engine.dispose()
 
 app = FastAPI(
@@ -32,6 +46,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "X-Change-Version", "X-Delta-Mode", "Server-Timing", "X-Upload-Bytes-Per-Second"],
 )
 
 # Mount the static directory
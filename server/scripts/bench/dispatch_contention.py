@@ -0,0 +1,175 @@
+"""
+Benchmark dispatch under contention.
+
+Creates a pool of IDLE bench responders and incidents, then runs many
+concurrent dispatchers that all go after the same few units (each picks a
+random unit, or a random group of units in multi mode), holds what it got
+for a moment and releases it. Compares:
+
+  legacy   the original select -> check status in Python -> commit flow
+  atomic   app.crud.responder.dispatch_units (one conditional UPDATE)
+
+and reports attempts/sec, latency, conflicts and, most importantly,
+double assignments: a dispatcher getting a unit another one still holds.
+
+Usage:
+    python scripts/bench/dispatch_contention.py [dispatchers] [units] [attempts_per_dispatcher] [--multi N]
+"""
+import asyncio
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+# Add the parent directory (server) to sys.path to allow imports from app
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../'))
+
+from sqlalchemy import delete, select, update
+from app.core.database import AsyncSessionLocal, engine
+from app.crud.incident import create_incident_with_call
+from app.crud.responder import dispatch_units
+from app.models.models import Incident, EmergencyCall, Responder
+from app.models.enums import IncidentStatus, ResponderStatus, ResponderType
+from app.utils.stats import LatencyWindow
+
+BENCH_PREFIX = "bench-dispatch"
+
+
+async def legacy_dispatch(db, incident_id: int, responder_ids):
+    """
+    The original endpoint's flow, generalized to several units.
+    """
+    db.expunge_all()  # the endpoint had a fresh session per request
+    responders = []
+    for responder_id in responder_ids:
+        result = await db.execute(select(Responder).where(Responder.id == responder_id))
+        responder = result.scalars().first()
+        if not responder or responder.status != ResponderStatus.IDLE:
+            await db.rollback()
+            return []
+        responders.append(responder)
+
+    result = await db.execute(select(Incident).where(Incident.id == incident_id))
+    incident = result.scalars().first()
+    for responder in responders:
+        responder.status = ResponderStatus.DISPATCHED
+        responder.current_incident_id = incident.id
+    incident.status = IncidentStatus.DISPATCHED
+    await db.commit()
+    return [responder.id for responder in responders]
+
+
+async def atomic_dispatch(db, incident_id: int, responder_ids):
+    result = await dispatch_units(db, incident_id, responder_ids)
+    return [responder.id for responder in result.responders]
+
+
+async def setup(units: int, incidents: int):
+    async with AsyncSessionLocal() as db:
+        responders = [
+            Responder(name=f"{BENCH_PREFIX}-{i}", type=ResponderType.MEDICAL, status=ResponderStatus.IDLE,
+                      latitude=13.08, longitude=80.27)
+            for i in range(units)
+        ]
+        db.add_all(responders)
+        await db.commit()
+
+        incident_ids = []
+        for i in range(incidents):
+            payload = await create_incident_with_call(
+                db,
+                call_values={"raw_transcript": f"Dispatch benchmark {i}", "caller_phone": BENCH_PREFIX},
+                incident_values={"priority_score": 5},
+            )
+            incident_ids.append(payload["id"])
+        return [r.id for r in responders], incident_ids
+
+
+async def release(db, responder_ids) -> None:
+    await db.execute(
+        update(Responder)
+        .where(Responder.id.in_(responder_ids))
+        .values(status=ResponderStatus.IDLE, current_incident_id=None)
+    )
+    await db.commit()
+
+
+async def run(name: str, dispatch, responder_ids, incident_ids, dispatchers: int, attempts: int, group: int) -> None:
+    async with AsyncSessionLocal() as db:
+        await release(db, responder_ids)
+    latencies = LatencyWindow(size=dispatchers * attempts)
+    outcomes: Counter = Counter()
+    # unit -> dispatcher currently holding it; claiming a held unit is a double assignment
+    holders = {}
+    double = 0
+
+    async def dispatcher(me: int) -> None:
+        nonlocal double
+        async with AsyncSessionLocal() as db:
+            for _ in range(attempts):
+                wanted = random.sample(responder_ids, group)
+                started = time.perf_counter()
+                try:
+                    claimed = await dispatch(db, random.choice(incident_ids), wanted)
+                except Exception as e:
+                    await db.rollback()
+                    outcomes[f"error:{type(e).__name__}"] += 1
+                    continue
+                latencies.add((time.perf_counter() - started) * 1000)
+                if not claimed:
+                    outcomes["conflict"] += 1
+                    continue
+
+                outcomes["dispatched"] += 1
+                for responder_id in claimed:
+                    double += responder_id in holders
+                    holders[responder_id] = me
+                # Hold the units briefly, then free them for the others
+                await asyncio.sleep(0.001)
+                for responder_id in claimed:
+                    if holders.get(responder_id) == me:
+                        del holders[responder_id]
+                await release(db, claimed)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(dispatcher(i) for i in range(dispatchers)))
+    elapsed = time.perf_counter() - started
+
+    stats = latencies.snapshot()
+    total = sum(outcomes.values())
+    print(
+        f"{name:<7} {total / elapsed:>8.0f} attempts/s  "
+        f"p50={stats['p50_ms']:>7.2f}ms  p99={stats['p99_ms']:>7.2f}ms  "
+        f"{dict(outcomes)}  double_assignments={double}"
+    )
+
+
+async def cleanup(responder_ids, incident_ids) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(Responder).where(Responder.id.in_(responder_ids)))
+        await db.execute(delete(Incident).where(Incident.id.in_(incident_ids)))
+        await db.execute(delete(EmergencyCall).where(EmergencyCall.caller_phone == BENCH_PREFIX))
+        await db.commit()
+
+
+async def main(dispatchers: int, units: int, attempts: int, group: int) -> None:
+    responder_ids, incident_ids = await setup(units, incidents=20)
+    try:
+        print(f"{dispatchers} dispatchers x {attempts} attempts over {units} units, {group} unit(s) per dispatch")
+        await run("legacy", legacy_dispatch, responder_ids, incident_ids, dispatchers, attempts, group)
+        await run("atomic", atomic_dispatch, responder_ids, incident_ids, dispatchers, attempts, group)
+    finally:
+        await cleanup(responder_ids, incident_ids)
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    group = 1
+    if "--multi" in args:
+        position = args.index("--multi")
+        group = int(args[position + 1])
+        del args[position:position + 2]
+    values = [int(arg) for arg in args] + [50, 20, 20][len(args):]
+    asyncio.run(main(*values[:3], group))
@@ -0,0 +1,72 @@
+"""
+Throughput of the haversine implementations in app.utils.distance.
+
+  scalar        calculate_haversine_distance in a Python loop
+  one_to_many   haversine_one_to_many (float64 / float32)
+  matrix        haversine_matrix on a sqrt(n) x sqrt(n) grid (float64 / float32)
+
+Reports pairs per second at each size. The scalar loop is skipped above
+1e6 pairs unless --all is given (it takes tens of seconds at 1e7).
+
+Usage:
+    python scripts/bench/distance.py [--all] [sizes...]
+"""
+import math
+import os
+import sys
+import time
+
+# Add the parent directory (server) to sys.path to allow imports from app
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../'))
+
+import numpy as np
+from app.utils.distance import calculate_haversine_distance, haversine_one_to_many, haversine_matrix
+
+SCALAR_LIMIT = 1_000_000
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main(sizes, run_all: bool) -> None:
+    rng = np.random.default_rng(42)
+    print(f"{'pairs':>10}  {'implementation':<20}{'seconds':>10}{'pairs/sec':>16}{'speedup':>10}")
+    for n in sizes:
+        lats = rng.uniform(12.5, 13.5, n)
+        lons = rng.uniform(79.5, 80.5, n)
+        repeat = 3 if n <= 1_000_000 else 1
+        results = []
+
+        if n <= SCALAR_LIMIT or run_all:
+            lat_list, lon_list = lats.tolist(), lons.tolist()
+            results.append(("scalar", best_of(
+                lambda: [calculate_haversine_distance(13.0, 80.0, a, b) for a, b in zip(lat_list, lon_list)], repeat)))
+
+        for dtype in (np.float64, np.float32):
+            results.append((f"one_to_many/{dtype.__name__}", best_of(
+                lambda: haversine_one_to_many(13.0, 80.0, lats, lons, dtype=dtype), repeat)))
+
+        side = int(math.isqrt(n))
+        for dtype in (np.float64, np.float32):
+            seconds = best_of(lambda: haversine_matrix(lats[:side], lons[:side], dtype=dtype), repeat)
+            # Normalize to n pairs so rows are comparable
+            results.append((f"matrix/{dtype.__name__}", seconds * n / (side * side)))
+
+        baseline = results[0][1] if results[0][0] == "scalar" else None
+        for name, seconds in results:
+            speedup = f"{baseline / seconds:>9.1f}x" if baseline else f"{'-':>10}"
+            print(f"{n:>10}  {name:<20}{seconds:>10.4f}{n / seconds:>16,.0f}{speedup}")
+        print()
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    run_all = "--all" in args
+    sizes = [int(float(arg)) for arg in args if arg != "--all"] or [10**3, 10**4, 10**5, 10**6, 10**7]
+    main(sizes, run_all)
@@ -0,0 +1,123 @@
+"""
+Benchmark the incident creation write path.
+
+Compares the original ORM flow (flush -> commit -> refresh -> re-select with
+joinedload) with the single-statement insert in app.crud.incident, reporting
+DB round trips per incident and p50/p99 latency.
+
+Usage:
+    python scripts/bench/incident_insert.py [iterations]
+"""
+import asyncio
+import os
+import sys
+import time
+
+# Add the parent directory (server) to sys.path to allow imports from app
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../'))
+
+from sqlalchemy import delete, event, select
+from sqlalchemy.orm import joinedload
+from app.core.database import AsyncSessionLocal, engine
+from app.crud.incident import create_incident_with_call
+from app.models.models import Incident, EmergencyCall
+from app.models.enums import IncidentStatus, IncidentCategory
+from app.schemas.incident import IncidentResponse
+from app.utils.stats import LatencyWindow
+
+BENCH_PHONE = "bench-incident-insert"
+ANALYSIS = {
+    "priority_score": 8,
+    "category": IncidentCategory.FIRE,
+    "summary": "Benchmark structure fire",
+}
+
+round_trips = 0
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    global round_trips
+    round_trips += 1
+
+
+@event.listens_for(engine.sync_engine, "commit")
+def _count_commit(conn):
+    global round_trips
+    round_trips += 1
+
+
+def call_values(i: int) -> dict:
+    return {
+        "raw_transcript": f"Benchmark call {i}: smoke coming from the second floor",
+        "caller_phone": BENCH_PHONE,
+        "location_lat": 13.0827,
+        "location_long": 80.2707,
+    }
+
+
+async def legacy_create(db, i: int):
+    db_call = EmergencyCall(**call_values(i))
+    db.add(db_call)
+    await db.flush()
+
+    db_incident = Incident(call_id=db_call.call_id, status=IncidentStatus.PENDING, **ANALYSIS)
+    db.add(db_incident)
+    await db.commit()
+    await db.refresh(db_incident)
+
+    query = select(Incident).where(Incident.id == db_incident.id).options(joinedload(Incident.call))
+    result = await db.execute(query)
+    return IncidentResponse.model_validate(result.scalars().first())
+
+
+async def fast_create(db, i: int):
+    payload = await create_incident_with_call(
+        db,
+        call_values=call_values(i),
+        incident_values={"status": IncidentStatus.PENDING, **ANALYSIS},
+    )
+    return IncidentResponse.model_validate(payload)
+
+
+async def run(name: str, create, iterations: int) -> None:
+    global round_trips
+    latencies = LatencyWindow(size=iterations)
+
+    async with AsyncSessionLocal() as db:
+        # Warm up connection and statement caches
+        for i in range(10):
+            await create(db, i)
+
+        round_trips = 0
+        for i in range(iterations):
+            started = time.perf_counter()
+            await create(db, i)
+            latencies.add((time.perf_counter() - started) * 1000)
+
+    stats = latencies.snapshot()
+    print(
+        f"{name:<8} round_trips/incident={round_trips / iterations:>4.1f}  "
+        f"p50={stats['p50_ms']:>7.2f}ms  p99={stats['p99_ms']:>7.2f}ms"
+    )
+
+
+async def cleanup() -> None:
+    async with AsyncSessionLocal() as db:
+        call_ids = select(EmergencyCall.call_id).where(EmergencyCall.caller_phone == BENCH_PHONE)
+        await db.execute(delete(Incident).where(Incident.call_id.in_(call_ids)))
+        await db.execute(delete(EmergencyCall).where(EmergencyCall.caller_phone == BENCH_PHONE))
+        await db.commit()
+
+
+async def main(iterations: int) -> None:
+    try:
+        await run("legacy", legacy_create, iterations)
+        await run("fast", fast_create, iterations)
+    finally:
+        await cleanup()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 500))
@@ -0,0 +1,141 @@
+"""
+Offline end-to-end throughput benchmark for the incident pipeline.
+
+Drives the real app in-process (POST /incidents, detailed analysis, and
+the analytics endpoints) against the local database, with the AI served
+by the fake or replay backend instead of Groq. Nothing leaves the machine.
+
+    AI_BACKEND=fake    synthetic responses; shape them with
+                       AI_FAKE_LATENCY_DISTRIBUTION, AI_FAKE_LATENCY_MS,
+                       AI_FAKE_LATENCY_SPREAD, AI_FAKE_ERROR_RATE and
+                       AI_FAKE_RATE_LIMIT_RATE (default)
+    AI_BACKEND=replay  responses captured earlier by running the server
+                       with AI_BACKEND=record (AI_RECORDING_PATH)
+
+Per-key rate limits are lifted unless AI_KEY_REQUESTS_PER_MINUTE is set.
+
+Usage:
+    python scripts/bench/pipeline_throughput.py [incidents] [concurrency...]
+"""
+import asyncio
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("AI_BACKEND", "fake")
+os.environ.setdefault("AI_KEY_REQUESTS_PER_MINUTE", "1000000")
+
+# Add the parent directory (server) to sys.path to allow imports from app
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../'))
+
+import httpx
+from sqlalchemy import delete, select
+from main import app
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.models import Incident, EmergencyCall, IncidentAnalysis
+from app.ai.metrics import ai_metrics
+from app.utils.stats import LatencyWindow
+
+BENCH_PHONE = "bench-pipeline-throughput"
+API = f"{settings.API_V1_STR}/api/v1"
+
+TRANSCRIPTS = [
+    "There is smoke coming out of the second floor window and people are shouting",
+    "My father collapsed and is not breathing, please send an ambulance",
+    "Two cars crashed at the junction, one driver is bleeding",
+    "Someone broke into the shop next door, I can see a man with a knife",
+    "Strong smell of gas in the building corridor",
+    "Loud party with drunk people fighting on the street",
+    "My neighbour is elderly and has not answered the door for two days",
+    "The river is flooding the road and a car is stuck in the water",
+]
+
+
+async def timed(client: httpx.AsyncClient, latencies: LatencyWindow, method: str, url: str, **kwargs) -> httpx.Response:
+    started = time.perf_counter()
+    response = await client.request(method, url, **kwargs)
+    latencies.add((time.perf_counter() - started) * 1000)
+    return response
+
+
+async def run(client: httpx.AsyncClient, incidents: int, concurrency: int) -> None:
+    create_latency = LatencyWindow(size=incidents)
+    analysis_latency = LatencyWindow(size=incidents)
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> None:
+        nonlocal errors
+        async with semaphore:
+            response = await timed(client, create_latency, "POST", f"{API}/incidents", data={
+                "description": f"{random.choice(TRANSCRIPTS)} (call {i})",
+                "latitude": str(13.08 + random.uniform(-0.05, 0.05)),
+                "longitude": str(80.27 + random.uniform(-0.05, 0.05)),
+                "reporter_id": BENCH_PHONE,
+            })
+            if response.status_code != 201:
+                errors += 1
+                return
+            incident_id = response.json()["id"]
+            response = await timed(client, analysis_latency, "GET", f"{API}/incidents/{incident_id}/analysis")
+            if response.status_code != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(incidents)))
+    elapsed = time.perf_counter() - started
+
+    create, analysis = create_latency.snapshot(), analysis_latency.snapshot()
+    print(
+        f"concurrency={concurrency:<4} incidents/s={incidents / elapsed:>8.1f}  "
+        f"create p50={create['p50_ms']:>7.1f}ms p99={create['p99_ms']:>7.1f}ms  "
+        f"analysis p50={analysis['p50_ms']:>7.1f}ms p99={analysis['p99_ms']:>7.1f}ms  errors={errors}"
+    )
+
+
+async def run_analytics(client: httpx.AsyncClient, rounds: int) -> None:
+    for endpoint in ("clusters", "predictions", "summary"):
+        latencies = LatencyWindow(size=rounds)
+        for _ in range(rounds):
+            await timed(client, latencies, "GET", f"{API}/analytics/{endpoint}")
+        stats = latencies.snapshot()
+        print(f"analytics/{endpoint:<12} p50={stats['p50_ms']:>7.1f}ms  p99={stats['p99_ms']:>7.1f}ms")
+
+
+async def cleanup() -> None:
+    async with AsyncSessionLocal() as db:
+        call_ids = select(EmergencyCall.call_id).where(EmergencyCall.caller_phone == BENCH_PHONE)
+        incident_ids = select(Incident.id).where(Incident.call_id.in_(call_ids))
+        await db.execute(delete(IncidentAnalysis).where(IncidentAnalysis.incident_id.in_(incident_ids)))
+        await db.execute(delete(Incident).where(Incident.call_id.in_(call_ids)))
+        await db.execute(delete(EmergencyCall).where(EmergencyCall.caller_phone == BENCH_PHONE))
+        await db.commit()
+
+
+async def main(incidents: int, concurrencies: list) -> None:
+    print(f"AI backend: {settings.AI_BACKEND}, triage mode: {settings.TRIAGE_MODE}")
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+                for concurrency in concurrencies:
+                    await run(client, incidents, concurrency)
+                await run_analytics(client, rounds=10)
+        finally:
+            await cleanup()
+
+    print()
+    for operation, stats in ai_metrics.snapshot().items():
+        print(
+            f"{operation:<24} calls={sum(stats['calls'].values()):>6}  "
+            f"p50={stats['latency']['p50_ms']:>7.1f}ms  tokens={stats['tokens']['total']:>8}  "
+            f"fallback_rate={stats['fallback_rate']:.2%}"
+        )
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    levels = [int(level) for level in sys.argv[2:]] or [1, 8, 32]
+    asyncio.run(main(count, levels))
@@ -0,0 +1,97 @@
+"""
+Microbenchmark for the incident list serialization paths.
+
+Compares, on the same synthetic data and without a database:
+  orm   - ORM Incident/EmergencyCall objects validated through
+          List[IncidentResponse] and encoded the way FastAPI does
+  core  - column-projected row tuples nested by rows_to_payloads and
+          encoded straight to bytes (app.utils.serialization)
+
+Usage:
+    python scripts/bench/serialization.py [sizes...]
+"""
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+# Add the parent directory (server) to sys.path to allow imports from app
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../'))
+
+from typing import List
+from pydantic import TypeAdapter
+from app.crud.incident import incident_listing_select, rows_to_payloads
+from app.models.models import Incident, EmergencyCall
+from app.models.enums import IncidentStatus, IncidentCategory
+from app.schemas.incident import IncidentResponse
+from app.utils import serialization
+
+CATEGORIES = list(IncidentCategory)
+KEYS = list(incident_listing_select().selected_columns.keys())
+
+
+def make_row(i: int, now: datetime) -> dict:
+    return {
+        "id": i,
+        "call_id": i,
+        "status": IncidentStatus.PENDING,
+        "priority_score": i % 10 + 1,
+        "created_at": now - timedelta(seconds=i),
+        "updated_at": now - timedelta(seconds=i),
+        "category": CATEGORIES[i % len(CATEGORIES)],
+        "summary": f"Incident summary number {i}",
+        "call__call_id": i,
+        "call__timestamp": now - timedelta(seconds=i),
+        "call__caller_phone": "+91 98765 43210",
+        "call__raw_transcript": "There is smoke coming out of the building next door, please hurry",
+        "call__media_url": None,
+        "call__image_url": None,
+        "call__audio_url": None,
+        "call__location_lat": 13.0827 + i * 1e-6,
+        "call__location_long": 80.2707 - i * 1e-6,
+    }
+
+
+def orm_objects(rows: List[dict]) -> List[Incident]:
+    incidents = []
+    for row in rows:
+        call = EmergencyCall(**{k[len("call__"):]: v for k, v in row.items() if k.startswith("call__")})
+        incident = Incident(**{k: v for k, v in row.items() if not k.startswith("call__")})
+        incident.call = call
+        incidents.append(incident)
+    return incidents
+
+
+def bench_orm(rows: List[dict]) -> float:
+    adapter = TypeAdapter(List[IncidentResponse])
+    started = time.perf_counter()
+    objects = orm_objects(rows)
+    validated = adapter.validate_python(objects, from_attributes=True)
+    body = json.dumps(adapter.dump_python(validated, mode="json")).encode()
+    assert body
+    return time.perf_counter() - started
+
+
+def bench_core(rows: List[dict]) -> float:
+    tuples = [tuple(row[k] for k in KEYS) for row in rows]
+    started = time.perf_counter()
+    body = serialization.dumps(rows_to_payloads(KEYS, tuples))
+    assert body
+    return time.perf_counter() - started
+
+
+def main(sizes: List[int]) -> None:
+    now = datetime.now(timezone.utc)
+    encoder = "orjson" if serialization.orjson is not None else "json"
+    print(f"encoder for core path: {encoder}")
+    print(f"{'rows':>8} {'orm rows/s':>14} {'core rows/s':>14} {'speedup':>8}")
+    for size in sizes:
+        rows = [make_row(i, now) for i in range(size)]
+        orm_time = bench_orm(rows)
+        core_time = bench_core(rows)
+        print(f"{size:>8} {size / orm_time:>14,.0f} {size / core_time:>14,.0f} {orm_time / core_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [1_000, 10_000, 100_000])
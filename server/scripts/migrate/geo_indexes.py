@@ -0,0 +1,55 @@
+import asyncio
+import sys
+import os
+
+# Add the parent directory (server) to sys.path to allow imports from app
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../'))
+
+from sqlalchemy import text
+from app.core.config import settings
+from app.core.database import engine
+from app.models.models import Responder, EmergencyCall
+
+# create_all() only builds indexes for new tables, so existing databases
+# need the composite location indexes added explicitly. With
+# SPATIAL_BACKEND=earthdistance or postgis the extension and the GiST
+# index its radius filters use are created as well.
+
+LOCATION_COLUMNS = {
+    "responders": ("latitude", "longitude"),
+    "emergency_calls": ("location_lat", "location_long"),
+}
+
+EXTENSION_DDL = {
+    "earthdistance": ["CREATE EXTENSION IF NOT EXISTS cube", "CREATE EXTENSION IF NOT EXISTS earthdistance"],
+    "postgis": ["CREATE EXTENSION IF NOT EXISTS postgis"],
+}
+
+# Must match the expressions built in app.crud.geo.radius_filter
+GIST_EXPRESSIONS = {
+    "earthdistance": "ll_to_earth({lat}, {lng})",
+    "postgis": "geography(ST_SetSRID(ST_MakePoint({lng}, {lat}), 4326))",
+}
+
+async def create_geo_indexes():
+    backend = settings.SPATIAL_BACKEND
+    print(f"Creating location indexes (SPATIAL_BACKEND={backend})...")
+    async with engine.begin() as conn:
+        for table in (Responder.__table__, EmergencyCall.__table__):
+            for index in table.indexes:
+                await conn.run_sync(lambda sync_conn: index.create(sync_conn, checkfirst=True))
+                print(f"  {index.name}")
+
+        if backend in GIST_EXPRESSIONS:
+            for statement in EXTENSION_DDL[backend]:
+                await conn.execute(text(statement))
+            for table, (lat, lng) in LOCATION_COLUMNS.items():
+                name = f"ix_{table}_{backend}"
+                expression = GIST_EXPRESSIONS[backend].format(lat=lat, lng=lng)
+                await conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} USING gist ({expression})"))
+                print(f"  {name}")
+    await engine.dispose()
+    print("Done.")
+
+if __name__ == "__main__":
+    asyncio.run(create_geo_indexes())
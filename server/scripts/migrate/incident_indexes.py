@@ -0,0 +1,24 @@
+import asyncio
+import sys
+import os
+
+# Add the parent directory (server) to sys.path to allow imports from app
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../'))
+
+from app.core.database import engine
+from app.models.models import Incident
+
+# create_all() only builds indexes for new tables, so existing databases
+# need the incident queue indexes added explicitly.
+
+async def create_incident_indexes():
+    print("Creating incident indexes...")
+    async with engine.begin() as conn:
+        for index in Incident.__table__.indexes:
+            await conn.run_sync(lambda sync_conn: index.create(sync_conn, checkfirst=True))
+            print(f"  {index.name}")
+    await engine.dispose()
+    print("Done.")
+
+if __name__ == "__main__":
+    asyncio.run(create_incident_indexes())
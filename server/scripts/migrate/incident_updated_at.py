@@ -0,0 +1,32 @@
+import asyncio
+import sys
+import os
+
+# Add the parent directory (server) to sys.path to allow imports from app
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../'))
+
+from sqlalchemy import text
+from app.core.database import engine
+from app.models.models import INCIDENT_UPDATED_AT_DDL
+
+# Adds incidents.updated_at (the listings' change version and `since` delta
+# mode) and the trigger keeping it current to databases created before them.
+
+async def add_updated_at():
+    print("Adding incidents.updated_at...")
+    async with engine.begin() as conn:
+        await conn.execute(text(
+            "ALTER TABLE incidents ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE"
+        ))
+        await conn.execute(text("UPDATE incidents SET updated_at = created_at WHERE updated_at IS NULL"))
+        await conn.execute(text("ALTER TABLE incidents ALTER COLUMN updated_at SET DEFAULT now()"))
+        await conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_incidents_updated_at ON incidents (updated_at)"
+        ))
+        for statement in INCIDENT_UPDATED_AT_DDL:
+            await conn.execute(text(statement))
+    await engine.dispose()
+    print("Done.")
+
+if __name__ == "__main__":
+    asyncio.run(add_updated_at())
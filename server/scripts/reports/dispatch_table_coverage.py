@@ -0,0 +1,76 @@
+"""
+How many responder recommendation LLM calls the dispatch table avoids on
+the incidents in the database.
+
+Every incident is treated as one recommendation request. Incidents in a
+table cell are answered locally; the rest need the LLM once per distinct
+(category, priority band, summary), after which the recommendation cache
+answers (an upper bound on cache hits, since it ignores the TTL).
+
+Usage:
+    python scripts/reports/dispatch_table_coverage.py
+"""
+import asyncio
+import sys
+import os
+from collections import defaultdict
+
+# Add the parent directory (server) to sys.path to allow imports from app
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../'))
+
+from sqlalchemy import func, select
+from app.core.database import engine
+from app.models.models import Incident
+from app.ai.dispatch import table_recommendation
+
+
+async def main() -> None:
+    summary = func.lower(func.coalesce(Incident.summary, ""))
+    query = (
+        select(
+            Incident.category,
+            Incident.priority_score,
+            func.count().label("incidents"),
+            func.count(func.distinct(summary)).label("distinct_summaries"),
+        )
+        .group_by(Incident.category, Incident.priority_score)
+    )
+    async with engine.connect() as conn:
+        rows = (await conn.execute(query)).all()
+    await engine.dispose()
+
+    by_category = defaultdict(lambda: {"incidents": 0, "table": 0, "llm": 0})
+    total = table = llm = 0
+    for category, priority, incidents, distinct_summaries in rows:
+        name = category.value if category else "(uncategorized)"
+        stats = by_category[name]
+        stats["incidents"] += incidents
+        total += incidents
+        if table_recommendation(category, priority) is not None:
+            stats["table"] += incidents
+            table += incidents
+        else:
+            # Summaries can repeat across priorities in one band, so this
+            # slightly overcounts the LLM calls
+            stats["llm"] += distinct_summaries
+            llm += distinct_summaries
+
+    if not total:
+        print("No incidents.")
+        return
+
+    print(f"{'category':<22}{'incidents':>10}{'table':>8}{'llm':>8}")
+    for name, stats in sorted(by_category.items(), key=lambda item: -item[1]["incidents"]):
+        print(f"{name:<22}{stats['incidents']:>10}{stats['table']:>8}{stats['llm']:>8}")
+
+    cached = total - table - llm
+    print()
+    print(f"Incidents:             {total}")
+    print(f"Answered by table:     {table} ({table / total:.1%})")
+    print(f"Answered by cache:     {cached} ({cached / total:.1%})")
+    print(f"LLM calls needed:      {llm} ({llm / total:.1%})")
+    print(f"LLM calls avoided:     {total - llm} ({(total - llm) / total:.1%})")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,40 @@
+import pytest
+from app.ai.rules import classify_incident
+
+# Real call phrasings and the category the keyword triage must give them.
+# Context words (who is involved, where) must not outvote what happened.
+CALLS = [
+    ("My husband is having a heart attack", "medical_emergency"),
+    ("my wife collapsed and is not breathing", "medical_emergency"),
+    ("elderly man alone had a seizure", "medical_emergency"),
+    ("my grandmother is confused and has chest pain", "medical_emergency"),
+    ("someone fired shots", "crime_in_progress"),
+    ("shots fired near the school", "crime_in_progress"),
+    ("I heard gunshots outside", "crime_in_progress"),
+    ("a man opened fire at the mall", "crime_in_progress"),
+    ("he's been shot in the leg", "crime_in_progress"),
+    ("someone is attacking me with a knife", "crime_in_progress"),
+    ("my husband is beating me", "domestic_violence"),
+    ("my partner threatened me again", "domestic_violence"),
+    ("the house next door is on fire", "fire"),
+    ("my son overdosed on pills", "overdose"),
+    ("there is a gas leak in the kitchen", "hazardous_material"),
+    ("elderly neighbour not answering the door for two days", "welfare_check"),
+    ("strange man loitering by the gate", "suspicious_activity"),
+]
+
+
+@pytest.mark.parametrize("description, category", CALLS)
+def test_call_category(description, category):
+    assert classify_incident(description)["category"] == category
+
+
+@pytest.mark.parametrize("description", [
+    "My husband is having a heart attack",
+    "elderly man alone had a seizure",
+    "someone fired shots",
+])
+def test_life_threats_are_confident_and_urgent(description):
+    result = classify_incident(description)
+    assert result["confidence"] >= 0.9
+    assert result["priority_score"] >= 8
@@ -7,6 +7,7 @@ import IncidentFeed from '@/components/IncidentFeed';
 import IncidentDetails from '@/components/IncidentDetails';
 import IncidentMap from '@/components/IncidentMap';
 import RespondersMap from '@/components/RespondersMap';
+import { useIncidentStream } from '@/hooks/useIncidentStream';
 
 // Create a client
 const queryClient = new QueryClient();
@@ -78,12 +79,13 @@ function Dashboard() {
   const queryClient = useQueryClient();
   const navigate = useNavigate();
 
-  // Poll for incidents every 5 seconds
+  // Initial load, then kept current by the live incident feed
   const { data: incidents = [], isLoading } = useQuery({
     queryKey: ['incidents'],
     queryFn: fetchIncidents,
-    refetchInterval: 5000,
+    staleTime: Infinity,
   });
+  useIncidentStream();
 
   const updateMutation = useMutation({
     mutationFn: ({ id, status }: { id: number; status: string }) => updateIncidentStatus(id, status),
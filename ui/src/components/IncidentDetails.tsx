@@ -1,5 +1,5 @@
 import { useState, useEffect } from 'react';
-import { Incident, BASE_URL, getIncidentAnalysis, DetailedAnalysis } from '@/lib/api';
+import { Incident, BASE_URL, getIncidentAnalysis, streamIncidentAnalysis, DetailedAnalysis } from '@/lib/api';
 import { Phone, MapPin, ClipboardList, CheckCircle2, AlertTriangle, Clock, ImageIcon, Volume2, Brain, Wrench, Users, Shield, ListChecks, Loader2 } from 'lucide-react';
 import SeverityBadge from './SeverityBadge';
 import { format } from 'date-fns';
@@ -13,7 +13,7 @@ interface IncidentDetailsProps {
 export default function IncidentDetails({ incident, onUpdateStatus }: IncidentDetailsProps) {
   const [showDispatchModal, setShowDispatchModal] = useState(false);
   const [address, setAddress] = useState<string | null>(null);
-  const [analysis, setAnalysis] = useState<DetailedAnalysis | null>(null);
+  const [analysis, setAnalysis] = useState<Partial<DetailedAnalysis> | null>(null);
   const [analysisLoading, setAnalysisLoading] = useState(false);
 
   useEffect(() => {
@@ -34,16 +34,35 @@ export default function IncidentDetails({ incident, onUpdateStatus }: IncidentDe
     }
   }, [incident]);
 
-  // Fetch AI analysis
+  // Stream AI analysis, rendering each section as it arrives
   useEffect(() => {
-    if (incident?.id) {
-        setAnalysis(null);
-        setAnalysisLoading(true);
-        getIncidentAnalysis(incident.id)
-            .then(data => setAnalysis(data))
-            .catch(() => setAnalysis(null))
-            .finally(() => setAnalysisLoading(false));
-    }
+    if (!incident?.id) return;
+    const incidentId = incident.id;
+    let received = false;
+    setAnalysis(null);
+    setAnalysisLoading(true);
+
+    const close = streamIncidentAnalysis(
+        incidentId,
+        (key, value) => {
+            received = true;
+            setAnalysisLoading(false);
+            setAnalysis(prev => ({ ...prev, [key]: value }));
+        },
+        () => setAnalysisLoading(false),
+        () => {
+            if (received) {
+                setAnalysisLoading(false);
+                return;
+            }
+            // Streaming unavailable: fall back to the one-shot endpoint
+            getIncidentAnalysis(incidentId)
+                .then(data => setAnalysis(data))
+                .catch(() => setAnalysis(null))
+                .finally(() => setAnalysisLoading(false));
+        },
+    );
+    return close;
   }, [incident?.id]);
 
   if (!incident) {
@@ -191,84 +210,94 @@ export default function IncidentDetails({ incident, onUpdateStatus }: IncidentDe
             ) : analysis ? (
                 <div className="p-4 rounded-lg bg-cat-crust border border-cat-surface0 space-y-4">
                     {/* Situation */}
-                    <div className="flex items-start gap-3">
-                        <div className="p-2 rounded bg-cat-blue/10 border border-cat-blue/20">
-                            <Brain className="w-4 h-4 text-cat-blue" />
+                    {analysis.situation && (
+                        <div className="flex items-start gap-3">
+                            <div className="p-2 rounded bg-cat-blue/10 border border-cat-blue/20">
+                                <Brain className="w-4 h-4 text-cat-blue" />
+                            </div>
+                            <div className="flex-1">
+                                <div className="text-[10px] text-cat-overlay0 uppercase">What is Happening</div>
+                                <div className="text-sm text-cat-text leading-relaxed">
+                                    {analysis.situation}
+                                </div>
+                            </div>
                         </div>
-                        <div className="flex-1">
-                            <div className="text-[10px] text-cat-overlay0 uppercase">What is Happening</div>
-                            <div className="text-sm text-cat-text leading-relaxed">
-                                {analysis.situation}
+                    )}
+
+                    {/* Instructions */}
+                    {analysis.instructions && (
+                        <div className="flex items-start gap-3">
+                            <div className="p-2 rounded bg-cat-mauve/10 border border-cat-mauve/20">
+                                <ListChecks className="w-4 h-4 text-cat-mauve" />
+                            </div>
+                            <div className="flex-1">
+                                <div className="text-[10px] text-cat-overlay0 uppercase mb-2">Response Instructions</div>
+                                <ol className="space-y-1.5">
+                                    {analysis.instructions.map((instruction, idx) => (
+                                        <li key={idx} className="flex items-start gap-2 text-sm text-cat-text">
+                                            <span className="flex-shrink-0 w-5 h-5 rounded-full bg-cat-mauve/20 text-cat-mauve text-xs font-bold flex items-center justify-center">
+                                                {idx + 1}
+                                            </span>
+                                            <span>{instruction}</span>
+                                        </li>
+                                    ))}
+                                </ol>
                             </div>
                         </div>
-                    </div>
+                    )}
 
                     {/* Rescue Type */}
-                    <div className="flex items-center gap-3">
-                        <div className="p-2 rounded bg-cat-red/10 border border-cat-red/20">
-                            <Shield className="w-4 h-4 text-cat-red" />
-                        </div>
-                        <div>
-                            <div className="text-[10px] text-cat-overlay0 uppercase">Rescue Type Required</div>
-                            <div className="text-sm font-bold text-cat-text">
-                                {analysis.rescue_type}
+                    {analysis.rescue_type && (
+                        <div className="flex items-center gap-3">
+                            <div className="p-2 rounded bg-cat-red/10 border border-cat-red/20">
+                                <Shield className="w-4 h-4 text-cat-red" />
+                            </div>
+                            <div>
+                                <div className="text-[10px] text-cat-overlay0 uppercase">Rescue Type Required</div>
+                                <div className="text-sm font-bold text-cat-text">
+                                    {analysis.rescue_type}
+                                </div>
                             </div>
                         </div>
-                    </div>
+                    )}
 
                     {/* Responders Count */}
-                    <div className="flex items-start gap-3">
-                        <div className="p-2 rounded bg-cat-green/10 border border-cat-green/20">
-                            <Users className="w-4 h-4 text-cat-green" />
-                        </div>
-                        <div className="flex-1">
-                            <div className="text-[10px] text-cat-overlay0 uppercase">Responders Needed</div>
-                            <div className="flex flex-wrap gap-2 mt-1">
-                                {Object.entries(analysis.responders_count).map(([type, count]) => (
-                                    <span key={type} className="px-2 py-1 rounded bg-cat-surface0 text-xs font-mono text-cat-text capitalize">
-                                        {type}: <span className="font-bold text-cat-green">{count}</span>
-                                    </span>
-                                ))}
+                    {analysis.responders_count && (
+                        <div className="flex items-start gap-3">
+                            <div className="p-2 rounded bg-cat-green/10 border border-cat-green/20">
+                                <Users className="w-4 h-4 text-cat-green" />
+                            </div>
+                            <div className="flex-1">
+                                <div className="text-[10px] text-cat-overlay0 uppercase">Responders Needed</div>
+                                <div className="flex flex-wrap gap-2 mt-1">
+                                    {Object.entries(analysis.responders_count).map(([type, count]) => (
+                                        <span key={type} className="px-2 py-1 rounded bg-cat-surface0 text-xs font-mono text-cat-text capitalize">
+                                            {type}: <span className="font-bold text-cat-green">{count}</span>
+                                        </span>
+                                    ))}
+                                </div>
                             </div>
                         </div>
-                    </div>
+                    )}
 
                     {/* Equipment */}
-                    <div className="flex items-start gap-3">
-                        <div className="p-2 rounded bg-cat-peach/10 border border-cat-peach/20">
-                            <Wrench className="w-4 h-4 text-cat-peach" />
-                        </div>
-                        <div className="flex-1">
-                            <div className="text-[10px] text-cat-overlay0 uppercase">Equipment Required</div>
-                            <div className="flex flex-wrap gap-1.5 mt-1">
-                                {analysis.equipment.map((item, idx) => (
-                                    <span key={idx} className="px-2 py-0.5 rounded-full bg-cat-surface0 border border-cat-surface1 text-xs text-cat-subtext0">
-                                        {item}
-                                    </span>
-                                ))}
+                    {analysis.equipment && (
+                        <div className="flex items-start gap-3">
+                            <div className="p-2 rounded bg-cat-peach/10 border border-cat-peach/20">
+                                <Wrench className="w-4 h-4 text-cat-peach" />
                             </div>
-                        </div>
-                    </div>
-
-                    {/* Instructions */}
-                    <div className="flex items-start gap-3">
-                        <div className="p-2 rounded bg-cat-mauve/10 border border-cat-mauve/20">
-                            <ListChecks className="w-4 h-4 text-cat-mauve" />
-                        </div>
-                        <div className="flex-1">
-                            <div className="text-[10px] text-cat-overlay0 uppercase mb-2">Response Instructions</div>
-                            <ol className="space-y-1.5">
-                                {analysis.instructions.map((instruction, idx) => (
-                                    <li key={idx} className="flex items-start gap-2 text-sm text-cat-text">
-                                        <span className="flex-shrink-0 w-5 h-5 rounded-full bg-cat-mauve/20 text-cat-mauve text-xs font-bold flex items-center justify-center">
-                                            {idx + 1}
+                            <div className="flex-1">
+                                <div className="text-[10px] text-cat-overlay0 uppercase">Equipment Required</div>
+                                <div className="flex flex-wrap gap-1.5 mt-1">
+                                    {analysis.equipment.map((item, idx) => (
+                                        <span key={idx} className="px-2 py-0.5 rounded-full bg-cat-surface0 border border-cat-surface1 text-xs text-cat-subtext0">
+                                            {item}
                                         </span>
-                                        <span>{instruction}</span>
-                                    </li>
-                                ))}
-                            </ol>
+                                    ))}
+                                </div>
+                            </div>
                         </div>
-                    </div>
+                    )}
                 </div>
             ) : (
                 <div className="p-4 rounded-lg bg-cat-crust border border-cat-surface0 text-sm text-cat-overlay0 italic">
@@ -0,0 +1,43 @@
+import { useEffect } from 'react';
+import { useQueryClient } from '@tanstack/react-query';
+import { BASE_URL, Incident } from '@/lib/api';
+
+// Same ordering as GET /incidents: priority desc, then oldest first
+const byQueueOrder = (a: Incident, b: Incident) =>
+    b.priority_score - a.priority_score ||
+    a.created_at.localeCompare(b.created_at) ||
+    a.id - b.id;
+
+/**
+ * Keeps the ['incidents'] query up to date from the server's live feed
+ * instead of polling. EventSource reconnects on its own and sends the
+ * Last-Event-ID, so only missed deltas are replayed.
+ */
+export const useIncidentStream = () => {
+    const queryClient = useQueryClient();
+
+    useEffect(() => {
+        const source = new EventSource(`${BASE_URL}/incidents/stream`);
+
+        // Server can't replay what we missed, or a bulk import landed: reload the listing once
+        const reload = () => queryClient.invalidateQueries({ queryKey: ['incidents'] });
+        source.addEventListener('reset', reload);
+        source.addEventListener('incident.bulk', reload);
+
+        source.addEventListener('incident.created', (event) => {
+            const incident: Incident = JSON.parse((event as MessageEvent).data);
+            queryClient.setQueryData<Incident[]>(['incidents'], (old = []) =>
+                [...old.filter(i => i.id !== incident.id), incident].sort(byQueueOrder)
+            );
+        });
+
+        source.addEventListener('incident.updated', (event) => {
+            const delta: Partial<Incident> & { id: number } = JSON.parse((event as MessageEvent).data);
+            queryClient.setQueryData<Incident[]>(['incidents'], (old = []) =>
+                old.map(i => (i.id === delta.id ? { ...i, ...delta } : i)).sort(byQueueOrder)
+            );
+        });
+
+        return () => source.close();
+    }, [queryClient]);
+};
@@ -1,13 +1,100 @@
+import { useEffect, useState } from 'react';
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
-import { fetchNearbyResponders, dispatchResponder, Responder } from '@/lib/api';
+import { fetchNearbyResponders, dispatchResponder, Responder, FleetMessage, FLEET_WS_URL } from '@/lib/api';
 
+const NEARBY_RADIUS_KM = 50;
+const KM_PER_DEGREE_LAT = 111.32;
+const MAX_RECONNECT_MS = 30000;
+
+const toRadians = (degrees: number) => (degrees * Math.PI) / 180;
+
+const haversineKm = (lat1: number, lon1: number, lat2: number, lon2: number) => {
+    const a = Math.sin(toRadians(lat2 - lat1) / 2) ** 2 +
+        Math.cos(toRadians(lat1)) * Math.cos(toRadians(lat2)) * Math.sin(toRadians(lon2 - lon1) / 2) ** 2;
+    return 6371 * 2 * Math.atan2(Math.sqrt(a), Math.sqrt(1 - a));
+};
+
+// [west, south, east, north] around the search circle, for the fleet subscription
+const radiusBbox = (lat: number, long: number, radiusKm: number) => {
+    const latSpan = radiusKm / KM_PER_DEGREE_LAT;
+    const cosLat = Math.max(Math.cos(toRadians(Math.min(89.9, Math.abs(lat) + latSpan))), 1e-6);
+    const lngSpan = radiusKm / (KM_PER_DEGREE_LAT * cosLat);
+    return [
+        Math.max(-180, long - lngSpan),
+        Math.max(-90, lat - latSpan),
+        Math.min(180, long + lngSpan),
+        Math.min(90, lat + latSpan),
+    ];
+};
+
+const byDistance = (a: Responder, b: Responder) => (a.distance ?? 0) - (b.distance ?? 0);
+
+/**
+ * Idle responders near a point, nearest first (as GET /responders/nearby).
+ * Loaded once over HTTP, then kept current from the fleet WebSocket, which
+ * only sends units that changed. Polls every 10s while the socket is down.
+ */
 export const useNearbyResponders = (lat?: number, long?: number, enabled = false) => {
-    return useQuery({
+    const queryClient = useQueryClient();
+    const [live, setLive] = useState(false);
+    const active = enabled && !!lat && !!long;
+
+    const query = useQuery({
         queryKey: ['responders', lat, long],
-        queryFn: () => fetchNearbyResponders(lat!, long!),
-        enabled: enabled && !!lat && !!long,
-        refetchInterval: 10000, // Poll positions every 10s
+        queryFn: () => fetchNearbyResponders(lat!, long!, NEARBY_RADIUS_KM),
+        enabled: active,
+        refetchInterval: live ? false : 10000,
     });
+
+    useEffect(() => {
+        if (!active) return;
+        const queryKey = ['responders', lat, long];
+
+        // Same selection as the server: idle units within the radius
+        const nearby = (units: Responder[]) => units
+            .map(unit => ({ ...unit, distance: haversineKm(lat!, long!, unit.latitude, unit.longitude) }))
+            .filter(unit => unit.status === 'idle' && unit.distance <= NEARBY_RADIUS_KM);
+
+        let socket: WebSocket;
+        let retry: number | undefined;
+        let delay = 1000;
+        let closed = false;
+
+        const connect = () => {
+            socket = new WebSocket(FLEET_WS_URL);
+            socket.onopen = () => {
+                delay = 1000;
+                socket.send(JSON.stringify({ type: 'watch', bbox: radiusBbox(lat!, long!, NEARBY_RADIUS_KM) }));
+            };
+            socket.onmessage = (event) => {
+                const message: FleetMessage = JSON.parse(event.data);
+                if (message.type === 'snapshot') {
+                    queryClient.setQueryData<Responder[]>(queryKey, nearby(message.responders).sort(byDistance));
+                    setLive(true);
+                } else {
+                    const changed = new Set([...message.removes, ...message.upserts.map(unit => unit.id)]);
+                    queryClient.setQueryData<Responder[]>(queryKey, (old = []) =>
+                        [...old.filter(unit => !changed.has(unit.id)), ...nearby(message.upserts)].sort(byDistance)
+                    );
+                }
+            };
+            socket.onclose = () => {
+                setLive(false);
+                if (closed) return;
+                retry = window.setTimeout(connect, delay);
+                delay = Math.min(delay * 2, MAX_RECONNECT_MS);
+            };
+        };
+
+        connect();
+        return () => {
+            closed = true;
+            window.clearTimeout(retry);
+            socket.close();
+        };
+    }, [active, lat, long, queryClient]);
+
+    return query;
 };
 
 export const useDispatcher = () => {
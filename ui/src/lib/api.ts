@@ -11,7 +11,12 @@ export const fetchIncidents = async () => {
   return response.data;
 };
 
-export const fetchIncidentsGeoJSON = async (params?: { category?: string }) => {
+export const fetchIncidentsGeoJSON = async (params?: {
+  category?: string;
+  bbox?: string; // "west,south,east,north"
+  zoom?: number; // below the server's cluster zoom, features are clusters
+  limit?: number;
+}) => {
   const response = await api.get('/incidents/geojson', { params });
   return response.data;
 };
@@ -43,6 +48,14 @@ export const fetchNearbyResponders = async (lat: number, long: number, radius =
     return response.data;
 };
 
+// Live fleet updates: send {type: 'watch', bbox: [west, south, east, north]},
+// receive a 'snapshot' and then coalesced 'delta' messages (upserts/removes)
+export const FLEET_WS_URL = `${BASE_URL.replace(/^http/, 'ws')}/responders/fleet`;
+
+export type FleetMessage =
+    | { type: 'snapshot'; responders: Responder[] }
+    | { type: 'delta'; upserts: Responder[]; removes: number[] };
+
 export const dispatchResponder = async (responderId: number, incidentId: number) => {
     const response = await api.post('/responders/dispatch', { 
         responder_id: responderId, 
@@ -69,6 +82,34 @@ export const getIncidentAnalysis = async (incidentId: number): Promise<DetailedA
     return response.data;
 };
 
+/**
+ * Streams the analysis field by field (situation and instructions first).
+ * Calls onError if the stream breaks before it is done. Returns a function
+ * that closes the stream.
+ */
+export const streamIncidentAnalysis = (
+    incidentId: number,
+    onField: <K extends keyof DetailedAnalysis>(key: K, value: DetailedAnalysis[K]) => void,
+    onDone: (source: 'stored' | 'llm' | 'fallback') => void,
+    onError: () => void,
+): (() => void) => {
+    const source = new EventSource(`${BASE_URL}/incidents/${incidentId}/analysis/stream`);
+    source.addEventListener('field', (event) => {
+        const { key, value } = JSON.parse((event as MessageEvent).data);
+        onField(key, value);
+    });
+    source.addEventListener('done', (event) => {
+        source.close();
+        onDone(JSON.parse((event as MessageEvent).data).source);
+    });
+    // EventSource would reconnect and restart the analysis; give up instead
+    source.onerror = () => {
+        source.close();
+        onError();
+    };
+    return () => source.close();
+};
+
 export interface Responder {
     id: number;
     name: string;